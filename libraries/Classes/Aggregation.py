@@ -0,0 +1,100 @@
+# Standard library imports
+from array import array  # Provides the buffers typed values are batched in before a vectorized reduction
+
+# Third-party imports
+import numpy as np
+
+# Typing imports for type hinting
+from typing import Any, Iterable
+
+# Local application/library specific imports
+from .SecondaryIndex import SecondaryIndex
+
+# Aggregate functions of the aggregate command.
+AGGREGATES = ('count', 'sum', 'avg', 'min', 'max')
+
+# Number of typed values reduced together by the NumPy kernels.
+BATCH_SIZE = 65536
+
+class AggregateState:
+    """
+    Running count, sum, minimum and maximum of the values of a column, updated one value at a
+    time or, for typed columns, one NumPy array at a time.
+
+    Sums and averages only consider numbers. Minimums and maximums order numbers before texts,
+    as secondary indexes do, so columns mixing both still have one.
+    """
+    def __init__(self) -> None:
+        self.count = 0
+        # Number of numeric values added to total
+        self.numbers = 0
+        self.total = 0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, value: Any) -> None:
+        self.count += 1
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.numbers += 1
+            self.total += value
+        self.updateExtremes(value)
+
+    def updateExtremes(self, value: Any) -> None:
+        key = SecondaryIndex.valueKey(value)
+        if self.minimum is None or key < SecondaryIndex.valueKey(self.minimum):
+            self.minimum = value
+        if self.maximum is None or key > SecondaryIndex.valueKey(self.maximum):
+            self.maximum = value
+
+    def addArray(self, values: np.ndarray) -> None:
+        """
+        Add the values of a typed column in one vectorized step.
+        """
+        if len(values) == 0:
+            return
+        self.count += len(values)
+        # Booleans are not summed, like boxed booleans
+        if values.dtype != np.bool_:
+            self.numbers += len(values)
+            self.total += values.sum().item()
+        self.updateExtremes(values.min().item())
+        self.updateExtremes(values.max().item())
+
+    def addAll(self, values: Iterable[Any], typeCode: str = None) -> None:
+        """
+        Add a stream of values; with the array type code of a typed column they are batched and
+        reduced with the NumPy kernels instead of one by one.
+        """
+        if typeCode is None:
+            for value in values:
+                self.add(value)
+            return
+        batch = array(typeCode)
+        for value in values:
+            try:
+                batch.append(value)
+            except (TypeError, OverflowError):
+                # Values written before the column was typed
+                self.add(value)
+                continue
+            if len(batch) >= BATCH_SIZE:
+                self.addBatch(batch)
+                batch = array(typeCode)
+        self.addBatch(batch)
+
+    def addBatch(self, batch: array) -> None:
+        values = np.frombuffer(batch, dtype=batch.typecode) if len(batch) else np.empty(0)
+        self.addArray(values.astype(np.bool_) if batch.typecode == 'b' else values)
+
+    def result(self, function: str) -> Any:
+        if function == 'count':
+            return self.count
+        if function == 'sum':
+            return self.total
+        if function == 'avg':
+            return self.total / self.numbers if self.numbers else None
+        if function == 'min':
+            return self.minimum
+        if function == 'max':
+            return self.maximum
+        raise ValueError(f"Invalid aggregate function '{function}', expected one of {AGGREGATES}.")
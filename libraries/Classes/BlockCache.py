@@ -0,0 +1,108 @@
+# Standard library imports
+import threading                     # Provides the lock protecting the shared cache
+from collections import OrderedDict  # Provides the ordered mappings used as LRU lists
+
+# Typing imports for type hinting
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Block priorities
+DATA = 'data'
+INDEX = 'index'
+
+class BlockCache:
+    """
+    Process-wide segmented LRU cache of decoded HFile blocks with a byte budget.
+
+    Data blocks enter a 'single' segment on their first access and move to a 'multi' segment
+    when they are hit again, so one large scan cannot flush the blocks of frequently read rows.
+    Index blocks live in their own segment and are only evicted once no data block is left.
+    Sizes are those of the encoded blocks before compression.
+    """
+    # Default byte budget of the cache
+    DEFAULT_CAPACITY = 32 * 1024 * 1024
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY) -> None:
+        self.capacity = capacity
+        self.lock = threading.Lock()
+        # Segments in eviction order: entries map a key to (block, size)
+        self.segments: Dict[str, OrderedDict] = {'single': OrderedDict(), 'multi': OrderedDict(), INDEX: OrderedDict()}
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def resize(self, capacity: int) -> None:
+        """
+        Change the byte budget of the cache, evicting blocks if it shrank.
+        """
+        with self.lock:
+            self.capacity = capacity
+            self.evict()
+
+    def getBlock(self, key: Hashable, load: Callable[[], Tuple[Any, int]], priority: str = DATA) -> Any:
+        """
+        Return a cached block, loading and caching it on a miss.
+
+        Parameters:
+            key (Hashable): The key identifying the block, such as (file path, offset).
+            load (Callable): Function decoding the block and returning it with its size in bytes.
+            priority (str): DATA for data blocks or INDEX for block indexes.
+
+        Returns:
+            Any: The decoded block.
+        """
+        with self.lock:
+            for name, segment in self.segments.items():
+                if key in segment:
+                    self.hits += 1
+                    entry = segment.pop(key)
+                    # A data block hit a second time is promoted to the multi-access segment
+                    self.segments['multi' if name == 'single' else name][key] = entry
+                    return entry[0]
+            self.misses += 1
+
+        block, size = load()
+        with self.lock:
+            segment = self.segments[INDEX if priority == INDEX else 'single']
+            if key not in segment and size <= self.capacity:
+                segment[key] = (block, size)
+                self.size += size
+                self.evict()
+        return block
+
+    def evict(self) -> None:
+        # Least recently used entries go first, single-access data before multi-access data before indexes
+        for segment in self.segments.values():
+            while self.size > self.capacity and segment:
+                _, (_, size) = segment.popitem(last=False)
+                self.size -= size
+                self.evictions += 1
+
+    def evictFile(self, path: str) -> None:
+        """
+        Drop every block of a file, used once the file is closed or removed.
+        """
+        with self.lock:
+            for segment in self.segments.values():
+                for key in [key for key in segment if key[0] == path]:
+                    self.size -= segment.pop(key)[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the counters and current usage of the cache.
+        """
+        with self.lock:
+            requests = self.hits + self.misses
+            return {
+                'Hits': self.hits,
+                'Misses': self.misses,
+                'Hit ratio': round(self.hits / requests, 4) if requests else 0.0,
+                'Evictions': self.evictions,
+                'Blocks': sum(len(segment) for segment in self.segments.values()),
+                'Index blocks': len(self.segments[INDEX]),
+                'Size (bytes)': self.size,
+                'Capacity (bytes)': self.capacity,
+            }
+
+# Cache shared by every HFile of the process
+blockCache = BlockCache()
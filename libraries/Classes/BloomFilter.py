@@ -0,0 +1,67 @@
+# Standard library imports
+import hashlib  # Provides the hash function the bit positions are derived from
+import math     # Provides the logarithms used to size the filter
+import struct   # Provides packing of the serialized filter header
+
+# Bloom filter types of a column family
+NONE = 'NONE'      # No Bloom filter
+ROW = 'ROW'        # Filter on row keys
+ROWCOL = 'ROWCOL'  # Filter on row key and column pairs
+BLOOM_TYPES = [NONE, ROW, ROWCOL]
+
+class BloomFilter:
+    """
+    Probabilistic set of keys: mightContain never answers False for a key that was added,
+    so a negative answer proves the key is absent without reading any data.
+    """
+    # Serialized header: number of bits, number of hash functions, number of added keys, capacity
+    HEADER = struct.Struct('<QIQQ')
+
+    def __init__(self, capacity: int = 1024, errorRate: float = 0.01) -> None:
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(errorRate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    @staticmethod
+    def key(rowKey: str, column: str = None) -> bytes:
+        if column is None:
+            return rowKey.encode('utf-8')
+        return rowKey.encode('utf-8') + b'\x00' + column.encode('utf-8')
+
+    @staticmethod
+    def hashPair(key: bytes) -> tuple:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+    def positions(self, key: bytes):
+        # Double hashing: the i-th position is h1 + i * h2
+        first, second = self.hashPair(key)
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: bytes) -> None:
+        # Same positions as positions(), set in a plain loop since every written cell goes through here
+        first, second = self.hashPair(key)
+        size, bits = self.size, self.bits
+        for i in range(self.hashes):
+            position = (first + i * second) % size
+            bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def mightContain(self, key: bytes) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.positions(key))
+
+    def isFull(self) -> bool:
+        return self.count > self.capacity
+
+    def toBytes(self) -> bytes:
+        return self.HEADER.pack(self.size, self.hashes, self.count, self.capacity) + bytes(self.bits)
+
+    @classmethod
+    def fromBytes(cls, data: bytes) -> 'BloomFilter':
+        bloom = cls.__new__(cls)
+        bloom.size, bloom.hashes, bloom.count, bloom.capacity = cls.HEADER.unpack_from(data)
+        bloom.bits = bytearray(data[cls.HEADER.size:])
+        return bloom
@@ -0,0 +1,159 @@
+# Standard library imports
+import heapq  # Provides the k-way merge of the sorted runs
+import os  # Provides the paths of the run files and of the manifest
+import pickle  # Provides the serialization of the runs and of the manifest
+import shutil  # Provides the removal of the spill directory
+import tempfile  # Provides the spill directory and the run files
+import time  # Provides the timestamp of the loaded cells
+import uuid  # Provides unique store file names
+from bisect import bisect_right  # Provides the region of every row key
+from itertools import groupby  # Provides grouping of the sorted cells by family, region and cell
+from operator import itemgetter  # Provides fast access to the fields of a cell
+
+# Typing imports for type hinting
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Local application/library specific imports
+from .KeyValue import PUT
+from .StoreFile import StoreFile
+from .HFile import checkKeyLength
+from .BulkReader import Row
+from .Classes import convertValue
+
+# Number of cells sorted in memory before they are spilled to a run file on disk.
+SPILL_SIZE = 1000000
+# Number of cells pickled together in a run file.
+RUN_BATCH_SIZE = 10000
+# File describing the store files of a prepared bulk load, written once every store file is complete.
+MANIFEST = 'bulkload.manifest'
+
+def spill(cells: List[tuple], directory: str) -> str:
+    """
+    Sort cells and write them to a new run file in directory, returning its path.
+    """
+    cells.sort()
+    descriptor, path = tempfile.mkstemp(suffix='.run', dir=directory)
+    with os.fdopen(descriptor, 'wb') as file:
+        for start in range(0, len(cells), RUN_BATCH_SIZE):
+            pickle.dump(cells[start:start + RUN_BATCH_SIZE], file, protocol=pickle.HIGHEST_PROTOCOL)
+    return path
+
+def readRun(path: str) -> Iterator[tuple]:
+    with open(path, 'rb') as file:
+        while True:
+            try:
+                batch = pickle.load(file)
+            except EOFError:
+                return
+            yield from batch
+
+def externalSort(cells: Iterable[tuple], directory: str, spillSize: int = SPILL_SIZE) -> Iterator[tuple]:
+    """
+    Sort cells that may not fit in memory: sorted runs of spillSize cells are spilled to
+    directory and merged back, so at most spillSize cells are held in memory.
+    """
+    runs = []
+    buffer = []
+    for cell in cells:
+        buffer.append(cell)
+        if len(buffer) >= spillSize:
+            runs.append(spill(buffer, directory))
+            buffer = []
+    if not runs:
+        buffer.sort()
+        yield from buffer
+        return
+    if buffer:
+        runs.append(spill(buffer, directory))
+    yield from heapq.merge(*(readRun(path) for path in runs))
+
+def prepareBulkLoad(rows: Iterator[Row], output: str, families: Dict[str, Tuple[str, str]], splitKeys: List[str] = (),
+                    table: str = None, timestamp: float = None, spillSize: int = SPILL_SIZE,
+                    columnTypes: Dict[str, Dict[str, str]] = None) -> Dict[str, Any]:
+    """
+    Write the rows as finished store files in output, one per column family and region, without
+    touching the table, and describe them in a manifest the table can attach them from.
+
+    Parameters:
+        rows (Iterator[Row]): The rows to load; a later value of the same cell replaces an earlier one.
+        output (str): The directory the store files and the manifest are written to.
+        families (Dict[str, Tuple[str, str]]): The Bloom filter type and compression of every column family.
+        splitKeys (List[str]): The start keys of the regions of the table after the first one.
+        table (str, optional): The table the files are prepared for, recorded in the manifest.
+        timestamp (float, optional): The timestamp of every cell; the time of the load if omitted.
+        spillSize (int): The number of cells sorted in memory before they are spilled to disk.
+        columnTypes (Dict[str, Dict[str, str]], optional): The declared column types of every column family.
+
+    Returns:
+        Dict[str, Any]: The manifest, with the table, the number of rows read and the (family, StoreFile) pairs written.
+
+    Raises:
+        ValueError: If a row has a column family the table does not have, a row key or column is too long,
+                    or a value does not match its column type.
+    """
+    timestamp = timestamp if timestamp is not None else time.time()
+    os.makedirs(output, exist_ok=True)
+    spillDirectory = tempfile.mkdtemp(prefix='runs-', dir=output)
+    columnTypes = columnTypes or {}
+    counts = {family: 0 for family in families}
+    loaded = 0
+
+    def cells():
+        # The sequence number, negated, orders the later values of a cell first
+        nonlocal loaded
+        sequence = 0
+        for _, rowKey, rowFamilies in rows:
+            loaded += 1
+            checkKeyLength('row key', rowKey)
+            for family, values in rowFamilies.items():
+                if family not in families:
+                    raise ValueError(f"The column family '{family}' does not exist.")
+                types = columnTypes.get(family, {})
+                for column, value in values.items():
+                    checkKeyLength('column', column)
+                    if column in types:
+                        value = convertValue(value, types[column])
+                    sequence += 1
+                    counts[family] += 1
+                    yield family, rowKey, str(column), -sequence, value if not isinstance(value, list) else str(value)
+
+    files = []
+    try:
+        # Cells come out sorted by family, then row key and column, so every store file is written in one pass
+        for family, familyCells in groupby(externalSort(cells(), spillDirectory, spillSize), key=itemgetter(0)):
+            bloomType, compression = families[family]
+            for _, regionCells in groupby(familyCells, key=lambda cell: bisect_right(splitKeys, cell[1])):
+                keyValues = ((rowKey, column, timestamp, PUT, value)
+                             for (_, rowKey, column), versions in groupby(regionCells, key=itemgetter(0, 1, 2))
+                             for _, _, _, _, value in [next(versions)])
+                storeFile = StoreFile.write(output, f'{family}/{uuid.uuid4().hex}.hfile', keyValues, bloomType, counts[family], compression)
+                if storeFile is not None:
+                    files.append((family, storeFile))
+    finally:
+        shutil.rmtree(spillDirectory, ignore_errors=True)
+
+    manifest = {'table': table, 'timestamp': timestamp, 'rows': loaded, 'files': files}
+    path = os.path.join(output, MANIFEST)
+    # Write to a temporary file first so only a complete bulk load has a manifest.
+    with open(f"{path}.tmp", 'wb') as file:
+        pickle.dump(manifest, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(f"{path}.tmp", path)
+    return manifest
+
+def readManifest(output: str) -> Dict[str, Any]:
+    """
+    Read the manifest of a prepared bulk load, opening its store files from output.
+
+    Raises:
+        ValueError: If output holds no complete bulk load.
+    """
+    path = os.path.join(output, MANIFEST)
+    if not os.path.exists(path):
+        raise ValueError(f"No prepared bulk load found in '{output}'.")
+    with open(path, 'rb') as file:
+        manifest = pickle.load(file)
+    for _, storeFile in manifest['files']:
+        storeFile.open(output)
+    return manifest
@@ -0,0 +1,105 @@
+# Standard library imports
+import csv  # Provides the incremental reader of CSV files
+import json  # Provides the decoding of every JSON Lines record
+import os  # Provides the extension of the file to read
+
+# Typing imports for type hinting
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+# Number of rows read before they are inserted together.
+CHUNK_SIZE = 10000
+
+# A row read from a file: the table, the row key and the values by column family and column.
+Row = Tuple[str, str, Dict[str, Dict[str, Any]]]
+
+def readJsonLines(file: Iterable[str]) -> Iterator[Row]:
+    """
+    Read rows from JSON Lines where every line has the shape of an insert_many file,
+    e.g. {"pokemon": {"pokemon_201": {"basic_info": {"name": "x"}}}}.
+
+    Raises:
+        ValueError: If a line is not a JSON object of that shape.
+    """
+    for number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {number}: {e}")
+        if not isinstance(record, dict) or not all(isinstance(rows, dict) for rows in record.values()):
+            raise ValueError(f"Invalid record on line {number}, expected {{table: {{row key: {{column family: {{column: value}}}}}}}}.")
+        for table, rows in record.items():
+            for rowKey, families in rows.items():
+                yield table, str(rowKey), families
+
+def readCsv(file: Iterable[str], table: str, parseValue=lambda value: value) -> Iterator[Row]:
+    """
+    Read rows from CSV whose first column is the row key and whose other columns are named
+    family:column. Empty fields are skipped.
+
+    Parameters:
+        file (Iterable[str]): The lines of the file.
+        table (str): The table every row is inserted into.
+        parseValue (callable): Converts the fields the way put converts the values it is given.
+
+    Raises:
+        ValueError: If a column of the header is not of the form family:column.
+    """
+    reader = csv.reader(file)
+    header = next(reader, None)
+    if header is None:
+        return
+    columns = []
+    for name in header[1:]:
+        family, separator, column = name.partition(':')
+        if not separator or not family or not column:
+            raise ValueError(f"Invalid CSV column '{name}', expected family:column.")
+        columns.append((family, column))
+    for fields in reader:
+        if not fields:
+            continue
+        families: Dict[str, Dict[str, Any]] = {}
+        for (family, column), field in zip(columns, fields[1:]):
+            if field != '':
+                families.setdefault(family, {})[column] = parseValue(field)
+        yield table, fields[0], families
+
+def readFile(path: str, read) -> Iterator[Row]:
+    # The file stays open only while its rows are being consumed
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        yield from read(file)
+
+def readRows(path: str, table: str = None, parseValue=lambda value: value) -> Iterator[Row]:
+    """
+    Lazily read the rows of a .jsonl/.ndjson or .csv file, choosing the format from its extension.
+
+    Raises:
+        ValueError: If the format is not supported, or a CSV file is read without a table.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return readFile(path, readJsonLines)
+    if extension == '.csv':
+        if not table:
+            raise ValueError("A table is required to load a CSV file.")
+        return readFile(path, lambda file: readCsv(file, table, parseValue))
+    raise ValueError(f"Unsupported file '{path}', expected a .jsonl, .ndjson or .csv file.")
+
+def chunks(rows: Iterator[Row], size: int = CHUNK_SIZE) -> Iterator[Dict[str, Dict[str, Dict[str, Dict[str, Any]]]]]:
+    """
+    Group rows into {table: {row key: {column family: {column: value}}}} chunks of at most size rows,
+    so only one chunk is held in memory at a time.
+    """
+    chunk: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = {}
+    count = 0
+    for table, rowKey, families in rows:
+        row = chunk.setdefault(table, {}).setdefault(rowKey, {})
+        for family, values in families.items():
+            row.setdefault(family, {}).update(values)
+        count += 1
+        if count >= size:
+            yield chunk
+            chunk, count = {}, 0
+    if chunk:
+        yield chunk
@@ -1,100 +1,195 @@
 import datetime
+from array import array
+import heapq
+import re
 import uuid
-from typing import Dict, List, Any
+from bisect import bisect_left, bisect_right
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+import numpy as np
 import pandas as pd
 import tabulate
 
-class IndexedNode:
-    def __init__(self, value):
-        self.value = value
-        self.left = None
-        self.right = None
-
-    def searchNode(self, rowKey):
-        if self.value.rowKey == rowKey:
-            return self.value
-        if rowKey < self.value.rowKey:
-            if self.left is None:
-                return None
-            return self.left.searchNode(rowKey)
-        if self.right is None:
-            return None
-        return self.right.searchNode(rowKey)
+from .KeyValue import KeyValue, PUT, DELETE_VERSION, DELETE_ROW, keyValueOrder, mergeKeyValues, resolveKeyValues, retainVersions, reverseRows, selectVersions
+from .StoreFile import StoreFile
+from .BloomFilter import BloomFilter, BLOOM_TYPES, NONE as BLOOM_NONE, ROW, ROWCOL
+from .HFile import COMPRESSION_TYPES, COMPRESSION_NONE, checkKeyLength
+from .SortedIndex import SortedIndex
+from .SecondaryIndex import SecondaryIndex
+from .Filter import Filter
+from .ResultBuilder import ResultBuilder, typedArray
+from .Aggregation import AGGREGATES, AggregateState
 
-class IndexTree:
-    def __init__(self, cellList:List['Cell']):
-        self.sortedCellList = sorted(cellList, key=lambda x: x.rowKey)
-        self.root = IndexedNode(self.sortedCellList[len(self.sortedCellList)//2])
-        self.root = self.createIndexNode(self.sortedCellList)
+def parseValue(value: str):
+    # Values given as text are stored as numbers or booleans when they look like one
+    if value.isdigit():
+        return int(value)
+    elif value.replace('.','',1).isdigit():
+        return float(value)
+    elif value.lower() == 'true' or value.lower() == 'false':
+        return value.lower() == 'true'
+    return value
 
-    def createIndexNode(self, cellList:List['Cell']):
-        if len(cellList) == 0:
-            return None
-        mid = len(cellList)//2
-        root = IndexedNode(cellList[mid])
-        root.left = self.createIndexNode(cellList[:mid])
-        root.right = self.createIndexNode(cellList[mid+1:])
-        return root
-    
-    def search(self, rowKey):
-        return self.searchNode(self.root, rowKey)
-    
-    def searchNode(self, node, rowKey):
-        if node is None:
-            return None
-        if node.value.rowKey == rowKey:
-            return node.value
-        if rowKey < node.value.rowKey:
-            return self.searchNode(node.left, rowKey)
-        return self.searchNode(node.right, rowKey)
-    
-    def add(self, rowKey:'Cell'):
-        self.root = self.addNode(self.root, rowKey)
-    
-    def addNode(self, rowKey:'Cell',  node=None):
-        if node is None:
-            return IndexedNode(rowKey)
-        if rowKey < node.value.rowKey:
-            node.left = self.addNode(node.left, rowKey)
-        elif rowKey > node.value.rowKey:
-            node.right = self.addNode(node.right, rowKey)
-        return node
+# Types a column can be declared with, and the array type code their values are stored with
+# (string columns keep a list of Python objects).
+COLUMN_TYPES = {'int64': 'q', 'float64': 'd', 'bool': 'b', 'string': None}
+
+def convertValue(value, columnType: str):
+    """
+    Convert a value, given as text or not, to the declared type of its column.
+
+    Raises:
+        ValueError: If the value cannot be represented in the type.
+    """
+    if columnType == 'string':
+        return value if isinstance(value, str) else str(value)
+    if columnType == 'bool':
+        if isinstance(value, bool):
+            return value
+        if str(value).strip().lower() in ('true', '1'):
+            return True
+        if str(value).strip().lower() in ('false', '0'):
+            return False
+    elif columnType == 'int64' and not isinstance(value, bool):
+        converted = None
+        if isinstance(value, int):
+            converted = value
+        elif isinstance(value, float) and value.is_integer():
+            converted = int(value)
+        elif isinstance(value, str) and re.fullmatch(r'\s*[+-]?\d+\s*', value):
+            converted = int(value)
+        if converted is not None and -2**63 <= converted < 2**63:
+            return converted
+    elif columnType == 'float64' and not isinstance(value, bool):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            pass
+    raise ValueError(f"Invalid {columnType} value '{value}'.")
 
 class Column:
-    def __init__(self, name, rows: Dict[str, Any]={}, indexed=False):
+    def __init__(self, name, rows: Dict[str, Any]={}, indexed=True, columnType: str = None):
         self.name = name
-        self.rows: List['Cell'] = [Cell(rows[rowKey], rowKey) for rowKey in rows]
+        # Declared type of the values (any value if None); numeric and boolean values are stored
+        # unboxed, 8 bytes (1 for booleans) each
+        self.columnType = columnType
+        # Every version stored in the column lives in parallel arrays: its timestamp, its value and
+        # the position of the previous version of the same cell (-1 for the oldest one)
+        self.timestamps = array('d')
+        self.values = self.emptyValues()
+        self.previous = array('q')
+        # Position of the newest version of every row, so lookups, inserts and deletes are O(1)
+        # and rows keep their insertion order
+        self.rows: Dict[str, int] = {}
+        # Number of deleted versions still taking up a position in the arrays
+        self.garbage = 0
         self.indexed = indexed
-        self.tree = None if not indexed else IndexTree(self.rows)
+        # Row keys in order, kept up to date on every insert and delete
+        self.index = SortedIndex()
+        for rowKey in rows:
+            self.insertRow(rowKey, rows[rowKey])
+
+    def __setstate__(self, state):
+        # Columns pickled before the version arrays existed keep Cell objects, in a list or by row key
+        if 'timestamps' not in state:
+            cells = state['rows'] if isinstance(state['rows'], list) else list(state['rows'].values())
+            self.__init__(state['name'], indexed=state.get('indexed', True))
+            for cell in cells:
+                for timestamp, value in cell.versions():
+                    self.insertRow(cell.rowKey, value, timestamp)
+            return
+        # Columns pickled before column types existed hold any value
+        state.setdefault('columnType', None)
+        self.__dict__.update(state)
+
+    def emptyValues(self):
+        typeCode = COLUMN_TYPES.get(self.columnType)
+        return array(typeCode) if typeCode is not None else []
+
+    def value(self, position):
+        value = self.values[position]
+        return bool(value) if self.columnType == 'bool' else value
+
+    def valueArray(self, startKey=None, stopKey=None) -> np.ndarray:
+        """
+        Return the newest value of every row, or of the rows in [startKey, stopKey), as a NumPy array.
+        Numeric and boolean columns are read straight from their buffer without creating Python objects.
+        """
+        if startKey is None and stopKey is None:
+            positions = np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+        else:
+            positions = np.fromiter((self.rows[rowKey] for rowKey in self.rowKeys(startKey, stopKey)), dtype=np.int64)
+        if isinstance(self.values, array):
+            # Indexing copies the selected values out of the buffer, so the column can keep growing
+            values = np.frombuffer(self.values, dtype=self.values.typecode)[positions]
+            return values.astype(np.bool_) if self.columnType == 'bool' else values
+        return typedArray([self.values[position] for position in positions])
+
+    def convertedRows(self, columnType: str) -> List[tuple]:
+        # Every version converted to a new type, raising before anything is changed
+        return [(rowKey, [(timestamp, convertValue(value, columnType)) for timestamp, value in self.versions(rowKey)])
+                for rowKey in self.rows]
+
+    def setType(self, columnType: str, rows: List[tuple] = None):
+        """
+        Declare the type of the column and convert the versions it holds.
+
+        Raises:
+            ValueError: If a stored value cannot be converted.
+        """
+        rows = rows if rows is not None else self.convertedRows(columnType)
+        self.columnType = columnType
+        self.rebuild(rows)
 
     def setIndexed(self, indexed=False):
+        # The index is always maintained, so toggling the flag never rebuilds it
         self.indexed = indexed
-        if self.indexed:
-            self.tree = IndexTree(self.rows)
-        else:
-            self.tree = None
+
+    def rowKeys(self, startKey=None, stopKey=None, reverse=False) -> Iterator[str]:
+        return self.index.irange(startKey, stopKey, reverse)
+
+    def positions(self, rowKey) -> List[int]:
+        # Positions of the versions of a row, from the oldest timestamp to the newest
+        positions = []
+        position = self.rows.get(rowKey, -1)
+        while position != -1:
+            positions.append(position)
+            position = self.previous[position]
+        positions.reverse()
+        return positions
+
+    def versions(self, rowKey) -> List[tuple]:
+        return [(self.timestamps[position], self.value(position)) for position in self.positions(rowKey)]
 
     def searchRow(self, rowKey):
-        if self.indexed:
-            return self.tree.search(rowKey)
-        for cell in self.rows:
-            if cell.rowKey == rowKey:
-                return cell
-        return None
+        # Cells are only materialized as views when asked for
+        if rowKey not in self.rows:
+            return None
+        return Cell.fromVersions(rowKey, self.versions(rowKey))
 
-    def insertRow(self, rowKey, value):
-        row = self.searchRow(rowKey)
-        if row:
-            row.update(value)
+    def insertRow(self, rowKey, value, timestamp:float=None):
+        position = len(self.timestamps)
+        timestamp = timestamp if timestamp is not None else datetime.datetime.now().timestamp()
+        self.timestamps.append(timestamp)
+        self.values.append(value if not isinstance(value, list) else str(value))
+        newest = self.rows.get(rowKey, -1)
+        if newest == -1 or self.timestamps[newest] <= timestamp:
+            self.previous.append(newest)
+            if newest == -1:
+                self.index.add(rowKey)
+            self.rows[rowKey] = position
         else:
-            newVal=Cell(value, rowKey)
-            self.rows.append(newVal)
-            if self.indexed:
-                self.tree.add(newVal)
+            # An older timestamp is linked in behind the newer versions, so every cell stays ordered by timestamp
+            newer = newest
+            while self.previous[newer] != -1 and self.timestamps[self.previous[newer]] > timestamp:
+                newer = self.previous[newer]
+            self.previous.append(self.previous[newer])
+            self.previous[newer] = position
         
 
     def obtainColumnInfoWithMetadata(self, versions:int=1, version:float=None):
-        data = [ [rowKey.rowKey]+ ver for rowKey in self.rows for ver in rowKey.obtainNVersions(versions, version)]
+        data = [ [rowKey]+ ver for rowKey in self.rows for ver in self.searchRow(rowKey).obtainNVersions(versions, version)]
         return data
     
     def obtainColumnInfoWithMetadataRowkey(self, rowKey, versions:int=1, version:float=None):
@@ -106,48 +201,356 @@ class Column:
         return data
 
     def obtainColumnInfo(self):
-        data = {rowKey.rowKey: rowKey.getActualValue() for rowKey in self.rows}
+        data = {rowKey: self.value(position) for rowKey, position in self.rows.items()}
         return data
     
-    def insertOrUpdateRow(self, rowKey, value):
-        row = self.searchRow(rowKey)
-        if row:
-            row.update(value)
-        else:
-            self.insertRow(rowKey, value)
+    def insertOrUpdateRow(self, rowKey, value, timestamp:float=None):
+        self.insertRow(rowKey, value, timestamp)
         return True
-    
-    def maxNumberOfVersions(self):
-        if len(self.rows) == 0:
-            return 0
-        return max([rowKey.tiemsStamp() for rowKey in self.rows])
-    
-    def minNumberOfVersions(self):
-        if len(self.rows) == 0:
-            return 0
-        return min([rowKey.tiemsStamp() for rowKey in self.rows])
 
+    def deleteVersion(self, rowKey, timestamp:float):
+        if rowKey not in self.rows:
+            raise KeyError(rowKey)
+        found = False
+        newer = -1
+        position = self.rows[rowKey]
+        while position != -1 and self.timestamps[position] >= timestamp:
+            if self.timestamps[position] == timestamp:
+                # Unlink the version from its cell
+                if newer == -1:
+                    self.rows[rowKey] = self.previous[position]
+                else:
+                    self.previous[newer] = self.previous[position]
+                self.release([position])
+                found = True
+                break
+            newer, position = position, self.previous[position]
+        # If the row is empty after removing the value, delete the row
+        if self.rows[rowKey] == -1:
+            del self.rows[rowKey]
+            self.index.remove(rowKey)
+        self.compactArrays()
+        return found
+
+    def deleteRow(self, rowKey):
+        if rowKey not in self.rows:
+            return False
+        self.release(self.positions(rowKey))
+        del self.rows[rowKey]
+        self.index.remove(rowKey)
+        self.compactArrays()
+        return True
+
+    def pruneRow(self, rowKey, maxVersions=None, minVersions=0, expiredBefore=None):
+        # Drop the versions of a row beyond the newest maxVersions and those older than expiredBefore,
+        # keeping at least the newest minVersions
+        if maxVersions is None and expiredBefore is None:
+            return
+        positions = self.positions(rowKey)
+        if (maxVersions is None or len(positions) <= maxVersions) and \
+                (expiredBefore is None or min(self.timestamps[position] for position in positions) >= expiredBefore):
+            return
+        kept = set()
+        for count, position in enumerate(sorted(positions, key=self.timestamps.__getitem__, reverse=True), 1):
+            if maxVersions is not None and count > maxVersions:
+                break
+            if expiredBefore is not None and self.timestamps[position] < expiredBefore and count > minVersions:
+                break
+            kept.add(position)
+        self.release([position for position in positions if position not in kept])
+        # Relink the remaining versions in their insertion order
+        newer = -1
+        for position in positions:
+            if position in kept:
+                self.previous[position] = newer
+                newer = position
+        if newer == -1:
+            del self.rows[rowKey]
+            self.index.remove(rowKey)
+        else:
+            self.rows[rowKey] = newer
+        self.compactArrays()
+
+    def release(self, positions):
+        # Released values of typed arrays stay in place until the arrays are compacted
+        if not isinstance(self.values, array):
+            for position in positions:
+                self.values[position] = None
+        self.garbage += len(positions)
+
+    def compactArrays(self):
+        # Rewrite the arrays once deleted versions take up more than half of them
+        if self.garbage * 2 <= len(self.timestamps):
+            return
+        self.rebuild([(rowKey, self.versions(rowKey)) for rowKey in self.rows])
+
+    def rebuild(self, rows: List[tuple]):
+        self.timestamps, self.values, self.previous, self.rows, self.garbage = array('d'), self.emptyValues(), array('q'), {}, 0
+        for rowKey, versions in rows:
+            for timestamp, value in versions:
+                self.previous.append(self.rows.get(rowKey, -1))
+                self.rows[rowKey] = len(self.timestamps)
+                self.timestamps.append(timestamp)
+                self.values.append(value)
+
+    def clear(self):
+        self.timestamps = array('d')
+        self.values = self.emptyValues()
+        self.previous = array('q')
+        self.rows = {}
+        self.garbage = 0
+        self.index.clear()
 
 class ColumnFamily:
-    def __init__(self, name: str, columns:List[str]=[], indexed=False):
+    # Approximate MemStore size in bytes after which it is flushed to a new store file
+    MEMSTORE_FLUSH_SIZE = 1024 * 1024
+    # Number of store files that triggers a minor compaction
+    COMPACTION_THRESHOLD = 3
+    # A store file is only merged when it is at most this many times larger than the newer ones
+    COMPACTION_RATIO = 1.2
+
+    def __init__(self, name: str, columns:List[str]=[], indexed=True):
         self.name = name
-        self.columns = {column:Column(column) for column in columns}
+        # The columns and their cells form the MemStore of the family
+        self.columns = {column:Column(column, indexed=indexed) for column in columns}
         self.isIndexed = indexed
+        # Delete markers for data that already lives in store files
+        self.deleteMarkers: List[KeyValue] = []
+        self.memstoreSize = 0
+        # Immutable store files, oldest first
+        self.storeFiles: List[StoreFile] = []
+        # Bloom filter of the MemStore; every store file carries its own
+        self.bloomFilterType = ROW
+        self.bloom = BloomFilter()
+        # Codec compressing the data blocks of new store files
+        self.compression = COMPRESSION_NONE
+        # Versions kept for every cell (all of them if None), versions kept once expired and their
+        # time to live in seconds (forever if None)
+        self.maxVersions = None
+        self.minVersions = 0
+        self.ttl = None
+        # Declared types of columns, by column name; undeclared columns hold any value
+        self.columnTypes: Dict[str, str] = {}
 
-        if indexed:
-            for column in self.columns:
-                self.columns[column].setIndexed()
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # Families pickled before store files existed keep all their data in the MemStore
+        if 'storeFiles' not in state:
+            self.deleteMarkers = []
+            self.storeFiles = []
+            self.memstoreSize = sum(len(rowKey) + len(column.name) + 8 + len(str(value))
+                                    for column in self.columns.values() for rowKey in column.rows for _, value in column.versions(rowKey))
+        # Families pickled before Bloom filters existed
+        if 'bloomFilterType' not in state:
+            self.bloomFilterType = ROW
+            self.rebuildBloom()
+        # Families pickled before block compression existed
+        if 'compression' not in state:
+            self.compression = COMPRESSION_NONE
+        # Families pickled before version limits existed keep every version
+        if 'maxVersions' not in state:
+            self.maxVersions = None
+            self.minVersions = 0
+            self.ttl = None
+        # Families pickled before column types existed
+        if 'columnTypes' not in state:
+            self.columnTypes = {}
 
     def insertColumn(self, column: str):
-        self.columns[column] = Column(column)
+        self.columns[column] = Column(column, indexed=self.isIndexed, columnType=self.columnTypes.get(column))
+
+    def typedValue(self, column, value, text=False):
+        # Values of typed columns are converted to their type; others are parsed when given as text
+        if column in self.columnTypes:
+            try:
+                return convertValue(value, self.columnTypes[column])
+            except ValueError as e:
+                raise ValueError(f"{e} Column '{self.columnLabel(column)}' is {self.columnTypes[column]}.")
+        return parseValue(value) if text else value
+
+    def trackMemstoreSize(self, rowKey, column, value):
+        self.memstoreSize += len(rowKey) + len(column) + 8 + len(str(value))
+
+    def addToBloom(self, rowKey, column):
+        if self.bloom is None:
+            return
+        if self.bloom.isFull():
+            self.rebuildBloom(self.bloom.capacity * 2)
+        self.bloom.add(BloomFilter.key(rowKey, column if self.bloomFilterType == ROWCOL else None))
+
+    def rebuildBloom(self, capacity=1024):
+        """
+        Rebuild the MemStore Bloom filter from the cells it holds, large enough for at least capacity keys.
+        """
+        if self.bloomFilterType == BLOOM_NONE:
+            self.bloom = None
+            return
+        if self.bloomFilterType == ROWCOL:
+            keys = {BloomFilter.key(rowKey, column.name) for column in self.columns.values() for rowKey in column.rows}
+        else:
+            keys = {BloomFilter.key(rowKey) for column in self.columns.values() for rowKey in column.rows}
+        self.bloom = BloomFilter(max(capacity, 2 * len(keys)))
+        for key in keys:
+            self.bloom.add(key)
+
+    def setBloomFilterType(self, bloomFilterType: str):
+        if bloomFilterType.upper() not in BLOOM_TYPES:
+            raise ValueError(f"Invalid Bloom filter type '{bloomFilterType}', expected one of {BLOOM_TYPES}.")
+        self.bloomFilterType = bloomFilterType.upper()
+        self.rebuildBloom()
+
+    def setCompression(self, compression: str):
+        # Existing store files keep their codec until they are compacted
+        if compression.upper() not in COMPRESSION_TYPES:
+            raise ValueError(f"Invalid compression '{compression}', expected one of {COMPRESSION_TYPES}.")
+        self.compression = compression.upper()
+
+    @staticmethod
+    def parseVersions(value, minimum=1):
+        try:
+            versions = int(value)
+        except (TypeError, ValueError):
+            versions = None
+        if versions is None or versions < minimum:
+            raise ValueError(f"Invalid number of versions '{value}', expected an integer of at least {minimum}.")
+        return versions
+
+    @staticmethod
+    def parseTtl(value):
+        # A time to live in seconds, or FOREVER
+        if str(value).upper() == 'FOREVER':
+            return None
+        try:
+            ttl = float(value)
+        except (TypeError, ValueError):
+            ttl = None
+        if ttl is None or ttl <= 0:
+            raise ValueError(f"Invalid TTL '{value}', expected a number of seconds or FOREVER.")
+        return ttl
+
+    @staticmethod
+    def parseTypes(value) -> List[Tuple[Optional[str], str, str]]:
+        """
+        Parse column types given as {column: type}, or as 'family:column:type' or 'column:type' entries
+        in a list or a comma separated text, into (family or None for every family, column, type) tuples.
+
+        Raises:
+            ValueError: If an entry or a type is not valid.
+        """
+        if isinstance(value, dict):
+            entries = [(None, str(column), str(columnType)) for column, columnType in value.items()]
+        else:
+            entries = []
+            for entry in value.split(',') if isinstance(value, str) else value:
+                parts = str(entry).strip().split(':')
+                if len(parts) not in (2, 3) or not all(parts):
+                    raise ValueError(f"Invalid column type '{entry}', expected family:column:type or column:type.")
+                entries.append((parts[0], parts[1], parts[2]) if len(parts) == 3 else (None, parts[0], parts[1]))
+        for _, column, columnType in entries:
+            if columnType.lower() not in COLUMN_TYPES:
+                raise ValueError(f"Invalid type '{columnType}' for column '{column}', expected one of {list(COLUMN_TYPES)}.")
+        return [(family, column, columnType.lower()) for family, column, columnType in entries]
+
+    def convertColumnTypes(self, value) -> tuple:
+        """
+        Parse the column types of this family and convert the versions of those columns held in the
+        MemStore, without changing anything yet.
+
+        Returns:
+            tuple: The column types and the converted versions, to be passed to setColumnTypes.
+
+        Raises:
+            ValueError: If a type is not valid or a value in the MemStore cannot be converted.
+        """
+        columnTypes = {column: columnType for family, column, columnType in self.parseTypes(value) if family is None or family == self.name}
+        converted = {}
+        for column, columnType in columnTypes.items():
+            if column in self.columns:
+                try:
+                    converted[column] = self.columns[column].convertedRows(columnType)
+                except ValueError as e:
+                    raise ValueError(f"{e} Column '{self.columnLabel(column)}' cannot be {columnType}.")
+        return columnTypes, converted
+
+    def setColumnTypes(self, columnTypes: Dict[str, str], converted: Dict[str, List[tuple]]):
+        """
+        Declare the types of columns, replacing the MemStore versions by their converted values. Store
+        files keep the values they were written with.
+        """
+        self.columnTypes.update(columnTypes)
+        for column, columnType in columnTypes.items():
+            if column in self.columns:
+                self.columns[column].setType(columnType, converted[column])
+
+    def setVersions(self, maxVersions=None, minVersions=None, ttl=None):
+        # Versions beyond the new limits are dropped on their next write, flush or compaction
+        if maxVersions is not None:
+            self.maxVersions = self.parseVersions(maxVersions)
+        if minVersions is not None:
+            self.minVersions = self.parseVersions(minVersions, minimum=0)
+        if ttl is not None:
+            self.ttl = self.parseTtl(ttl)
+
+    def memstoreOnly(self):
+        # Every visible value is in the MemStore as stored: no store files, delete markers or expiring versions
+        return not self.storeFiles and not self.deleteMarkers and self.ttl is None
+
+    def expiredBefore(self):
+        if self.ttl is None:
+            return None
+        return datetime.datetime.now().timestamp() - self.ttl
+
+    def retain(self, keyValues: Iterator[KeyValue]) -> Iterator[KeyValue]:
+        return retainVersions(keyValues, self.maxVersions, self.minVersions, self.expiredBefore())
+
+    def configure(self, options: Dict[str, Any]):
+        """
+        Apply column family settings given in create or alter, e.g. {'bloom': 'ROWCOL', 'compression': 'ZLIB',
+        'versions': 3, 'min_versions': 1, 'ttl': 86400, 'types': ['hp:int64', 'name:string']}.
+        """
+        for option, value in options.items():
+            if option == 'bloom':
+                self.setBloomFilterType(value)
+            elif option == 'compression':
+                self.setCompression(value)
+            elif option == 'versions':
+                self.setVersions(maxVersions=value)
+            elif option == 'min_versions':
+                self.setVersions(minVersions=value)
+            elif option == 'ttl':
+                self.setVersions(ttl=value)
+            elif option == 'types':
+                self.setColumnTypes(*self.convertColumnTypes(value))
+            else:
+                raise ValueError(f"Unknown column family setting '{option}'.")
+
+    def pruneRow(self, rowKey, column):
+        self.columns[column].pruneRow(rowKey, self.maxVersions, self.minVersions, self.expiredBefore())
     
-    def insertRow(self, rowKey, values: Dict[str, Any]):
+    @staticmethod
+    def checkKeys(rowKey, columns):
+        # Keys too long for a store file entry are rejected before they are written anywhere
+        checkKeyLength('row key', rowKey)
+        for column in columns:
+            checkKeyLength('column', column)
+
+    def insertRow(self, rowKey, values: Dict[str, Any], timestamp:float=None):
+        # Check the keys and convert every value first, so an invalid row is not partially inserted
+        self.checkKeys(rowKey, values)
+        values = {column: self.typedValue(column, value) for column, value in values.items()}
         for column in values:
             if column in self.columns:
-                self.columns[column].insertRow(rowKey, values[column])
+                self.columns[column].insertRow(rowKey, values[column], timestamp)
             else:
                 self.insertColumn(column)
-                self.columns[column].insertRow(rowKey, values[column])
+                self.columns[column].insertRow(rowKey, values[column], timestamp)
+            self.pruneRow(rowKey, column)
+            self.trackMemstoreSize(rowKey, column, values[column])
+            if self.bloomFilterType == ROWCOL:
+                self.addToBloom(rowKey, column)
+        # A row Bloom filter takes the row key once, not once per column
+        if values and self.bloomFilterType != ROWCOL:
+            self.addToBloom(rowKey, None)
 
     def searchRow(self, rowKey, column=None):
         if column is None:
@@ -166,114 +569,354 @@ class ColumnFamily:
         for column in self.columns:
             self.columns[column].setIndexed(self.isIndexed)
 
+    def columnLabel(self, column):
+        return f'{self.name}{':' if self.name != '' else ''}{column}'
+
+    def memstoreMightContain(self, rowKey, column=None):
+        if self.bloom is None or (self.bloomFilterType == ROWCOL and column is None):
+            return True
+        return self.bloom.mightContain(BloomFilter.key(rowKey, column if self.bloomFilterType == ROWCOL else None))
+
+    def memstoreKeyValues(self, rowKey=None, column=None) -> List[KeyValue]:
+        """
+        Return the entries held in the MemStore, or only those of one row, sorted with keyValueOrder.
+        """
+        if rowKey is None:
+            keyValues = [(rowKey, column.name, timestamp, PUT, value)
+                         for column in self.columns.values() for rowKey in column.rows for timestamp, value in column.versions(rowKey)]
+            keyValues += self.deleteMarkers
+        else:
+            keyValues = [marker for marker in self.deleteMarkers if marker[0] == rowKey]
+            # Skip probing the columns when the Bloom filter rules the row out
+            if self.memstoreMightContain(rowKey, column):
+                keyValues += [(rowKey, column.name, timestamp, PUT, value)
+                              for column in self.columns.values() for timestamp, value in column.versions(rowKey)]
+        keyValues.sort(key=keyValueOrder)
+        return keyValues
+
+    def keyValues(self, rowKey=None, column=None, timeRange=None) -> Iterator[KeyValue]:
+        """
+        Merge the MemStore with the store files and return the visible puts in row key order.
+
+        Parameters:
+            rowKey (str, optional): Restrict the result to a single row.
+            column (str, optional): The column of interest, letting row+column Bloom filters skip data.
+            timeRange (tuple, optional): Skip the store files holding nothing relevant to [minTimestamp, maxTimestamp).
+        """
+        sources = [self.memstoreKeyValues(rowKey, column)] + [storeFile.keyValues(rowKey, column) for storeFile in self.storeFiles
+                                                              if storeFile.inTimeRange(timeRange)]
+        return self.retain(resolveKeyValues(mergeKeyValues(sources)))
+
+    def multiGet(self, rowKeys: List[str], column=None, timeRange=None) -> Iterator[tuple]:
+        """
+        Yield (rowKey, visible puts of the row) for every one of the sorted rowKeys, walking every
+        store file forward once for the whole batch instead of seeking it once per row.
+        """
+        files = [storeFile.getRows(rowKeys, column) for storeFile in self.storeFiles if storeFile.inTimeRange(timeRange)]
+        heads = [next(rows, None) for rows in files]
+        for rowKey in rowKeys:
+            sources = [self.memstoreKeyValues(rowKey, column)]
+            for index, head in enumerate(heads):
+                # Store files only return keys of the batch, so their next row is never behind
+                if head is not None and head[0] == rowKey:
+                    sources.append(head[1])
+                    heads[index] = next(files[index], None)
+            yield rowKey, list(self.retain(resolveKeyValues(mergeKeyValues(sources))))
+
+    def memstoreScan(self, startRow=None, stopRow=None, reverse=False) -> Iterator[KeyValue]:
+        """
+        Lazily return the MemStore entries of the rows in [startRow, stopRow), seeking through the column indexes.
+        """
+        def columnKeyValues(column: Column):
+            for rowKey in column.rowKeys(startRow, stopRow, reverse):
+                yield from sorted(((rowKey, column.name, timestamp, PUT, value) for timestamp, value in column.versions(rowKey)),
+                                  key=keyValueOrder)
+
+        markers = sorted((marker for marker in self.deleteMarkers
+                          if (startRow is None or marker[0] >= startRow) and (stopRow is None or marker[0] < stopRow)), key=keyValueOrder)
+        sources = [columnKeyValues(column) for column in self.columns.values()]
+        sources.append(reverseRows(markers) if reverse else markers)
+        return mergeKeyValues(sources, reverse)
+
+    def scan(self, startRow=None, stopRow=None, reverse=False, timeRange=None) -> Iterator[KeyValue]:
+        """
+        Return the visible puts of the rows in [startRow, stopRow) without reading the rows outside the range.
+
+        Parameters:
+            startRow (str, optional): The first row to return.
+            stopRow (str, optional): The row to stop before.
+            reverse (bool): Return the rows from the last to the first.
+            timeRange (tuple, optional): Skip the store files holding nothing relevant to [minTimestamp, maxTimestamp).
+        """
+        sources = [self.memstoreScan(startRow, stopRow, reverse)] + [storeFile.scan(startRow, stopRow, reverse) for storeFile in self.storeFiles
+                                                                     if storeFile.inTimeRange(timeRange)]
+        return self.retain(resolveKeyValues(mergeKeyValues(sources, reverse)))
+
+    def rowKeys(self) -> Iterator[str]:
+        return (rowKey for rowKey, _ in groupby(self.keyValues(), key=itemgetter(0)))
+
     def obtainColumnFamilyInfo(self):
         rows = {}
-        for column in self.columns.values():
-            for rowKey in column.obtainColumnInfo():
-                if rowKey not in rows:
-                    rows[rowKey] = {}
-                rows[rowKey][f'{self.name}{':' if self.name != '' else ''}{column.name}'] = column.searchRow(rowKey).getActualValue()
+        for (rowKey, column), keyValues in groupby(self.keyValues(), key=itemgetter(0, 1)):
+            if rowKey not in rows:
+                rows[rowKey] = {}
+            # The first entry of a cell is its most recent version
+            rows[rowKey][self.columnLabel(column)] = next(keyValues)[4]
 
         return rows
     
     def obtainColumnFamilyInfoWithMetadata(self, versions:int=1, version:float=None):
         data = []
-        for column in self.columns.values():
-            metadataColumn = column.obtainColumnInfoWithMetadata(versions, version)
-            # insert the column name in the second position
-            for row in metadataColumn:
-                row.insert(1, f'{self.name}{':' if self.name != '' else ''}{column.name}')
-                data.append(row)
-            data+=metadataColumn
+        for (rowKey, column), keyValues in groupby(self.keyValues(), key=itemgetter(0, 1)):
+            for keyValue in selectVersions(list(keyValues), versions, version):
+                data.append([rowKey, self.columnLabel(column), keyValue[2], keyValue[4]])
 
         return data
     
-    def obtainColumnFamilyInfoRowkeyWithMetadata(self, rowkey, column=None, versions:int=1, version:float=None):
+    def obtainColumnFamilyInfoRowkeyWithMetadata(self, rowkey, column=None, versions:int=1, version:float=None, timeRange=None):
         data = []
-        if column is None:
-            for column in self.columns.values():
-                metadataColumn = column.obtainColumnInfoWithMetadataRowkey(rowkey, versions, version)
-                for row in metadataColumn:
-                    row.insert(1, f'{self.name}{':' if self.name != '' else ''}{column.name}')
-                    data.append(row)
-                data+=metadataColumn
-        else:
-            if column in self.columns:
-                metadataColumn = self.columns[column].obtainColumnInfoWithMetadataRowkey(rowkey, versions, version)
-                for row in metadataColumn:
-                    row.insert(1, f'{self.name}{':' if self.name != '' else ''}{column}')
-                    data.append(row)
-                data+=metadataColumn
+        for (rowKey, cellColumn), keyValues in groupby(self.keyValues(rowkey, column, timeRange), key=itemgetter(0, 1)):
+            if column is not None and cellColumn != column:
+                continue
+            for keyValue in selectVersions(list(keyValues), versions, version, timeRange):
+                data.append([rowKey, self.columnLabel(cellColumn), keyValue[2], keyValue[4]])
         return data
     
-    def insertOrUpdateRow(self, rowKey, column, value:str):
-        saveValue = None
-        if value.isdigit():
-            saveValue = int(value)
-        elif value.replace('.','',1).isdigit():
-            saveValue = float(value)
-        elif value.lower() == 'true' or value.lower() == 'false':
-            saveValue = bool(value)
-        else:
-            saveValue = value
+    def insertOrUpdateRow(self, rowKey, column, value:str, timestamp:float=None):
+        self.checkKeys(rowKey, [column])
+        saveValue = self.typedValue(column, value, text=True)
 
         if column in self.columns:
-            self.columns[column].insertOrUpdateRow(rowKey, saveValue)
+            self.columns[column].insertOrUpdateRow(rowKey, saveValue, timestamp)
         else:
             self.insertColumn(column)
-            self.columns[column].insertOrUpdateRow(rowKey, saveValue)
+            self.columns[column].insertOrUpdateRow(rowKey, saveValue, timestamp)
+        self.pruneRow(rowKey, column)
+        self.trackMemstoreSize(rowKey, column, saveValue)
+        self.addToBloom(rowKey, column)
 
-    def maxNumberOfVersions(self):
-        if len(self.columns) == 0:
-            return 0
-        
-        return max([column.maxNumberOfVersions() for column in self.columns.values()])
-    
-    def minNumberOfVersions(self):
-        if len(self.columns) == 0:
-            return 0
-        return min([column.minNumberOfVersions() for column in self.columns.values()])
+    def deleteVersion(self, rowKey, column, timestamp:float):
+        if column not in self.columns:
+            return False
+        try:
+            if self.columns[column].deleteVersion(rowKey, timestamp):
+                return True
+            rowExists = True
+        except KeyError:
+            rowExists = False
+
+        # The version may live in a store file, where it can only be hidden by a delete marker
+        for keyValue in self.keyValues(rowKey, column):
+            if keyValue[1] == column:
+                rowExists = True
+                if keyValue[2] == timestamp:
+                    self.deleteMarkers.append((rowKey, column, timestamp, DELETE_VERSION, None))
+                    self.trackMemstoreSize(rowKey, column, None)
+                    return True
+        if not rowExists:
+            raise KeyError(rowKey)
+        return False
+
+    def deleteRow(self, rowKey, timestamp:float=None):
+        found = False
+        for column in self.columns.values():
+            if column.deleteRow(rowKey):
+                found = True
+
+        # Hide whatever the store files still hold for the row
+        if any(True for _ in self.keyValues(rowKey)):
+            timestamp = timestamp if timestamp is not None else datetime.datetime.now().timestamp()
+            self.deleteMarkers.append((rowKey, '', timestamp, DELETE_ROW, None))
+            self.trackMemstoreSize(rowKey, '', None)
+            found = True
+        return found
+
+    def needsFlush(self, flushSize=None):
+        return self.memstoreSize >= (flushSize or self.MEMSTORE_FLUSH_SIZE)
+
+    def flush(self, directory, folder, force=False, flushSize=None):
+        """
+        Write the MemStore to a new immutable store file once it passes the flush size.
+
+        Parameters:
+            directory (str): The table directory store file names are relative to.
+            folder (str): The folder inside the table directory holding the table's store files.
+            force (bool): Flush even if the MemStore is below the flush size.
+            flushSize (int, optional): A flush size to use instead of MEMSTORE_FLUSH_SIZE.
+
+        Returns:
+            bool: Whether a store file was written.
+        """
+        if not force and not self.needsFlush(flushSize):
+            return False
+        keyValues = list(self.retain(self.memstoreKeyValues()))
+        if keyValues:
+            self.storeFiles.append(StoreFile.write(directory, f'{folder}/{uuid.uuid4().hex}.hfile', keyValues,
+                                                   self.bloomFilterType, len(keyValues), self.compression))
+        for column in self.columns.values():
+            column.clear()
+        self.deleteMarkers = []
+        self.memstoreSize = 0
+        self.rebuildBloom()
+        return len(keyValues) > 0
+
+    def compact(self, directory, folder, major=False):
+        """
+        Merge store files into a single one, dropping the versions hidden by delete markers.
+
+        A minor compaction only runs once COMPACTION_THRESHOLD files exist and skips old files
+        that are much larger than the newer ones, keeping the delete markers because they may
+        still hide data in the skipped files. A major compaction merges every file and drops
+        the markers as well.
+
+        Parameters:
+            directory (str): The table directory store file names are relative to.
+            folder (str): The folder inside the table directory holding the table's store files.
+            major (bool): Whether to run a major compaction.
+
+        Returns:
+            List[StoreFile]: The store files replaced by the compaction, to be removed from disk.
+        """
+        if major:
+            selected = list(self.storeFiles)
+            if not selected:
+                return []
+        else:
+            if len(self.storeFiles) < self.COMPACTION_THRESHOLD:
+                return []
+            sizes = [storeFile.size for storeFile in self.storeFiles]
+            start = 0
+            while start < len(sizes) - 1 and sizes[start] > self.COMPACTION_RATIO * sum(sizes[start + 1:]):
+                start += 1
+            selected = self.storeFiles[start:]
+            if len(selected) < 2:
+                return []
+
+        # Stream the merged entries straight into the new file
+        keyValues = self.retain(resolveKeyValues(mergeKeyValues([storeFile.keyValues() for storeFile in selected]), keepDeletes=not major))
+        compacted = StoreFile.write(directory, f'{folder}/{uuid.uuid4().hex}.hfile', keyValues,
+                                    self.bloomFilterType, sum(storeFile.entries for storeFile in selected), self.compression)
+        self.storeFiles = [storeFile for storeFile in self.storeFiles if storeFile not in selected]
+        if compacted is not None:
+            self.storeFiles.append(compacted)
+        return selected
+
+    def emptyCopy(self) -> 'ColumnFamily':
+        """
+        Return a family with the same name, columns and settings but no data.
+        """
+        cf = ColumnFamily(self.name, list(self.columns), self.isIndexed)
+        cf.bloomFilterType = self.bloomFilterType
+        cf.compression = self.compression
+        cf.maxVersions, cf.minVersions, cf.ttl = self.maxVersions, self.minVersions, self.ttl
+        cf.columnTypes = dict(self.columnTypes)
+        for column in cf.columns:
+            cf.insertColumn(column)
+        cf.rebuildBloom()
+        return cf
+
+    def split(self, directory, splitKey, lowerFolder, upperFolder):
+        """
+        Write the rows below splitKey and the remaining rows of the family to one store file each.
+
+        Every entry of the family is merged, as in a major compaction, so delete markers are dropped.
+
+        Returns:
+            tuple: The families holding the lower and the upper rows.
+        """
+        families = []
+        for folder, keep in ((lowerFolder, lambda rowKey: rowKey < splitKey), (upperFolder, lambda rowKey: rowKey >= splitKey)):
+            sources = [self.memstoreKeyValues()] + [storeFile.keyValues() for storeFile in self.storeFiles]
+            keyValues = (keyValue for keyValue in self.retain(resolveKeyValues(mergeKeyValues(sources))) if keep(keyValue[0]))
+            cf = self.emptyCopy()
+            storeFile = StoreFile.write(directory, f'{folder}/{uuid.uuid4().hex}.hfile', keyValues,
+                                        self.bloomFilterType, sum(storeFile.entries for storeFile in self.storeFiles) + len(sources[0]),
+                                        self.compression)
+            if storeFile is not None:
+                cf.storeFiles.append(storeFile)
+            families.append(cf)
+        return tuple(families)
 
 class Value:
-    def __init__(self, value):
-        self.creationDate = datetime.datetime.now().timestamp()
+    __slots__ = ('creationDate', 'value')
+
+    def __init__(self, value, timestamp:float=None):
+        self.creationDate = timestamp if timestamp is not None else datetime.datetime.now().timestamp()
         self.value = value if not isinstance(value, list) else str(value)
 
+    def __setstate__(self, state):
+        # Values pickled before __slots__ carry a __dict__ state
+        state = state[1] if isinstance(state, tuple) else state
+        self.creationDate = state['creationDate']
+        self.value = state['value']
+
     def obtainVersion(self):
         return [self.creationDate, self.value]
 
 class Cell:
-    def __init__(self, value, rowKey):
-        self.values = [Value(value)]
+    # Cells are detached views of the versions stored in a Column's arrays
+    __slots__ = ('rowKey', 'timestamps', 'data')
+
+    def __init__(self, value, rowKey, timestamp:float=None):
         self.rowKey = rowKey
+        self.timestamps = []
+        self.data = []
+        self.update(value, timestamp)
+
+    @classmethod
+    def fromVersions(cls, rowKey, versions):
+        cell = cls.__new__(cls)
+        cell.rowKey = rowKey
+        cell.timestamps = [timestamp for timestamp, _ in versions]
+        cell.data = [value for _, value in versions]
+        return cell
+
+    def __setstate__(self, state):
+        if isinstance(state, tuple):
+            state = state[1]
+        # Cells pickled before __slots__ hold a list of Value objects
+        if 'values' in state:
+            state = {'rowKey': state['rowKey'], 'timestamps': [value.creationDate for value in state['values']],
+                     'data': [value.value for value in state['values']]}
+        self.rowKey, self.timestamps, self.data = state['rowKey'], list(state['timestamps']), state['data']
+
+    def update(self, newValue, timestamp:float=None):
+        self.timestamps.append(timestamp if timestamp is not None else datetime.datetime.now().timestamp())
+        self.data.append(newValue if not isinstance(newValue, list) else str(newValue))
 
-    def update(self, newValue):
-        self.values.append(Value(newValue))
+    @property
+    def values(self) -> List[Value]:
+        return [Value(value, timestamp) for timestamp, value in self.versions()]
+
+    def versions(self) -> Iterator[tuple]:
+        # (timestamp, value) pairs from the oldest version to the newest
+        return zip(self.timestamps, self.data)
 
     def getActualValue(self):
-        if isinstance(self.values[-1].value, list):
-            return str(self.values[-1].value)
-        return self.values[-1].value
+        if isinstance(self.data[-1], list):
+            return str(self.data[-1])
+        return self.data[-1]
     
     def obtainActualVersion(self):
-        return self.values[-1].obtainVersion()
+        return [self.timestamps[-1], self.data[-1]]
     
     def obtainNVersions(self, n:int=1, version:float=None):
         if version:
-            for value in self.values:
-                if value.creationDate == version:
-                    return [value.obtainVersion()]
+            # Versions are ordered by timestamp
+            position = bisect_left(self.timestamps, version)
+            if position < len(self.timestamps) and self.timestamps[position] == version:
+                return [[version, self.data[position]]]
             return []
 
         # Return the last n versions
-        return [value.obtainVersion() for value in self.values[-n:]]
+        return [[timestamp, value] for timestamp, value in zip(self.timestamps[-n:], self.data[-n:])]
 
 
     def isEmpty(self):
-        return len(self.values) == 0
+        return len(self.data) == 0
     
     def tiemsStamp(self):
-        return len(self.values)
+        return len(self.data)
     
     def __eq__(self, value: object) -> bool:
         if isinstance(value, str):
@@ -284,18 +927,118 @@ class Cell:
         return False
         
 
+class Region:
+    """
+    Contiguous range of row keys [startKey, endKey) of a table, with its own column family
+    stores. Its store files are written to a folder of its own inside the table's folder.
+    """
+    # Approximate size in bytes (store files plus MemStores) after which a region is split in two
+    SPLIT_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, columnFamilies: List['ColumnFamily'], startKey: str = '', endKey: str = None, name: str = None):
+        self.name = name if name is not None else uuid.uuid4().hex
+        self.startKey = startKey
+        # None means the region has no upper bound
+        self.endKey = endKey
+        self.columnFamilies = columnFamilies
+
+    def folder(self, tableFolder) -> str:
+        return f'{tableFolder}/{self.name}'
+
+    def columnFamily(self, columnFamilyName) -> 'ColumnFamily':
+        for cf in self.columnFamilies:
+            if cf.name == columnFamilyName:
+                return cf
+        return None
+
+    def rowKeys(self):
+        rowKeys = set()
+        for cf in self.columnFamilies:
+            rowKeys.update(cf.rowKeys())
+        return rowKeys
+
+    def size(self) -> int:
+        return sum(storeFile.size for cf in self.columnFamilies for storeFile in cf.storeFiles) + \
+            sum(cf.memstoreSize for cf in self.columnFamilies)
+
+    def needsSplit(self):
+        return self.size() >= self.SPLIT_SIZE
+
+    def splitKey(self):
+        # The middle row key, so both daughters hold about the same number of rows
+        rowKeys = sorted(self.rowKeys())
+        if len(rowKeys) < 2:
+            return None
+        return rowKeys[len(rowKeys) // 2]
+
+    def split(self, directory, tableFolder):
+        """
+        Split the region at its middle row key into two daughter regions.
+
+        Parameters:
+            directory (str): The table directory store file names are relative to.
+            tableFolder (str): The folder inside the table directory holding the table's store files.
+
+        Returns:
+            tuple: The two daughter regions (or None if the region holds a single row) and the
+                   store files they replace.
+        """
+        splitKey = self.splitKey()
+        if splitKey is None:
+            return None, []
+        lower = Region([], self.startKey, splitKey)
+        upper = Region([], splitKey, self.endKey)
+        obsolete = []
+        for cf in self.columnFamilies:
+            lowerFamily, upperFamily = cf.split(directory, splitKey, lower.folder(tableFolder), upper.folder(tableFolder))
+            lower.columnFamilies.append(lowerFamily)
+            upper.columnFamilies.append(upperFamily)
+            obsolete += cf.storeFiles
+        return [lower, upper], obsolete
+
 class Table:
-    def __init__(self, columns:Dict[str, List[str]], indexed=False):
+    def __init__(self, columns:Dict[str, List[str]], indexed=True):
         self.indexed = indexed
-        self.columnFamilies:List['ColumnFamily'] = [ColumnFamily('', indexed=indexed)]
+        columnFamilies:List['ColumnFamily'] = [ColumnFamily('', indexed=indexed)]
 
         for cf in columns:
             if cf != '':
-                self.columnFamilies.append(ColumnFamily(cf.strip(), [c for c in columns[cf]], indexed))
+                columnFamilies.append(ColumnFamily(cf.strip(), [c for c in columns[cf]], indexed))
             else:
-                self.columnFamilies[0] = ColumnFamily(cf.strip(), [c for c in columns[cf]], indexed)
+                columnFamilies[0] = ColumnFamily(cf.strip(), [c for c in columns[cf]], indexed)
+        # Regions sorted by start key; a new table is a single region covering every row key
+        self.regions:List[Region] = [Region(columnFamilies)]
         self.rowKeyCounter = 0
         self.isEnable = True
+        # Sequence id of the last write-ahead log record reflected in this object
+        self.lastSequenceId = 0
+        # Secondary indexes by 'family:column'
+        self.indexes: Dict[str, SecondaryIndex] = {}
+
+    def __setstate__(self, state):
+        # Tables pickled before the write-ahead log existed carry no sequence id
+        state.setdefault('lastSequenceId', 0)
+        # Tables pickled before secondary indexes existed
+        state.setdefault('indexes', {})
+        # Tables pickled before regions existed become a single region
+        if 'regions' not in state:
+            state['regions'] = [Region(state.pop('columnFamilies'))]
+        self.__dict__.update(state)
+
+    @property
+    def columnFamilies(self) -> List['ColumnFamily']:
+        # Every region has the same column families, so those of the first one describe the schema
+        return self.regions[0].columnFamilies
+
+    def families(self) -> Iterator['ColumnFamily']:
+        """
+        Iterate over the column families of every region, in row key order.
+        """
+        for region in self.regions:
+            yield from region.columnFamilies
+
+    def regionFor(self, rowKey) -> 'Region':
+        return self.regions[bisect_right([region.startKey for region in self.regions], rowKey) - 1]
 
 
     def generateRowKey(self):
@@ -304,107 +1047,633 @@ class Table:
 
     def insertOne(self, rowData: Dict[str, Dict[str, Any]]):
         rowKey = self.generateRowKey()
-        for cf in self.columnFamilies:
+        for cf in self.regionFor(rowKey).columnFamilies:
             if cf.name in rowData:
                 cf.insertRow(rowKey, rowData[cf.name])
+        self.updateIndexes(rowKey)
+
+    def currentValue(self, rowKey, columnFamily, column):
+        # Newest visible value of a cell, or None
+        cf = self.regionFor(rowKey).columnFamily(columnFamily)
+        if cf is None:
+            return None
+        for keyValue in cf.keyValues(rowKey, column):
+            if keyValue[1] == column:
+                return keyValue[4]
+        return None
+
+    def updateIndexes(self, rowKey, columnFamily=None, column=None):
+        # Re-read the indexed cells of a row that was written, or only the written cell
+        for index in self.indexes.values():
+            if (columnFamily is None or index.family == columnFamily) and (column is None or index.column == column):
+                index.update(rowKey, self.currentValue(rowKey, index.family, index.column))
+
+    def createIndex(self, columnFamily, column) -> bool:
+        """
+        Index the current values of a column, returning False if the column family does not exist.
+        """
+        if self.columnFamily(columnFamily) is None:
+            return False
+        index = SecondaryIndex(columnFamily, column)
+        self.buildIndex(index)
+        self.indexes[index.name] = index
+        return True
+
+    def buildIndex(self, index: SecondaryIndex):
+        # Read the current values of the column in one pass over every region
+        values = {}
+        for region in self.regions:
+            cf = region.columnFamily(index.family)
+            if cf is None:
+                continue
+            for (rowKey, cellColumn), keyValues in groupby(cf.keyValues(), key=itemgetter(0, 1)):
+                if cellColumn == index.column:
+                    values[rowKey] = next(keyValues)[4]
+        index.load(values)
+
+    def attachStoreFiles(self, directory, folder, storeFiles) -> int:
+        """
+        Move the store files of a prepared bulk load into the regions of the table and reference them.
+        A file spanning several regions, because the table split after the load was prepared, is
+        rewritten into one file per region.
+
+        Parameters:
+            directory (str): The table directory store file names are relative to.
+            folder (str): The folder inside the table directory holding the table's store files.
+            storeFiles (list): (column family name, StoreFile) pairs, opened from the bulk load directory.
+
+        Returns:
+            int: The number of store files attached.
+
+        Raises:
+            ValueError: If a column family of the bulk load does not exist.
+        """
+        for family, _ in storeFiles:
+            if self.columnFamily(family) is None:
+                raise ValueError(f"The column family '{family}' does not exist.")
+        attached = []
+        for family, storeFile in storeFiles:
+            regions = [region for region in self.regions
+                       if region.startKey <= storeFile.lastRow and (region.endKey is None or region.endKey > storeFile.firstRow)]
+            for region in regions:
+                cf = region.columnFamily(family)
+                name = f'{region.folder(folder)}/{uuid.uuid4().hex}.hfile'
+                if len(regions) == 1:
+                    storeFile.moveTo(directory, name)
+                    attached.append((cf, storeFile))
+                    continue
+                piece = StoreFile.write(directory, name, storeFile.scan(region.startKey, region.endKey),
+                                        cf.bloomFilterType, storeFile.entries, cf.compression)
+                if piece is not None:
+                    attached.append((cf, piece))
+        # The files are only referenced once all of them are in place
+        for cf, storeFile in attached:
+            cf.storeFiles.append(storeFile)
+        self.rebuildIndexes()
+        return len(attached)
+
+    def rebuildIndexes(self):
+        # Used after writes that skipped the index updates, such as bulk loads
+        for index in self.indexes.values():
+            self.buildIndex(index)
+
+    def dropIndex(self, columnFamily, column) -> bool:
+        return self.indexes.pop(f"{columnFamily}:{column}", None) is not None
+
+    def find(self, conditions, startRow=None, stopRow=None, prefix=None, limit:int=None, reverse=False, versions:int=1,
+             version:float=None, timeRange=None, filter: Filter=None):
+        """
+        Return the cells of the rows matching every condition, looked up through the secondary indexes.
+
+        Parameters:
+            conditions (list): (family, column, operator, value) tuples on indexed columns.
+            The remaining parameters restrict the rows and versions as in scan.
+
+        Returns:
+            pd.DataFrame: The Row Key, CF:Column, Timestamp and Value of every returned version.
+        """
+        return self.scan(startRow, stopRow, prefix, limit, reverse, versions, version, timeRange,
+                         rowKeys=self.indexedRowKeys(conditions), filter=filter)
+
+    def indexedRowKeys(self, conditions) -> List[str]:
+        """
+        Return the sorted row keys matching every condition, looked up through the secondary indexes.
+
+        Raises:
+            KeyError: If a condition is on a column without a secondary index.
+        """
+        rowKeys = None
+        for family, column, operator, value in conditions:
+            index = self.indexes.get(f"{family}:{column}")
+            if index is None:
+                raise KeyError(f"{family}:{column}")
+            found = set(index.lookup(operator, value))
+            rowKeys = found if rowKeys is None else rowKeys & found
+        # The index may still list rows whose indexed value expired since it was written
+        return [rowKey for rowKey in sorted(rowKeys or ())
+                if all(SecondaryIndex.matches(self.currentValue(rowKey, family, column), operator, value)
+                       for family, column, operator, value in conditions)]
 
     def obtainTableInfo(self):
-        data = {}
-        for cf in self.columnFamilies:
-            for rowKey, rowValues in cf.obtainColumnFamilyInfo().items():
-                if rowKey not in data:
-                    data[rowKey] = {}
-                for columnFamily, columnValue in rowValues.items():
-                    data[rowKey][columnFamily] = columnValue
+        # The newest value of every cell, gathered column by column
+        columns: Dict[str, tuple] = {}
+        for cf in self.families():
+            for (rowKey, column), keyValues in groupby(cf.keyValues(), key=itemgetter(0, 1)):
+                rowKeys, values = columns.setdefault(cf.columnLabel(column), ([], []))
+                rowKeys.append(rowKey)
+                values.append(next(keyValues)[4])
 
         # Make the data a pandas dataframe, where the rowKey is the index
-        data = pd.DataFrame(data).T
-        return data
+        index = sorted({rowKey for rowKeys, _ in columns.values() for rowKey in rowKeys})
+        positions = {rowKey: position for position, rowKey in enumerate(index)}
+        data = {}
+        for label, (rowKeys, values) in columns.items():
+            if len(rowKeys) == len(index):
+                data[label] = typedArray([values[order] for order in sorted(range(len(rowKeys)), key=lambda i: positions[rowKeys[i]])])
+            else:
+                column = [None] * len(index)
+                for rowKey, value in zip(rowKeys, values):
+                    column[positions[rowKey]] = value
+                data[label] = typedArray(column, complete=False)
+        return pd.DataFrame(data, index=index)
     
     def setIndexed(self):
         self.indexed = not self.indexed
         print(self.indexed)
-        for cf in self.columnFamilies:
+        for cf in self.families():
             cf.setIndexed(self.indexed)
 
     
     def obtainTableInfoWithMetadata(self, versions:int=1, version:float=None):
-        data = []
-        for cf in self.columnFamilies:
-            metadataCF = cf.obtainColumnFamilyInfoWithMetadata(versions, version)
-            for row in metadataCF:
-                data.append(row)
-            data+=metadataCF
-
-        headers = ['Row Key', 'CF:Column', 'Timestamp', 'Value']
-        data = pd.DataFrame(data, columns=headers)
-        # Delete duplicate rows
-        data = data.drop_duplicates()
-        return data
-    
-    def obtainTableInfoRowkeyWithMetadata(self, rowkey, columnFamily, column=None, versions:int=1, version:float=None):
-        data = []
-        if columnFamily is None:
-            for cf in self.columnFamilies:
-                metadataCF = cf.obtainColumnFamilyInfoRowkeyWithMetadata(rowkey, versions=versions, version=version)
-                for row in metadataCF:
-                    data.append(row)
-                data+=metadataCF
-        else:
-            for cf in self.columnFamilies:
-                if cf.name == columnFamily:
-                    metadataCF = cf.obtainColumnFamilyInfoRowkeyWithMetadata(rowkey, column, versions=versions, version=version)
-                    for row in metadataCF:
-                        data.append(row)
-                    data+=metadataCF
-        headers = ['Row Key', 'CF:Column', 'Timestamp', 'Value']
-        data = pd.DataFrame(data, columns=headers)
-        # Delete duplicate rows
-        data = data.drop_duplicates()
-        return data
+        # Every cell is produced once, straight into the result columns
+        return self.scan(versions=versions, version=version)
     
-    def insertOrUpdateRow(self, rowKey, columnFamily, column, value):
-        for cf in self.columnFamilies:
-            print(cf.name)
+    @staticmethod
+    def prefixStopRow(prefix):
+        # The smallest row key greater than every key starting with the prefix
+        for i in range(len(prefix) - 1, -1, -1):
+            if prefix[i] != chr(0x10FFFF):
+                return prefix[:i] + chr(ord(prefix[i]) + 1)
+        return None
+
+    @staticmethod
+    def familyRows(index, cf, startRow, stopRow, reverse, timeRange):
+        for rowKey, entries in groupby(cf.scan(startRow, stopRow, reverse, timeRange), key=itemgetter(0)):
+            yield rowKey, index, cf, list(entries)
+
+    def scan(self, startRow=None, stopRow=None, prefix=None, limit:int=None, reverse=False, versions:int=1, version:float=None, timeRange=None,
+             rowKeys=None, filter: Filter=None):
+        """
+        Return the cells of the rows in [startRow, stopRow), reading only the regions and blocks
+        that hold them and stopping once limit rows have been returned.
+
+        Parameters:
+            startRow (str, optional): The first row to return.
+            stopRow (str, optional): The row to stop before.
+            prefix (str, optional): Only return the rows starting with this prefix.
+            limit (int, optional): The maximum number of rows to return.
+            reverse (bool): Return the rows from the last to the first.
+            versions (int): The number of most recent versions of every cell.
+            version (float): An exact timestamp to return instead of the most recent versions.
+            timeRange (tuple, optional): Only return the versions in [minTimestamp, maxTimestamp).
+            rowKeys (list, optional): Sorted row keys to read one by one instead of scanning the range.
+            filter (Filter, optional): Evaluated on every row and cell before it is added to the result.
+
+        Returns:
+            pd.DataFrame: The Row Key, CF:Column, Timestamp and Value of every returned version.
+        """
+        result = ResultBuilder()
+        result.extend(self.scanner(startRow, stopRow, prefix, limit, reverse, versions, version, timeRange, rowKeys, filter))
+        return result.toFrame()
+
+    def scanner(self, startRow=None, stopRow=None, prefix=None, limit:int=None, reverse=False, versions:int=1, version:float=None,
+                timeRange=None, rowKeys=None, filter: Filter=None, rows=False) -> Iterator[tuple]:
+        """
+        Lazily yield the cells of a scan in row key order, each exactly once. Only the row being
+        returned is held in memory, and nothing more is read once the caller stops iterating.
+
+        Parameters:
+            The parameters restrict the rows and versions as in scan.
+            rows (bool): Yield (rowKey, [(CF:Column, Timestamp, Value), ...]) once per row instead of single cells.
+
+        Yields:
+            tuple: The Row Key, CF:Column, Timestamp and Value of every returned version, or one tuple per row.
+        """
+        # A prefix required by the filter narrows the scanned range as well
+        filterPrefix = filter.prefix() if filter is not None else None
+        if filterPrefix is not None:
+            if prefix and not filterPrefix.startswith(prefix) and not prefix.startswith(filterPrefix):
+                return
+            prefix = max(prefix or '', filterPrefix, key=len)
+        if prefix:
+            prefixStop = self.prefixStopRow(prefix)
+            startRow = max(startRow, prefix) if startRow is not None else prefix
+            if prefixStop is not None:
+                stopRow = min(stopRow, prefixStop) if stopRow is not None else prefixStop
+
+        if (limit is not None and limit <= 0) or (filter is not None and filter.isDone()):
+            return
+        returned = 0
+        for rowKey, families in self.scannedRows(startRow, stopRow, prefix, reverse, timeRange, rowKeys):
+            cells = list(self.rowCells(rowKey, families, versions, version, timeRange, filter))
+            if not cells:
+                continue
+            returned += 1
+            if rows:
+                yield rowKey, [cell[1:] for cell in cells]
+            else:
+                yield from cells
+            if (limit is not None and returned >= limit) or (filter is not None and filter.isDone()):
+                return
+
+    def scannedRows(self, startRow=None, stopRow=None, prefix=None, reverse=False, timeRange=None, rowKeys=None):
+        """
+        Yield (rowKey, [(column family, visible puts of the row), ...]) for every row of the range,
+        reading the regions and store files one row at a time.
+        """
+        if rowKeys is not None:
+            selected = [rowKey for rowKey in rowKeys if (startRow is None or rowKey >= startRow) and (stopRow is None or rowKey < stopRow)]
+            if not reverse:
+                yield from self.rowsByKey(selected, timeRange=timeRange)
+                return
+            for rowKey in reversed(selected):
+                yield rowKey, [(cf, list(cf.keyValues(rowKey, None, timeRange))) for cf in self.regionFor(rowKey).columnFamilies]
+            return
+
+        regions = self.rangeRegions(startRow, stopRow)
+        for region in reversed(regions) if reverse else regions:
+            # One stream of (row, family, entries) per family, merged by row key
+            streams = [self.familyRows(index, cf, startRow, stopRow, reverse, timeRange) for index, cf in enumerate(region.columnFamilies)]
+            for rowKey, families in groupby(heapq.merge(*streams, key=itemgetter(0, 1), reverse=reverse), key=itemgetter(0)):
+                if prefix and not rowKey.startswith(prefix):
+                    continue
+                yield rowKey, [(cf, entries) for _, _, cf, entries in sorted(families, key=itemgetter(1))]
+
+    def rowsByKey(self, rowKeys: List[str], columnFamily=None, column=None, timeRange=None) -> Iterator[tuple]:
+        """
+        Yield (rowKey, [(column family, visible puts of the row), ...]) for every one of the sorted,
+        distinct rowKeys. The keys are split among the regions in one pass and every column family
+        reads its batch of keys with a single forward walk over its store files.
+
+        Parameters:
+            rowKeys (List[str]): The sorted, distinct row keys.
+            columnFamily (str, optional): Only read this column family.
+            column (str, optional): Only return this column.
+            timeRange (tuple, optional): Skip the store files holding nothing relevant to [minTimestamp, maxTimestamp).
+        """
+        startKeys = [region.startKey for region in self.regions]
+        for index, keys in groupby(rowKeys, key=lambda rowKey: bisect_right(startKeys, rowKey) - 1):
+            keys = list(keys)
+            families = [cf for cf in self.regions[index].columnFamilies if columnFamily is None or cf.name == columnFamily]
+            streams = [cf.multiGet(keys, column, timeRange) for cf in families]
+            for rowKey in keys:
+                rows = [(cf, next(stream)[1]) for cf, stream in zip(families, streams)]
+                if column is not None:
+                    rows = [(cf, [keyValue for keyValue in entries if keyValue[1] == column]) for cf, entries in rows]
+                yield rowKey, rows
+
+    def getMany(self, rowKeys, columnFamily=None, column=None, versions:int=1, version:float=None, timeRange=None,
+                filter: Filter=None) -> pd.DataFrame:
+        """
+        Return the cells of many rows in a single result, sorting the row keys once and reading them
+        region by region in order.
+
+        Parameters:
+            rowKeys (Iterable[str]): The row keys, in any order and possibly repeated.
+            The remaining parameters restrict the cells as in obtainTableInfoRowkeyWithMetadata.
+
+        Returns:
+            pd.DataFrame: The Row Key, CF:Column, Timestamp and Value of every returned version, in row key order.
+        """
+        result = ResultBuilder()
+        for rowKey, families in self.rowsByKey(sorted(set(rowKeys)), columnFamily, column, timeRange):
+            result.extend(self.rowCells(rowKey, families, versions, version, timeRange, filter))
+            if filter is not None and filter.isDone():
+                break
+        return result.toFrame()
+
+    def rangeRegions(self, startRow=None, stopRow=None) -> List['Region']:
+        # The regions overlapping [startRow, stopRow), in row key order
+        return [region for region in self.regions
+                if (stopRow is None or region.startKey < stopRow) and (startRow is None or region.endKey is None or region.endKey > startRow)]
+
+    @staticmethod
+    def rowCells(rowKey, families, versions:int=1, version:float=None, timeRange=None, filter: Filter=None) -> Iterator[tuple]:
+        """
+        Yield the returned versions of one row, applying the filter before anything is materialized.
+
+        Parameters:
+            rowKey (str): The row key.
+            families (list): (column family, visible puts of the row) pairs, the puts sorted with keyValueOrder.
+
+        Yields:
+            tuple: The Row Key, CF:Column, Timestamp and Value of every returned version; nothing if the row is filtered out.
+        """
+        if filter is not None:
+            if not filter.acceptRowKey(rowKey):
+                return
+            # The first version of every cell is its newest one
+            newest = {}
+            for cf, entries in families:
+                for keyValue in entries:
+                    newest.setdefault((cf.name, keyValue[1]), keyValue[4])
+            if not filter.acceptRow(newest):
+                return
+        returned = False
+        for cf, entries in families:
+            for (_, column), keyValues in groupby(entries, key=itemgetter(0, 1)):
+                for keyValue in selectVersions(list(keyValues), versions, version, timeRange):
+                    if filter is None or filter.acceptCell(cf.name, column, keyValue[4]):
+                        returned = True
+                        yield rowKey, cf.columnLabel(column), keyValue[2], keyValue[4]
+        if returned and filter is not None:
+            filter.rowReturned()
+
+    def obtainTableInfoRowkeyWithMetadata(self, rowkey, columnFamily, column=None, versions:int=1, version:float=None, timeRange=None,
+                                          filter: Filter=None):
+        # Only the region holding the row is read
+        families = [(cf, [keyValue for keyValue in cf.keyValues(rowkey, column, timeRange) if column is None or keyValue[1] == column])
+                    for cf in self.regionFor(rowkey).columnFamilies if columnFamily is None or cf.name == columnFamily]
+        result = ResultBuilder()
+        result.extend(self.rowCells(rowkey, families, versions, version, timeRange, filter))
+        return result.toFrame()
+
+    def insertOrUpdateRow(self, rowKey, columnFamily, column, value, timestamp:float=None):
+        for cf in self.regionFor(rowKey).columnFamilies:
             if cf.name.strip() == columnFamily.strip():
-                cf.insertOrUpdateRow(rowKey, column, value)
+                cf.insertOrUpdateRow(rowKey, column, value, timestamp)
+                self.updateIndexes(rowKey, cf.name, column)
                 return True 
         return False
+
+    def deleteVersion(self, rowKey, columnFamily, column, timestamp:float):
+        found = False
+        for cf in self.regionFor(rowKey).columnFamilies:
+            if cf.name == columnFamily:
+                found = cf.deleteVersion(rowKey, column, timestamp) or found
+        # An older version may now be the current value
+        self.updateIndexes(rowKey, columnFamily, column)
+        return found
+
+    def deleteRow(self, rowKey, timestamp:float=None):
+        found = False
+        for cf in self.regionFor(rowKey).columnFamilies:
+            if cf.deleteRow(rowKey, timestamp):
+                found = True
+        for index in self.indexes.values():
+            index.remove(rowKey)
+        return found
+
+    @staticmethod
+    def columnValues(cf: 'ColumnFamily', column, startRow=None, stopRow=None) -> Iterator[tuple]:
+        """
+        Yield (rowKey, newest value) for every row of [startRow, stopRow) holding the column, in row key order.
+        """
+        if cf is None:
+            return
+        keyValues = (keyValue for keyValue in cf.scan(startRow, stopRow) if keyValue[1] == column)
+        for (rowKey, _), versions in groupby(keyValues, key=itemgetter(0, 1)):
+            # The first version of every cell is its newest one
+            yield rowKey, next(versions)[4]
+
+    @staticmethod
+    def groupedValues(cf: 'ColumnFamily', column, groupFamily: 'ColumnFamily', groupColumn, startRow=None, stopRow=None) -> Iterator[tuple]:
+        """
+        Yield (group, value) for every row holding the column, joining the two sorted column streams
+        on the row key. Rows without the group column fall in the None group.
+        """
+        groups = Table.columnValues(groupFamily, groupColumn, startRow, stopRow)
+        group = next(groups, None)
+        for rowKey, value in Table.columnValues(cf, column, startRow, stopRow):
+            while group is not None and group[0] < rowKey:
+                group = next(groups, None)
+            yield (group[1] if group is not None and group[0] == rowKey else None), value
+
+    def aggregate(self, columnFamily, column, function='count', startRow=None, stopRow=None, groupBy=None):
+        """
+        Compute an aggregate of a column over the rows in [startRow, stopRow) in a single pass over
+        the regions, without materializing the rows.
+
+        Parameters:
+            columnFamily (str): The column family of the aggregated column.
+            column (str): The aggregated column.
+            function (str): One of count, sum, avg, min and max.
+            startRow (str, optional): The first row to aggregate.
+            stopRow (str, optional): The row to stop before.
+            groupBy (tuple, optional): The (column family, column) whose newest value groups the rows.
+
+        Returns:
+            The aggregate, or a dictionary with the aggregate of every group if groupBy is given.
+
+        Raises:
+            ValueError: If the function or a column family is not valid.
+        """
+        if function not in AGGREGATES:
+            raise ValueError(f"Invalid aggregate function '{function}', expected one of {AGGREGATES}.")
+        for family in [columnFamily] + ([groupBy[0]] if groupBy else []):
+            if self.columnFamily(family) is None:
+                raise ValueError(f"The column family '{family}' does not exist.")
+        columnType = self.columnFamily(columnFamily).columnTypes.get(column)
+
+        if groupBy is not None:
+            groups: Dict[Any, AggregateState] = {}
+            for region in self.rangeRegions(startRow, stopRow):
+                for group, value in self.groupedValues(region.columnFamily(columnFamily), column, region.columnFamily(groupBy[0]), groupBy[1],
+                                                       startRow, stopRow):
+                    state = groups.get(group)
+                    if state is None:
+                        state = groups[group] = AggregateState()
+                    state.add(value)
+            return {group: state.result(function) for group, state in groups.items()}
+
+        state = AggregateState()
+        for region in self.rangeRegions(startRow, stopRow):
+            cf = region.columnFamily(columnFamily)
+            memstoreColumn = cf.columns.get(column)
+            if COLUMN_TYPES.get(columnType) is not None and cf.memstoreOnly():
+                # Everything visible is in the typed MemStore buffer, so it is reduced without a scan
+                if memstoreColumn is not None:
+                    state.addArray(memstoreColumn.valueArray(startRow, stopRow))
+            else:
+                state.addAll((value for _, value in self.columnValues(cf, column, startRow, stopRow)), COLUMN_TYPES.get(columnType))
+        return state.result(function)
+
+    def countRows(self, startRow=None, stopRow=None) -> int:
+        """
+        Count the rows in [startRow, stopRow), merging the sorted row keys of the column families of
+        every region instead of collecting them.
+        """
+        count = 0
+        for region in self.rangeRegions(startRow, stopRow):
+            # Families held entirely in the MemStore list their row keys from the column indexes, without reading values
+            streams = [heapq.merge(*(column.rowKeys(startRow, stopRow) for column in cf.columns.values())) if cf.memstoreOnly()
+                       else map(itemgetter(0), cf.scan(startRow, stopRow)) for cf in region.columnFamilies]
+            count += sum(1 for _ in groupby(heapq.merge(*streams)))
+        return count
+
+    def rowKeys(self):
+        rowKeys = set()
+        for region in self.regions:
+            rowKeys.update(region.rowKeys())
+        return rowKeys
+
+    def openStoreFiles(self, directory):
+        for storeFile in self.storeFiles():
+            storeFile.open(directory)
+
+    def storeFiles(self) -> List[StoreFile]:
+        return [storeFile for cf in self.families() for storeFile in cf.storeFiles]
+
+    def needsFlush(self, flushSize=None):
+        return any(cf.needsFlush(flushSize) for cf in self.families())
+
+    def flush(self, directory, folder, force=False, flushSize=None):
+        flushed = False
+        for region in self.regions:
+            for cf in region.columnFamilies:
+                if cf.flush(directory, region.folder(folder), force, flushSize):
+                    flushed = True
+        return flushed
+
+    def compact(self, directory, folder, major=False) -> List[StoreFile]:
+        obsolete = []
+        for region in self.regions:
+            for cf in region.columnFamilies:
+                obsolete += cf.compact(directory, region.folder(folder), major)
+        return obsolete
+
+    def split(self, directory, folder) -> List[StoreFile]:
+        """
+        Split every region that grew past Region.SPLIT_SIZE in two.
+
+        Returns:
+            List[StoreFile]: The store files of the split regions, to be removed from disk.
+        """
+        regions = []
+        obsolete = []
+        for region in self.regions:
+            if region.needsSplit():
+                daughters, storeFiles = region.split(directory, folder)
+                if daughters:
+                    regions += daughters
+                    obsolete += storeFiles
+                    continue
+            regions.append(region)
+        self.regions = regions
+        return obsolete
     
 
     def addColumnFamily(self, columnFamilyName, columns:List[str]=[]):
-        self.columnFamilies.append(ColumnFamily(columnFamilyName, columns))
+        for region in self.regions:
+            region.columnFamilies.append(ColumnFamily(columnFamilyName, columns))
+
+    def removeColumnFamily(self, columnFamilyName) -> List[StoreFile]:
+        """
+        Remove a column family from every region and return its store files, or None if it does not exist.
+        """
+        if self.columnFamily(columnFamilyName) is None:
+            return None
+        obsolete = []
+        for region in self.regions:
+            cf = region.columnFamily(columnFamilyName)
+            region.columnFamilies.remove(cf)
+            obsolete += cf.storeFiles
+        self.indexes = {name: index for name, index in self.indexes.items() if index.family != columnFamilyName}
+        return obsolete
+
+    def renameColumnFamily(self, columnFamilyName, newName):
+        for cf in self.families():
+            if cf.name == columnFamilyName:
+                cf.name = newName
+        for index in self.indexes.values():
+            if index.family == columnFamilyName:
+                index.family = newName
+        self.indexes = {index.name: index for index in self.indexes.values()}
+
+    def configureColumnFamily(self, columnFamilyName, options: Dict[str, Any]) -> bool:
+        if self.columnFamily(columnFamilyName) is None:
+            return False
+        families = [region.columnFamily(columnFamilyName) for region in self.regions]
+        if 'types' in options:
+            # Convert the values of every region first, so an invalid one leaves all of them unchanged
+            converted = [cf.convertColumnTypes(options['types']) for cf in families]
+            for cf, (columnTypes, values) in zip(families, converted):
+                cf.setColumnTypes(columnTypes, values)
+            options = {option: value for option, value in options.items() if option != 'types'}
+        for cf in families:
+            cf.configure(options)
+        return True
+
+    def columnFamily(self, columnFamilyName) -> 'ColumnFamily':
+        return self.regions[0].columnFamily(columnFamilyName)
 
     def describeTable(self):
+        """
+        Describe the table: its row count followed by its metadata. Only the row count reads the
+        table, so this is computed on demand and never on the save path.
+        """
+        data = {'Row keys': self.countRows()}
+        data.update(self.metadata())
+        return data
+
+    def metadata(self):
+        """
+        Describe the schema, settings and layout of the table from what is kept in memory, without
+        reading any cell, so it can be stored in the snapshot header.
+        """
         data = {}
-        rowKeys = set()
-        for cf in self.obtainTableInfo().index:
-            rowKeys.add(cf)
-        data['Row keys'] = len(rowKeys)
         data['Column Families'] = str([cf.name  for cf in self.columnFamilies if cf.name!=''])
         data['isEnable'] = self.isEnable
-        data['Max number of versions'] = max([cf.maxNumberOfVersions() for cf in self.columnFamilies])
-        data['Min number of versions'] = min([cf.minNumberOfVersions() for cf in self.columnFamilies])
+        # The configured limits, which flushes, compactions and reads enforce, rather than a count over every cell
+        families = [cf for cf in self.columnFamilies if cf.name != ''] or self.columnFamilies
+        limits = [cf.maxVersions for cf in families]
+        data['Max number of versions'] = 'ALL' if None in limits else max(limits)
+        data['Min number of versions'] = min(cf.minVersions for cf in families)
         data['Is indexed'] = self.indexed 
+        data['Bloom filters'] = str({cf.name: cf.bloomFilterType for cf in self.columnFamilies if cf.name != ''})
+        data['Compression'] = str({cf.name: cf.compression for cf in self.columnFamilies if cf.name != ''})
+        data['Column types'] = str({cf.name: cf.columnTypes for cf in self.columnFamilies if cf.columnTypes})
+        data['Versions'] = str({cf.name: {'VERSIONS': cf.maxVersions if cf.maxVersions is not None else 'ALL', 'MIN_VERSIONS': cf.minVersions,
+                                          'TTL': cf.ttl if cf.ttl is not None else 'FOREVER'} for cf in self.columnFamilies if cf.name != ''})
+        # Size of the stored data blocks before compression divided by their size on disk
+        storeFiles = self.storeFiles()
+        rawSize = sum(storeFile.rawSize for storeFile in storeFiles)
+        dataSize = sum(storeFile.dataSize for storeFile in storeFiles)
+        data['Compression ratio'] = round(rawSize / dataSize, 2) if dataSize else 1.0
+        data['Secondary indexes'] = str(sorted(self.indexes))
+        data['Regions'] = len(self.regions)
+        data['Region boundaries'] = str([f"[{region.startKey}, {region.endKey if region.endKey is not None else ''})" for region in self.regions])
         return data
     
-    def insertMany(self, rows:Dict[str, Dict[str, Dict[str, Any]]]):
+    def insertMany(self, rows:Dict[str, Dict[str, Dict[str, Any]]], timestamp:float=None, updateIndexes=True):
+        # Check the keys and the values of typed columns first, so invalid rows leave the table untouched
+        for rowKey, row in rows.items():
+            for values in row.values():
+                ColumnFamily.checkKeys(rowKey, values)
+        typed = {cf.name: cf for cf in self.columnFamilies if cf.columnTypes}
+        if typed:
+            for row in rows.values():
+                for family in typed.keys() & row.keys():
+                    for column, value in row[family].items():
+                        typed[family].typedValue(column, value)
         for row in rows:
-            for cf in self.columnFamilies:
-                print(cf.name in rows[row], 'cf name in rows', cf.name, rows[row])
+            for cf in self.regionFor(row).columnFamilies:
                 if cf.name in rows[row]:
-                    cf.insertRow(row, rows[row][cf.name])
+                    cf.insertRow(row, rows[row][cf.name], timestamp)
+            # Bulk loads rebuild the indexes once at the end instead
+            if updateIndexes and self.indexes:
+                self.updateIndexes(row)
 
     def searchDataRow(self, rowKey, columnFamily=None, column=None):
         if columnFamily is None:
             rowData = {}
-            for cf in self.columnFamilies:
+            for cf in self.regionFor(rowKey).columnFamilies:
                 rowData[cf.name] = cf.searchRow(rowKey)
             return rowData
         
         else:
             rowData = {}
-            for cf in self.columnFamilies:
+            for cf in self.regionFor(rowKey).columnFamilies:
                 if cf.name == columnFamily:
                     rowData[cf.name] = cf.searchRow(rowKey, column)
             return rowData
@@ -0,0 +1,254 @@
+# Standard library imports
+import re  # Provides the regular expressions of RowFilter and of the '~' operator, and the filter tokenizer
+
+# Typing imports for type hinting
+from typing import Any, Dict, List, Tuple
+
+# Local application/library specific imports
+from .SecondaryIndex import SecondaryIndex
+
+# Comparison operators of the filters; '~' is a regular expression search on the text of the value.
+COMPARE_OPERATORS = ('=', '!=', '<', '<=', '>', '>=', '~')
+
+def compare(value: Any, operator: str, expected: Any) -> bool:
+    """
+    Compare a stored value with the value of a filter. Numbers, texts and other values are only
+    ordered among themselves, as in secondary indexes.
+    """
+    if operator == '~':
+        return re.search(str(expected), str(value)) is not None
+    if operator == '!=':
+        return SecondaryIndex.valueKey(value) != SecondaryIndex.valueKey(expected)
+    return SecondaryIndex.matches(value, operator, expected)
+
+class Filter:
+    """
+    Decides, while a scan or get walks the rows, which rows and cells are returned.
+
+    For every row the scan calls acceptRowKey, then acceptRow with the newest value of every
+    cell of the row, then acceptCell for every version it is about to return, and rowReturned
+    once the row was returned. Nothing is materialized for rejected rows, and the scan stops as
+    soon as isDone is True.
+    """
+    def acceptRowKey(self, rowKey: str) -> bool:
+        return True
+
+    def acceptRow(self, row: Dict[Tuple[str, str], Any]) -> bool:
+        return True
+
+    def acceptCell(self, family: str, column: str, value: Any) -> bool:
+        return True
+
+    def rowReturned(self) -> None:
+        pass
+
+    def isDone(self) -> bool:
+        return False
+
+    def prefix(self) -> str:
+        # Row key prefix every returned row must have, letting the scan seek instead of filtering
+        return None
+
+class PrefixFilter(Filter):
+    def __init__(self, rowPrefix: str) -> None:
+        self.rowPrefix = str(rowPrefix)
+
+    def acceptRowKey(self, rowKey: str) -> bool:
+        return rowKey.startswith(self.rowPrefix)
+
+    def prefix(self) -> str:
+        return self.rowPrefix
+
+class RowFilter(Filter):
+    def __init__(self, pattern: str) -> None:
+        self.pattern = re.compile(str(pattern))
+
+    def acceptRowKey(self, rowKey: str) -> bool:
+        return self.pattern.search(rowKey) is not None
+
+class QualifierFilter(Filter):
+    def __init__(self, operator: str, qualifier: Any) -> None:
+        self.operator = operator
+        self.qualifier = str(qualifier)
+
+    def acceptCell(self, family: str, column: str, value: Any) -> bool:
+        return compare(column, self.operator, self.qualifier)
+
+class ValueFilter(Filter):
+    def __init__(self, operator: str, value: Any) -> None:
+        self.operator = operator
+        self.value = value
+
+    def acceptCell(self, family: str, column: str, value: Any) -> bool:
+        return compare(value, self.operator, self.value)
+
+class SingleColumnValueFilter(Filter):
+    """
+    Keep the rows whose newest value of family:column compares to value; rows without the column
+    are kept unless filterIfMissing is set.
+    """
+    def __init__(self, family: str, column: str, operator: str, value: Any, filterIfMissing: bool = False) -> None:
+        self.family = str(family)
+        self.column = str(column)
+        self.operator = operator
+        self.value = value
+        self.filterIfMissing = filterIfMissing
+
+    def acceptRow(self, row: Dict[Tuple[str, str], Any]) -> bool:
+        if (self.family, self.column) not in row:
+            return not self.filterIfMissing
+        return compare(row[(self.family, self.column)], self.operator, self.value)
+
+class PageFilter(Filter):
+    def __init__(self, pageSize: int) -> None:
+        self.pageSize = int(pageSize)
+        self.returned = 0
+
+    def rowReturned(self) -> None:
+        self.returned += 1
+
+    def isDone(self) -> bool:
+        return self.returned >= self.pageSize
+
+class FilterList(Filter):
+    """
+    Combine filters with AND (every filter accepts) or OR (a row or cell is returned when one
+    filter accepts it, considering only the filters that accepted the row itself).
+    """
+    AND = 'AND'
+    OR = 'OR'
+
+    def __init__(self, operator: str, filters: List[Filter]) -> None:
+        self.operator = operator.upper()
+        self.filters = filters
+        # Filters of an OR list that accepted the current row
+        self.candidates = filters
+
+    def acceptRowKey(self, rowKey: str) -> bool:
+        if self.operator == self.AND:
+            return all(filter.acceptRowKey(rowKey) for filter in self.filters)
+        self.candidates = [filter for filter in self.filters if not filter.isDone() and filter.acceptRowKey(rowKey)]
+        return len(self.candidates) > 0
+
+    def acceptRow(self, row: Dict[Tuple[str, str], Any]) -> bool:
+        if self.operator == self.AND:
+            return all(filter.acceptRow(row) for filter in self.filters)
+        self.candidates = [filter for filter in self.candidates if filter.acceptRow(row)]
+        return len(self.candidates) > 0
+
+    def acceptCell(self, family: str, column: str, value: Any) -> bool:
+        if self.operator == self.AND:
+            return all(filter.acceptCell(family, column, value) for filter in self.filters)
+        return any(filter.acceptCell(family, column, value) for filter in self.candidates)
+
+    def rowReturned(self) -> None:
+        for filter in self.filters if self.operator == self.AND else self.candidates:
+            filter.rowReturned()
+
+    def isDone(self) -> bool:
+        if self.operator == self.AND:
+            return any(filter.isDone() for filter in self.filters)
+        return all(filter.isDone() for filter in self.filters)
+
+    def prefix(self) -> str:
+        if self.operator == self.AND:
+            return next((filter.prefix() for filter in self.filters if filter.prefix() is not None), None)
+        return None
+
+# Filters of the filter language, with the arguments they take.
+FILTERS = {'PrefixFilter': (PrefixFilter, ('prefix',)),
+           'RowFilter': (RowFilter, ('pattern',)),
+           'QualifierFilter': (QualifierFilter, ('operator', 'qualifier')),
+           'ValueFilter': (ValueFilter, ('operator', 'value')),
+           'SingleColumnValueFilter': (SingleColumnValueFilter, ('family', 'column', 'operator', 'value')),
+           'PageFilter': (PageFilter, ('size',))}
+
+TOKEN = re.compile(r"""\s*(?:(?P<string>'[^']*'|"[^"]*")|(?P<operator><=|>=|!=|=|<|>|~)|(?P<symbol>[(),])|(?P<word>[^\s(),'"<>=!~]+))""")
+
+def parseFilter(text: str, parseValue=lambda value: value) -> Filter:
+    """
+    Parse the filter language of scan and get, e.g.
+    "SingleColumnValueFilter('basic_info','type',=,'fire') AND (PrefixFilter('pokemon_0') OR PageFilter(5))".
+
+    Parameters:
+        text (str): The filter expression; AND binds tighter than OR.
+        parseValue (callable): Converts the compared values the way put converts stored values.
+
+    Raises:
+        ValueError: If the expression is not valid.
+    """
+    tokens = []
+    position = 0
+    text = text.strip()
+    while position < len(text):
+        match = TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid filter near '{text[position:]}'.")
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind)))
+    tokens.append(('end', None))
+    cursor = [0]
+
+    def peek():
+        return tokens[cursor[0]]
+
+    def take(expected=None):
+        token = tokens[cursor[0]]
+        if expected is not None and token[1] != expected:
+            raise ValueError(f"Invalid filter: expected '{expected}' but found '{token[1] or 'end'}'.")
+        cursor[0] += 1
+        return token
+
+    def expression():
+        filters = [term()]
+        while peek()[0] == 'word' and peek()[1].upper() == FilterList.OR:
+            take()
+            filters.append(term())
+        return filters[0] if len(filters) == 1 else FilterList(FilterList.OR, filters)
+
+    def term():
+        filters = [factor()]
+        while peek()[0] == 'word' and peek()[1].upper() == FilterList.AND:
+            take()
+            filters.append(factor())
+        return filters[0] if len(filters) == 1 else FilterList(FilterList.AND, filters)
+
+    def factor():
+        kind, value = take()
+        if value == '(':
+            filter = expression()
+            take(')')
+            return filter
+        if kind != 'word' or value not in FILTERS:
+            raise ValueError(f"Invalid filter '{value or 'end'}', expected one of {list(FILTERS)}.")
+        filterClass, parameters = FILTERS[value]
+        take('(')
+        args = []
+        while peek()[1] != ')':
+            kind, arg = take()
+            if kind == 'string':
+                arg = arg[1:-1]
+            elif kind not in ('word', 'operator'):
+                raise ValueError(f"Invalid filter argument '{arg}'.")
+            args.append(arg)
+            if peek()[1] == ',':
+                take()
+        take(')')
+        if len(args) != len(parameters):
+            raise ValueError(f"{value} expects the arguments ({', '.join(parameters)}).")
+        if 'operator' in parameters:
+            operatorIndex = parameters.index('operator')
+            if args[operatorIndex] not in COMPARE_OPERATORS:
+                raise ValueError(f"Invalid operator '{args[operatorIndex]}', expected one of {COMPARE_OPERATORS}.")
+            if parameters[-1] == 'value' and args[operatorIndex] != '~':
+                args[-1] = parseValue(args[-1])
+        try:
+            return filterClass(*args)
+        except (re.error, ValueError) as e:
+            raise ValueError(f"Invalid {value}: {e}")
+
+    filter = expression()
+    if peek()[0] != 'end':
+        raise ValueError(f"Invalid filter near '{peek()[1]}'.")
+    return filter
@@ -0,0 +1,357 @@
+# Standard library imports
+import bz2     # Provides the BZ2 block codec
+import json    # Provides encoding of the file info block
+import lzma    # Provides the LZMA block codec
+import mmap    # Provides memory-mapped access to the file, so only the blocks that are used are read
+import os      # Provides functions to interact with the file system
+import pickle  # Provides a fallback encoding for values of unsupported types
+import struct  # Provides packing of the binary records
+import zlib    # Provides the ZLIB block codec
+from bisect import bisect_left, bisect_right  # Provides binary search over the block index and blocks
+from itertools import groupby  # Provides grouping of the entries of a block by row
+
+# Typing imports for type hinting
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+# Local application/library specific imports
+from .KeyValue import KeyValue, DELETE_ROW
+from .BlockCache import blockCache, INDEX
+from .BloomFilter import BloomFilter, NONE as BLOOM_NONE, ROWCOL
+
+# Layout of a file:
+#   [data block]...[data block][block index][file info][bloom filter][trailer]
+# Data blocks hold sorted key/value entries and always start at a row boundary, so a row is
+# stored in exactly one block. The block index holds the first row key, offset and length of
+# every block, the file info is a small JSON document, the optional Bloom filter holds the row
+# keys (or row and column pairs) of the file and the fixed-size trailer locates them.
+# Data blocks may be compressed one by one, so reading a row only decompresses its block.
+MAGIC = b'HFSIM\x00\x02\x00'
+TRAILER = struct.Struct('<8sQIQIQIQI')  # magic, index, info and bloom offset/length, entries, blocks
+# Target size of a data block in bytes
+BLOCK_SIZE = 64 * 1024
+
+# Fixed part of an entry: row key length, column length, timestamp, type and value tag
+ENTRY_HEADER = struct.Struct('<HHdBB')
+# Largest row key or column in bytes, as entries store their lengths in 16 bits
+MAX_KEY_LENGTH = 2**16 - 1
+INDEX_ENTRY = struct.Struct('<QI')  # block offset and length, preceded by the length-prefixed first row
+LENGTH = struct.Struct('<I')
+SHORT = struct.Struct('<H')
+INT64 = struct.Struct('<q')
+FLOAT64 = struct.Struct('<d')
+
+# Value tags
+NONE, INT, FLOAT, BOOL, STRING, PICKLED = range(6)
+
+# Block compression codecs of a column family
+COMPRESSION_NONE = 'NONE'
+CODECS = {'ZLIB': zlib, 'LZMA': lzma, 'BZ2': bz2}
+COMPRESSION_TYPES = [COMPRESSION_NONE] + list(CODECS)
+
+def checkKeyLength(name: str, key: str) -> None:
+    """
+    Check that a row key or column fits in an entry, so it can be flushed later.
+
+    Raises:
+        ValueError: If the key is longer than MAX_KEY_LENGTH bytes.
+    """
+    key = str(key)
+    # A character takes at most four bytes, so short keys are not encoded
+    if len(key) * 4 > MAX_KEY_LENGTH and len(key.encode('utf-8')) > MAX_KEY_LENGTH:
+        raise ValueError(f"The {name} is {len(key.encode('utf-8'))} bytes long, at most {MAX_KEY_LENGTH} bytes are allowed.")
+
+def encodeValue(value: Any) -> Tuple[int, bytes]:
+    if value is None:
+        return NONE, b''
+    if isinstance(value, bool):
+        return BOOL, b'\x01' if value else b'\x00'
+    if isinstance(value, int) and -2**63 <= value < 2**63:
+        return INT, INT64.pack(value)
+    if isinstance(value, float):
+        return FLOAT, FLOAT64.pack(value)
+    if isinstance(value, str):
+        data = value.encode('utf-8')
+        return STRING, LENGTH.pack(len(data)) + data
+    data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return PICKLED, LENGTH.pack(len(data)) + data
+
+def encodeKeyValue(keyValue: KeyValue) -> bytes:
+    rowKey, column, timestamp, kind, value = keyValue
+    rowData = rowKey.encode('utf-8')
+    columnData = column.encode('utf-8')
+    tag, valueData = encodeValue(value)
+    return ENTRY_HEADER.pack(len(rowData), len(columnData), timestamp, kind, tag) + rowData + columnData + valueData
+
+def decodeBlock(buffer) -> List[KeyValue]:
+    """
+    Decode every entry of a data block.
+    """
+    keyValues = []
+    offset = 0
+    end = len(buffer)
+    while offset < end:
+        rowLength, columnLength, timestamp, kind, tag = ENTRY_HEADER.unpack_from(buffer, offset)
+        offset += ENTRY_HEADER.size
+        rowKey = bytes(buffer[offset:offset + rowLength]).decode('utf-8')
+        offset += rowLength
+        column = bytes(buffer[offset:offset + columnLength]).decode('utf-8')
+        offset += columnLength
+        if tag == NONE:
+            value = None
+        elif tag == INT:
+            value = INT64.unpack_from(buffer, offset)[0]
+            offset += INT64.size
+        elif tag == FLOAT:
+            value = FLOAT64.unpack_from(buffer, offset)[0]
+            offset += FLOAT64.size
+        elif tag == BOOL:
+            value = buffer[offset] != 0
+            offset += 1
+        else:
+            length = LENGTH.unpack_from(buffer, offset)[0]
+            offset += LENGTH.size
+            data = bytes(buffer[offset:offset + length])
+            offset += length
+            value = data.decode('utf-8') if tag == STRING else pickle.loads(data)
+        keyValues.append((rowKey, column, timestamp, kind, value))
+    return keyValues
+
+class HFileWriter:
+    """
+    Write sorted key/value entries to a new HFile, one data block at a time.
+    """
+    def __init__(self, path: str, blockSize: int = BLOCK_SIZE, bloomType: str = BLOOM_NONE, expectedEntries: int = 0,
+                 compression: str = COMPRESSION_NONE) -> None:
+        self.path = path
+        self.blockSize = blockSize
+        self.codec = CODECS.get(compression)
+        self.bloomType = bloomType
+        self.bloom = BloomFilter(expectedEntries) if bloomType != BLOOM_NONE else None
+        self.lastColumn = None
+        self.file = open(path, 'wb')
+        self.offset = 0
+        self.block: List[bytes] = []
+        self.blockLength = 0
+        self.blockFirstRow = None
+        self.lastRow = None
+        # First row key, offset and length of every written block
+        self.index: List[Tuple[str, int, int]] = []
+        self.info: Dict[str, Any] = {'entries': 0, 'firstRow': None, 'lastRow': None,
+                                     'minTimestamp': None, 'maxTimestamp': None, 'bloomType': bloomType,
+                                     'compression': compression, 'rawSize': 0, 'dataSize': 0, 'rowDeletes': 0}
+
+    def append(self, keyValue: KeyValue) -> None:
+        rowKey = keyValue[0]
+        # Blocks are only cut between rows
+        if rowKey != self.lastRow and self.blockLength >= self.blockSize:
+            self.writeBlock()
+        if self.blockFirstRow is None:
+            self.blockFirstRow = rowKey
+        if self.bloom is not None:
+            if self.bloomType == ROWCOL:
+                if rowKey != self.lastRow or keyValue[1] != self.lastColumn:
+                    self.bloom.add(BloomFilter.key(rowKey, keyValue[1]))
+            elif rowKey != self.lastRow:
+                self.bloom.add(BloomFilter.key(rowKey))
+        data = encodeKeyValue(keyValue)
+        self.block.append(data)
+        self.blockLength += len(data)
+        self.lastRow = rowKey
+        self.lastColumn = keyValue[1]
+
+        info = self.info
+        info['entries'] += 1
+        if info['firstRow'] is None:
+            info['firstRow'] = rowKey
+        info['lastRow'] = rowKey
+        if info['minTimestamp'] is None or keyValue[2] < info['minTimestamp']:
+            info['minTimestamp'] = keyValue[2]
+        if info['maxTimestamp'] is None or keyValue[2] > info['maxTimestamp']:
+            info['maxTimestamp'] = keyValue[2]
+        if keyValue[3] == DELETE_ROW:
+            info['rowDeletes'] += 1
+
+    def writeBlock(self) -> None:
+        if not self.block:
+            return
+        data = b''.join(self.block)
+        self.info['rawSize'] += len(data)
+        if self.codec is not None:
+            data = self.codec.compress(data)
+        self.info['dataSize'] += len(data)
+        self.file.write(data)
+        self.index.append((self.blockFirstRow, self.offset, len(data)))
+        self.offset += len(data)
+        self.block = []
+        self.blockLength = 0
+        self.blockFirstRow = None
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Write the last block, the block index, the file info and the trailer.
+
+        Returns:
+            dict: The file info (entries, first and last row, timestamp range, data size before and after compression).
+        """
+        self.writeBlock()
+        indexData = bytearray()
+        for firstRow, offset, length in self.index:
+            rowData = firstRow.encode('utf-8')
+            indexData += SHORT.pack(len(rowData)) + rowData + INDEX_ENTRY.pack(offset, length)
+        infoData = json.dumps(self.info).encode('utf-8')
+        bloomData = self.bloom.toBytes() if self.bloom is not None else b''
+
+        indexOffset = self.offset
+        infoOffset = indexOffset + len(indexData)
+        bloomOffset = infoOffset + len(infoData)
+        self.file.write(bytes(indexData))
+        self.file.write(infoData)
+        self.file.write(bloomData)
+        self.file.write(TRAILER.pack(MAGIC, indexOffset, len(indexData), infoOffset, len(infoData),
+                                     bloomOffset, len(bloomData), self.info['entries'], len(self.index)))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        return self.info
+
+class HFileReader:
+    """
+    Read an HFile through a memory map. Opening a file only decodes its trailer; the block index
+    and the data blocks are decoded when a lookup or scan reaches them and kept in the shared
+    block cache.
+    """
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.file = open(path, 'rb')
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.indexOffset, self.indexLength, infoOffset, infoLength, self.bloomOffset, self.bloomLength, \
+            self.entries, self.blockCount = TRAILER.unpack_from(self.buffer, len(self.buffer) - TRAILER.size)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a valid HFile.")
+        self.info = json.loads(bytes(self.buffer[infoOffset:infoOffset + infoLength]).decode('utf-8'))
+        self.codec = CODECS.get(self.info.get('compression', COMPRESSION_NONE))
+
+    def loadIndex(self) -> Tuple[Tuple[List[str], List[Tuple[int, int]]], int]:
+        firstRows: List[str] = []
+        blocks: List[Tuple[int, int]] = []
+        offset = self.indexOffset
+        for _ in range(self.blockCount):
+            rowLength = SHORT.unpack_from(self.buffer, offset)[0]
+            offset += SHORT.size
+            firstRows.append(bytes(self.buffer[offset:offset + rowLength]).decode('utf-8'))
+            offset += rowLength
+            blocks.append(INDEX_ENTRY.unpack_from(self.buffer, offset))
+            offset += INDEX_ENTRY.size
+        return (firstRows, blocks), self.indexLength
+
+    @property
+    def index(self) -> Tuple[List[str], List[Tuple[int, int]]]:
+        """
+        The first row keys and the (offset, length) of every data block, kept in the block cache.
+        """
+        return blockCache.getBlock((self.path, self.indexOffset), self.loadIndex, INDEX)
+
+    @property
+    def bloom(self) -> BloomFilter:
+        """
+        The Bloom filter of the file, kept in the block cache next to the index.
+        """
+        return blockCache.getBlock((self.path, self.bloomOffset), lambda: (
+            BloomFilter.fromBytes(self.buffer[self.bloomOffset:self.bloomOffset + self.bloomLength]), self.bloomLength), INDEX)
+
+    def mightContain(self, rowKey: str, column: str = None) -> bool:
+        """
+        Check the Bloom filter of the file; False means the file holds nothing for the row (or cell).
+        """
+        bloomType = self.info['bloomType']
+        if bloomType == BLOOM_NONE:
+            return True
+        if bloomType == ROWCOL:
+            # Row delete markers are stored with an empty column
+            if column is None:
+                return True
+            return self.bloom.mightContain(BloomFilter.key(rowKey, column)) or self.bloom.mightContain(BloomFilter.key(rowKey, ''))
+        return self.bloom.mightContain(BloomFilter.key(rowKey))
+
+    def loadBlock(self, offset: int, length: int) -> Tuple[List[KeyValue], int]:
+        data = memoryview(self.buffer)[offset:offset + length]
+        if self.codec is not None:
+            data = self.codec.decompress(data)
+        return decodeBlock(data), len(data)
+
+    def readBlock(self, block: int) -> List[KeyValue]:
+        offset, length = self.index[1][block]
+        return blockCache.getBlock((self.path, offset), lambda: self.loadBlock(offset, length))
+
+    def getRow(self, rowKey: str) -> List[KeyValue]:
+        """
+        Return the entries of one row, decoding at most one block.
+        """
+        block = bisect_right(self.index[0], rowKey) - 1
+        if block < 0:
+            return []
+        keyValues = self.readBlock(block)
+        start = bisect_left(keyValues, rowKey, key=lambda keyValue: keyValue[0])
+        end = bisect_right(keyValues, rowKey, lo=start, key=lambda keyValue: keyValue[0])
+        return keyValues[start:end]
+
+    def getRows(self, rowKeys: Iterable[str]) -> Iterator[Tuple[str, List[KeyValue]]]:
+        """
+        Return (rowKey, entries) for the rows found among rowKeys, which must be sorted. The blocks
+        are walked forward, so every block is looked up and decoded at most once for the whole batch.
+        """
+        firstRows = self.index[0]
+        rowKey = lambda keyValue: keyValue[0]
+        block, keyValues, start = -1, [], 0
+        for key in rowKeys:
+            # Later keys never fall in an earlier block
+            found = bisect_right(firstRows, key, lo=max(block, 0)) - 1
+            if found < 0:
+                continue
+            if found != block:
+                block, keyValues, start = found, self.readBlock(found), 0
+            start = bisect_left(keyValues, key, lo=start, key=rowKey)
+            end = bisect_right(keyValues, key, lo=start, key=rowKey)
+            if start < end:
+                yield key, keyValues[start:end]
+            start = end
+
+    def scan(self, startRow: str = None, stopRow: str = None, reverse: bool = False) -> Iterator[KeyValue]:
+        """
+        Iterate over the entries of the rows in [startRow, stopRow) in order, one block at a time.
+        The first block is found through the block index and the scan stops at stopRow.
+
+        Parameters:
+            startRow (str, optional): The first row to return; the first row of the file if omitted.
+            stopRow (str, optional): The row to stop before; the end of the file if omitted.
+            reverse (bool): Return the rows from the last to the first, each with its entries in order.
+        """
+        firstRows = self.index[0]
+        rowKey = lambda keyValue: keyValue[0]
+        if not reverse:
+            first = max(bisect_right(firstRows, startRow) - 1, 0) if startRow is not None else 0
+            for block in range(first, self.blockCount):
+                keyValues = self.readBlock(block)
+                start = bisect_left(keyValues, startRow, key=rowKey) if startRow is not None and block == first else 0
+                for keyValue in keyValues[start:] if start else keyValues:
+                    if stopRow is not None and keyValue[0] >= stopRow:
+                        return
+                    yield keyValue
+            return
+
+        last = bisect_left(firstRows, stopRow) - 1 if stopRow is not None else self.blockCount - 1
+        for block in range(last, -1, -1):
+            keyValues = self.readBlock(block)
+            end = bisect_left(keyValues, stopRow, key=rowKey) if stopRow is not None and block == last else len(keyValues)
+            # Blocks start at row boundaries, so every row of the block is complete
+            rows = [list(entries) for _, entries in groupby(keyValues[:end], key=rowKey)]
+            for entries in reversed(rows):
+                if startRow is not None and entries[0][0] < startRow:
+                    return
+                yield from entries
+
+    def close(self) -> None:
+        blockCache.evictFile(self.path)
+        self.buffer.close()
+        self.file.close()
@@ -0,0 +1,150 @@
+# Standard library imports
+import heapq                      # Provides the k-way merge of sorted key/value streams
+from bisect import bisect_left, bisect_right  # Provides binary search over the versions of a cell
+from itertools import groupby     # Provides grouping of consecutive key/value entries
+from operator import itemgetter   # Provides fast access to the fields of a key/value tuple
+
+# Typing imports for type hinting
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
+
+# A key/value entry is the tuple (rowKey, column, timestamp, type, value).
+KeyValue = Tuple[str, str, float, int, Any]
+
+# A time range is the pair (minTimestamp, maxTimestamp), covering minTimestamp <= timestamp < maxTimestamp.
+TimeRange = Tuple[float, float]
+
+# Entry types stored in MemStores and store files.
+PUT = 0             # A value written by put or insert_many
+DELETE_VERSION = 1  # Hides the version of (rowKey, column) with exactly the same timestamp
+DELETE_ROW = 2      # Hides every version of the row in the column family up to its timestamp
+
+def keyValueOrder(keyValue: KeyValue):
+    """
+    Sort key of a key/value entry: row key, then column, then newest timestamp first,
+    with delete markers placed before the put they hide.
+    """
+    return (keyValue[0], keyValue[1], -keyValue[2], -keyValue[3])
+
+def mergeKeyValues(sources: Iterable[Iterable[KeyValue]], reverse: bool = False) -> Iterator[KeyValue]:
+    """
+    Merge several sorted key/value streams into a single sorted stream.
+
+    With reverse the streams, and the result, hold their rows from the last to the first,
+    while the entries of each row keep the keyValueOrder.
+    """
+    if not reverse:
+        return heapq.merge(*sources, key=keyValueOrder)
+    return reverseMerge(sources)
+
+def reverseMerge(sources: Iterable[Iterable[KeyValue]]) -> Iterator[KeyValue]:
+    # Merge whole rows by descending row key, then order the entries of each row
+    rowGroups = [((rowKey, list(entries)) for rowKey, entries in groupby(source, key=itemgetter(0))) for source in sources]
+    for _, groups in groupby(heapq.merge(*rowGroups, key=itemgetter(0), reverse=True), key=itemgetter(0)):
+        entries = [keyValue for _, rowEntries in groups for keyValue in rowEntries]
+        entries.sort(key=keyValueOrder)
+        yield from entries
+
+def reverseRows(keyValues: List[KeyValue]) -> List[KeyValue]:
+    """
+    Reorder entries sorted with keyValueOrder so their rows go from the last to the first.
+    """
+    rows = [list(entries) for _, entries in groupby(keyValues, key=itemgetter(0))]
+    return [keyValue for entries in reversed(rows) for keyValue in entries]
+
+def resolveKeyValues(keyValues: Iterable[KeyValue], keepDeletes: bool = False) -> Iterator[KeyValue]:
+    """
+    Apply the delete markers of a sorted key/value stream.
+
+    Parameters:
+        keyValues (Iterable[KeyValue]): A stream sorted with keyValueOrder.
+        keepDeletes (bool): Whether the delete markers themselves are kept in the output,
+                            as needed when only part of the store files are merged.
+
+    Yields:
+        KeyValue: The puts that are still visible (and the markers if requested), in order.
+    """
+    for _, rowEntries in groupby(keyValues, key=itemgetter(0)):
+        rowDeletedUntil = float('-inf')
+        deletedVersions = set()
+        previous = None
+        for keyValue in rowEntries:
+            if keyValue[3] == DELETE_ROW:
+                rowDeletedUntil = max(rowDeletedUntil, keyValue[2])
+                if keepDeletes:
+                    yield keyValue
+                continue
+            if keyValue[3] == DELETE_VERSION:
+                deletedVersions.add((keyValue[1], keyValue[2]))
+                if keepDeletes:
+                    yield keyValue
+                continue
+            if keyValue[2] <= rowDeletedUntil or (keyValue[1], keyValue[2]) in deletedVersions:
+                continue
+            # The same version can only be stored once
+            if previous is not None and previous[1] == keyValue[1] and previous[2] == keyValue[2]:
+                continue
+            previous = keyValue
+            yield keyValue
+
+def retainVersions(keyValues: Iterable[KeyValue], maxVersions: int = None, minVersions: int = 0,
+                   expiredBefore: float = None) -> Iterable[KeyValue]:
+    """
+    Apply the version limits of a column family to a sorted key/value stream.
+
+    Parameters:
+        keyValues (Iterable[KeyValue]): A stream sorted with keyValueOrder.
+        maxVersions (int, optional): The number of most recent versions kept for every cell; all of them if None.
+        minVersions (int): The number of most recent versions kept even once they have expired.
+        expiredBefore (float, optional): Versions older than this timestamp have expired.
+
+    Returns:
+        Iterable[KeyValue]: The puts within the limits and every delete marker, in order.
+    """
+    if maxVersions is None and expiredBefore is None:
+        return keyValues
+    return _retainVersions(keyValues, maxVersions, minVersions, expiredBefore)
+
+def _retainVersions(keyValues: Iterable[KeyValue], maxVersions: int, minVersions: int, expiredBefore: float) -> Iterator[KeyValue]:
+    cell = None
+    count = 0
+    for keyValue in keyValues:
+        if keyValue[3] != PUT:
+            yield keyValue
+            continue
+        if cell is None or cell[0] != keyValue[0] or cell[1] != keyValue[1]:
+            cell = keyValue
+            count = 0
+        # Versions of a cell arrive newest first
+        count += 1
+        if maxVersions is not None and count > maxVersions:
+            continue
+        if expiredBefore is not None and keyValue[2] < expiredBefore and count > minVersions:
+            continue
+        yield keyValue
+
+def negativeTimestamp(keyValue: KeyValue) -> float:
+    # The versions of a cell are sorted by descending timestamp, i.e. by ascending negative timestamp
+    return -keyValue[2]
+
+def selectVersions(keyValues: List[KeyValue], versions: int = 1, version: float = None,
+                   timeRange: Optional[TimeRange] = None) -> List[KeyValue]:
+    """
+    Pick the requested versions of a single cell, using binary search over its timestamps.
+
+    Parameters:
+        keyValues (List[KeyValue]): The visible puts of one cell, newest first.
+        versions (int): The number of most recent versions to return.
+        version (float): An exact timestamp to return instead of the most recent versions.
+        timeRange (TimeRange, optional): Only consider the versions in [minTimestamp, maxTimestamp).
+
+    Returns:
+        List[KeyValue]: The selected versions, oldest first.
+    """
+    if timeRange is not None:
+        start = bisect_right(keyValues, -timeRange[1], key=negativeTimestamp)
+        stop = bisect_right(keyValues, -timeRange[0], key=negativeTimestamp)
+        keyValues = keyValues[start:stop]
+    if version:
+        position = bisect_left(keyValues, -version, key=negativeTimestamp)
+        return keyValues[position:position + 1] if position < len(keyValues) and keyValues[position][2] == version else []
+    return keyValues[:versions][::-1]
@@ -0,0 +1,75 @@
+# Standard library imports
+from array import array  # Provides the compact buffers the result columns are accumulated in
+
+# Third-party imports
+import numpy as np
+import pandas as pd
+
+# Typing imports for type hinting
+from typing import Any, Dict, Iterable, List, Tuple
+
+# Columns of the results of scan, get and find.
+HEADERS = ['Row Key', 'CF:Column', 'Timestamp', 'Value']
+
+def typedArray(values: List[Any], complete: bool = True) -> np.ndarray:
+    """
+    Convert the values of one column to a NumPy array with a typed dtype when every value has
+    the same kind (integers, floats or booleans), or an object array otherwise.
+
+    Parameters:
+        values (List[Any]): The values of the column; None marks a missing value.
+        complete (bool): Whether the column has a value on every row. Missing values keep the
+                         column as objects (filled with NaN) so integers are never turned into floats.
+    """
+    kinds = set(map(type, values))
+    if complete and kinds:
+        try:
+            if kinds == {bool}:
+                return np.array(values, dtype=np.bool_)
+            if kinds == {int}:
+                return np.array(values, dtype=np.int64)
+            if kinds <= {int, float}:
+                return np.array(values, dtype=np.float64)
+        except OverflowError:
+            # Integers beyond 64 bits stay Python objects
+            pass
+    column = np.empty(len(values), dtype=object)
+    column[:] = values
+    if not complete:
+        column[[value is None for value in values]] = np.nan
+    return column
+
+class ResultBuilder:
+    """
+    Accumulates the cells of a scan column by column and turns them into a DataFrame in one pass:
+    row keys and CF:Column labels become pd.Categorical codes, timestamps a float64 array and
+    values a typed array whenever the column is homogeneous.
+    """
+    def __init__(self) -> None:
+        self.rowCodes = array('q')
+        self.rowKeys: Dict[str, int] = {}
+        self.labelCodes = array('q')
+        self.labels: Dict[str, int] = {}
+        self.timestamps = array('d')
+        self.values: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, rowKey: str, label: str, timestamp: float, value: Any) -> None:
+        self.rowCodes.append(self.rowKeys.setdefault(rowKey, len(self.rowKeys)))
+        self.labelCodes.append(self.labels.setdefault(label, len(self.labels)))
+        self.timestamps.append(timestamp)
+        self.values.append(value)
+
+    def extend(self, cells: Iterable[Tuple[str, str, float, Any]]) -> None:
+        for rowKey, label, timestamp, value in cells:
+            self.append(rowKey, label, timestamp, value)
+
+    def toFrame(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            HEADERS[0]: pd.Categorical.from_codes(np.frombuffer(self.rowCodes, dtype=np.int64), list(self.rowKeys)),
+            HEADERS[1]: pd.Categorical.from_codes(np.frombuffer(self.labelCodes, dtype=np.int64), list(self.labels)),
+            HEADERS[2]: np.frombuffer(self.timestamps, dtype=np.float64),
+            HEADERS[3]: typedArray(self.values),
+        })
@@ -0,0 +1,97 @@
+# Typing imports for type hinting
+from typing import Any, Dict, List, Tuple
+
+# Local application/library specific imports
+from .SortedIndex import SortedIndex
+
+# Comparison operators an index can answer.
+OPERATORS = ('=', '<', '<=', '>', '>=')
+
+# Greater than every row key, closing the entries of a value in the ordered set.
+MAX_ROW_KEY = chr(0x10FFFF)
+
+class SecondaryIndex:
+    """
+    Index of the current value of one column: an ordered set of (value key, row key) entries,
+    so equality and range lookups cost O(log n + k), together with the indexed value of every row.
+
+    The index is updated by the table on every write to the column. Lookups may still return
+    rows whose value expired through the column family TTL, so callers check the rows they read.
+    """
+    def __init__(self, family: str, column: str) -> None:
+        self.family = family
+        self.column = column
+        self.entries = SortedIndex()
+        self.values: Dict[str, Any] = {}
+
+    @property
+    def name(self) -> str:
+        return f"{self.family}:{self.column}"
+
+    @staticmethod
+    def valueKey(value: Any) -> Tuple:
+        # Numbers sort before strings and other values by their text, so columns mixing types stay comparable
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (0, value)
+        if isinstance(value, str):
+            return (1, value)
+        return (2, str(value))
+
+    def update(self, rowKey: str, value: Any) -> None:
+        """
+        Set the indexed value of a row; None removes the row from the index.
+        """
+        if rowKey in self.values:
+            self.entries.remove(self.valueKey(self.values.pop(rowKey)) + (rowKey,))
+        if value is not None:
+            self.values[rowKey] = value
+            self.entries.add(self.valueKey(value) + (rowKey,))
+
+    def remove(self, rowKey: str) -> None:
+        self.update(rowKey, None)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.values.clear()
+
+    def load(self, values: Dict[str, Any]) -> None:
+        """
+        Replace the indexed values by those given by row key, sorting the entries once.
+        """
+        self.values = {rowKey: value for rowKey, value in values.items() if value is not None}
+        self.entries = SortedIndex(self.valueKey(value) + (rowKey,) for rowKey, value in self.values.items())
+
+    def lookup(self, operator: str, value: Any) -> List[str]:
+        """
+        Return the row keys whose indexed value compares to value with operator, ordered by value.
+
+        Only values of the same kind (number, text or other) are compared.
+        """
+        key = self.valueKey(value)
+        lowest, highest = key[:1], (key[0] + 1,)
+        if operator == '=':
+            start, stop = key, key + (MAX_ROW_KEY,)
+        elif operator == '<':
+            start, stop = lowest, key
+        elif operator == '<=':
+            start, stop = lowest, key + (MAX_ROW_KEY,)
+        elif operator == '>':
+            start, stop = key + (MAX_ROW_KEY,), highest
+        elif operator == '>=':
+            start, stop = key, highest
+        else:
+            raise ValueError(f"Invalid operator '{operator}', expected one of {OPERATORS}.")
+        return [entry[-1] for entry in self.entries.irange(start, stop)]
+
+    @classmethod
+    def matches(cls, current: Any, operator: str, value: Any) -> bool:
+        """
+        Check a value read from the table against a condition, with the same ordering as lookup.
+        """
+        if current is None:
+            return False
+        currentKey, key = cls.valueKey(current), cls.valueKey(value)
+        if currentKey[0] != key[0]:
+            return False
+        return {'=': currentKey == key, '<': currentKey < key, '<=': currentKey <= key,
+                '>': currentKey > key, '>=': currentKey >= key}[operator]
@@ -0,0 +1,91 @@
+# Standard library imports
+from bisect import bisect_left  # Provides binary search over the sorted keys
+
+# Typing imports for type hinting
+from typing import Iterable, Iterator, List, Set
+
+class SortedIndex:
+    """
+    Ordered set of row keys: a sorted array searched with bisect, plus a small unsorted insert
+    buffer and a set of deleted keys that are merged into the array once either fills up or an
+    ordered read needs it.
+
+    Point lookups are O(log n), inserts are amortized O(log n) and ordered iteration can start
+    from any key.
+    """
+    # Minimum number of buffered inserts or deletes after which they are merged into the sorted
+    # array; large indexes buffer up to an eighth of their size so merges stay amortized O(1)
+    BUFFER_SIZE = 1024
+
+    def __init__(self, keys: Iterable[str] = ()) -> None:
+        self.keys: List[str] = sorted(set(keys))
+        self.buffer: Set[str] = set()
+        # Keys still in the sorted array that have been removed
+        self.deleted: Set[str] = set()
+
+    def merge(self) -> None:
+        if self.deleted:
+            self.keys = [key for key in self.keys if key not in self.deleted]
+            self.deleted.clear()
+        if self.buffer:
+            # Sorting two sorted runs back to back is linear. A new list is built, so iterations
+            # already in progress keep the keys they started with.
+            self.keys = sorted(self.keys + sorted(self.buffer))
+            self.buffer.clear()
+
+    def bufferLimit(self) -> int:
+        return max(self.BUFFER_SIZE, len(self.keys) // 8)
+
+    def inArray(self, key: str) -> bool:
+        position = bisect_left(self.keys, key)
+        return position < len(self.keys) and self.keys[position] == key
+
+    def __contains__(self, key: str) -> bool:
+        if key in self.buffer:
+            return True
+        return key not in self.deleted and self.inArray(key)
+
+    def __len__(self) -> int:
+        return len(self.keys) + len(self.buffer) - len(self.deleted)
+
+    def add(self, key: str) -> None:
+        if key in self.deleted:
+            self.deleted.discard(key)
+        elif key not in self.buffer and not self.inArray(key):
+            self.buffer.add(key)
+            if len(self.buffer) >= self.bufferLimit():
+                self.merge()
+
+    def remove(self, key: str) -> None:
+        if key in self.buffer:
+            self.buffer.discard(key)
+        elif self.inArray(key):
+            self.deleted.add(key)
+            if len(self.deleted) >= self.bufferLimit():
+                self.merge()
+
+    def clear(self) -> None:
+        self.keys = []
+        self.buffer.clear()
+        self.deleted.clear()
+
+    def irange(self, startKey: str = None, stopKey: str = None, reverse: bool = False) -> Iterator[str]:
+        """
+        Iterate over the keys in [startKey, stopKey) in order, or in reverse order.
+
+        Parameters:
+            startKey (str, optional): The first key to return; the smallest key if omitted.
+            stopKey (str, optional): The key to stop before; the end of the index if omitted.
+            reverse (bool): Iterate from the largest key down.
+        """
+        self.merge()
+        # Bind the current list, which merges replace instead of modifying, so open scanners see a stable snapshot
+        keys = self.keys
+        start = bisect_left(keys, startKey) if startKey is not None else 0
+        stop = bisect_left(keys, stopKey) if stopKey is not None else len(keys)
+        if reverse:
+            return (keys[position] for position in range(stop - 1, start - 1, -1))
+        return (keys[position] for position in range(start, stop))
+
+    def __iter__(self) -> Iterator[str]:
+        return self.irange()
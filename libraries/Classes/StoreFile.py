@@ -0,0 +1,161 @@
+# Standard library imports
+import os  # Provides functions to interact with the file system
+import shutil  # Provides moving files across file systems
+
+# Typing imports for type hinting
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+# Local application/library specific imports
+from .KeyValue import KeyValue, TimeRange
+from .HFile import HFileReader, HFileWriter, COMPRESSION_NONE
+from .BloomFilter import NONE
+
+class StoreFile:
+    """
+    Immutable, row-key-sorted HFile holding the key/value entries flushed from a MemStore.
+
+    Only the metadata of the file is pickled together with its table; the file itself is
+    memory-mapped the first time it is read.
+    """
+    def __init__(self, name: str, entries: int, firstRow: str, lastRow: str, size: int,
+                 minTimestamp: float = None, maxTimestamp: float = None, rawSize: int = None, dataSize: int = None,
+                 rowDeletes: int = None) -> None:
+        # Path of the file relative to the table directory
+        self.name = name
+        self.entries = entries
+        self.firstRow = firstRow
+        self.lastRow = lastRow
+        self.size = size
+        self.minTimestamp = minTimestamp
+        self.maxTimestamp = maxTimestamp
+        # Size of the data blocks before and after compression
+        self.rawSize = rawSize if rawSize is not None else size
+        self.dataSize = dataSize if dataSize is not None else size
+        # Number of row delete markers, unknown (None) for files written before it was recorded
+        self.rowDeletes = rowDeletes
+        self.directory = None
+        self.fileReader = None
+
+    @classmethod
+    def write(cls, directory: str, name: str, keyValues: Iterable[KeyValue], bloomType: str = NONE, expectedEntries: int = 0,
+              compression: str = COMPRESSION_NONE) -> 'StoreFile':
+        """
+        Write a new store file from entries already sorted with keyValueOrder.
+
+        Parameters:
+            directory (str): The table directory the file name is relative to.
+            name (str): The name of the new file.
+            keyValues (Iterable[KeyValue]): The sorted entries to store.
+            bloomType (str): The kind of Bloom filter to build for the file.
+            expectedEntries (int): An upper bound of the number of entries, used to size the Bloom filter.
+            compression (str): The codec compressing every data block.
+
+        Returns:
+            StoreFile: The new store file, or None if there was nothing to store.
+        """
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a partial store file behind.
+        writer = HFileWriter(f"{path}.tmp", bloomType=bloomType, expectedEntries=expectedEntries, compression=compression)
+        for keyValue in keyValues:
+            writer.append(keyValue)
+        info = writer.close()
+        if info['entries'] == 0:
+            os.remove(f"{path}.tmp")
+            return None
+        os.replace(f"{path}.tmp", path)
+
+        storeFile = cls(name, info['entries'], info['firstRow'], info['lastRow'], os.path.getsize(path),
+                        info['minTimestamp'], info['maxTimestamp'], info['rawSize'], info['dataSize'], info['rowDeletes'])
+        storeFile.open(directory)
+        return storeFile
+
+    def __setstate__(self, state):
+        # Files written before compression existed store their blocks as they are
+        state.setdefault('rawSize', state['size'])
+        state.setdefault('dataSize', state['size'])
+        state.setdefault('rowDeletes', None)
+        self.__dict__.update(state)
+
+    def __getstate__(self):
+        # The entries live in the file itself, never in the table snapshot
+        state = self.__dict__.copy()
+        state['directory'] = None
+        state['fileReader'] = None
+        return state
+
+    def open(self, directory: str) -> None:
+        self.directory = directory
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, self.name)
+
+    @property
+    def reader(self) -> HFileReader:
+        if self.fileReader is None:
+            self.fileReader = HFileReader(self.path)
+        return self.fileReader
+
+    def moveTo(self, directory: str, name: str) -> None:
+        """
+        Move the file to name, relative to the table directory it is then read from.
+        """
+        self.close()
+        path = os.path.join(directory, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.move(self.path, path)
+        self.name = name
+        self.open(directory)
+
+    def close(self) -> None:
+        # The memory map must be released before the file can be removed on every platform
+        if self.fileReader is not None:
+            self.fileReader.close()
+            self.fileReader = None
+
+    def mayContain(self, rowKey: str, column: str = None) -> bool:
+        """
+        Check the row range and Bloom filter of the file; False means it holds nothing for the row (or cell).
+        """
+        return self.firstRow <= rowKey <= self.lastRow and self.reader.mightContain(rowKey, column)
+
+    def inTimeRange(self, timeRange: Optional[TimeRange]) -> bool:
+        """
+        Check the timestamp range of the file; False means it holds nothing that affects versions in timeRange.
+        """
+        if timeRange is None or self.minTimestamp is None:
+            return True
+        if self.maxTimestamp < timeRange[0]:
+            return False
+        # Row delete markers newer than the range still hide the versions inside it
+        return self.minTimestamp < timeRange[1] or self.rowDeletes != 0
+
+    def keyValues(self, rowKey: str = None, column: str = None) -> Iterator[KeyValue]:
+        """
+        Iterate over the entries of the file, or only over those of one row.
+
+        Parameters:
+            rowKey (str, optional): Restrict the entries to a single row.
+            column (str, optional): A column of interest, only used to consult a row+column Bloom filter.
+        """
+        if rowKey is None:
+            return self.reader.scan()
+        if not self.mayContain(rowKey, column):
+            return iter(())
+        return iter(self.reader.getRow(rowKey))
+
+    def getRows(self, rowKeys: Iterable[str], column: str = None) -> Iterator[Tuple[str, List[KeyValue]]]:
+        """
+        Return (rowKey, entries) for the rows of the file among rowKeys, which must be sorted, in one
+        forward pass over the blocks. Keys ruled out by the row range or Bloom filter are skipped.
+        """
+        return self.reader.getRows(rowKey for rowKey in rowKeys if self.mayContain(rowKey, column))
+
+    def scan(self, startRow: str = None, stopRow: str = None, reverse: bool = False) -> Iterator[KeyValue]:
+        """
+        Iterate over the entries of the rows in [startRow, stopRow), skipping files outside the range.
+        """
+        if (stopRow is not None and stopRow <= self.firstRow) or (startRow is not None and startRow > self.lastRow):
+            return iter(())
+        return self.reader.scan(startRow, stopRow, reverse)
@@ -0,0 +1,86 @@
+# Typing imports for type hinting
+from typing import Any, Callable, Dict
+
+class TableCatalog(dict):
+    """
+    Dictionary of tables by name that only materializes a table the first time it is accessed.
+
+    Tables are registered at startup with the lightweight header stored at the beginning of their
+    snapshot, which is enough to list them and check whether they are enabled without reading any cell.
+    """
+    def __init__(self, loader: Callable[[str], Any]) -> None:
+        super().__init__()
+        # Function that loads a table by name and stores it in the catalog
+        self.loader = loader
+        # Headers of the tables that have not been materialized yet
+        self.headers: Dict[str, dict] = {}
+        # Tables whose write-ahead log holds records newer than their header
+        self.stale = set()
+
+    def register(self, name: str, header: dict, current: bool = True) -> None:
+        """
+        Register a table without loading it.
+
+        Parameters:
+            name (str): The name of the table.
+            header (dict): The header of its snapshot.
+            current (bool): False if logged mutations may have changed the table since the header was written.
+        """
+        super().__setitem__(name, None)
+        self.headers[name] = header
+        if current:
+            self.stale.discard(name)
+        else:
+            self.stale.add(name)
+
+    def isLoaded(self, name: str) -> bool:
+        return super().get(name) is not None
+
+    def header(self, name: str) -> dict:
+        """
+        Return the up-to-date header of a table that is not loaded, or None otherwise.
+        """
+        if self.isLoaded(name) or name in self.stale:
+            return None
+        return self.headers.get(name)
+
+    def storeFiles(self, name: str) -> list:
+        """
+        Return the names of the store files referenced by a table that is not loaded, or None otherwise.
+        Replaying the write-ahead log never writes store files, so a stale header still lists them all.
+        """
+        if self.isLoaded(name):
+            return None
+        header = self.headers.get(name)
+        return header.get('storeFiles') if header is not None else None
+
+    def __getitem__(self, name: str):
+        table = super().__getitem__(name)
+        if table is None:
+            table = self.loader(name)
+        return table
+
+    def __setitem__(self, name: str, table) -> None:
+        self.headers.pop(name, None)
+        self.stale.discard(name)
+        super().__setitem__(name, table)
+
+    def __delitem__(self, name: str) -> None:
+        self.headers.pop(name, None)
+        self.stale.discard(name)
+        super().__delitem__(name)
+
+    def get(self, name: str, default=None):
+        return self[name] if name in self else default
+
+    def values(self):
+        return [self[name] for name in self]
+
+    def items(self):
+        return [(name, self[name]) for name in self]
+
+    def loaded(self):
+        """
+        Return the tables that have already been materialized, by name.
+        """
+        return {name: table for name, table in super().items() if table is not None}
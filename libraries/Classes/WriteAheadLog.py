@@ -0,0 +1,207 @@
+# Standard library imports
+import os      # Provides functions to interact with the file system
+import pickle  # Provides functions for serializing and deserializing Python object structures
+import struct  # Provides packing of the fixed-size record headers
+import threading  # Provides the background flusher thread and the locks shared with it
+import zlib    # Provides the CRC32 checksum used to detect torn records
+
+# Typing imports for type hinting
+from typing import Any, Iterator, List, Set, Tuple
+
+class WriteAheadLog:
+    """
+    Append-only log of the mutations applied to a table since its last snapshot.
+
+    Every record is stored as a fixed header with the payload length and its CRC32, followed
+    by the pickled tuple (sequenceId, operation, args). A record that is incomplete or whose
+    checksum does not match marks the end of the log, so a write interrupted by a crash never
+    prevents the table from being loaded.
+
+    Without a flusher every append is written and fsynced before it returns. With a LogFlusher
+    (group commit) appends only encode the record into an in-memory buffer and the flusher
+    thread writes and fsyncs every buffered record at once.
+    """
+    # Record header: payload length and CRC32 of the payload.
+    HEADER = struct.Struct('<II')
+
+    def __init__(self, path: str, sequenceId: int = 0, flusher: 'LogFlusher' = None) -> None:
+        self.path = path
+        # Last sequence id handed out, never lower than the one stored in the table snapshot.
+        self.sequenceId = sequenceId
+        # Number of records currently stored in the log, buffered ones included.
+        self.records = 0
+        # Encoded records waiting to be written, and the last sequence id known to be on disk.
+        self.buffer: List[bytes] = []
+        self.syncedSequenceId = sequenceId
+        # The buffer lock is only held briefly; the sync lock serializes the writes to the file.
+        self.lock = threading.Lock()
+        self.syncLock = threading.Lock()
+        self.flusher = flusher
+
+        validLength = 0
+        for recordSequenceId, _, _, end in self._read():
+            self.sequenceId = max(self.sequenceId, recordSequenceId)
+            self.records += 1
+            validLength = end
+
+        self.file = open(path, 'ab')
+        # Drop a torn record left behind by a crash so new records are appended after valid data.
+        if self.file.tell() != validLength:
+            self.file.truncate(validLength)
+            self.file.seek(validLength)
+        self.syncedSequenceId = self.sequenceId
+        if flusher is not None:
+            flusher.register(self)
+
+    def _read(self) -> Iterator[Tuple[int, str, Tuple[Any, ...], int]]:
+        """
+        Iterate over the valid records stored in the log file.
+
+        Yields:
+            tuple: The sequence id, operation, arguments and end offset of each record.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as file:
+            data = file.read()
+        offset = 0
+        while offset + self.HEADER.size <= len(data):
+            length, checksum = self.HEADER.unpack_from(data, offset)
+            start = offset + self.HEADER.size
+            payload = data[start:start + length]
+            # Stop at the first incomplete or corrupted record.
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                return
+            sequenceId, operation, args = pickle.loads(payload)
+            offset = start + length
+            yield sequenceId, operation, args, offset
+
+    def append(self, operation: str, args: Tuple[Any, ...], durable: bool = False) -> int:
+        """
+        Append a mutation record to the log.
+
+        Parameters:
+            operation (str): The name of the mutation (e.g. 'put', 'delete').
+            args (tuple): The arguments needed to replay the mutation.
+            durable (bool): Wait until the record is on disk even when a flusher is attached.
+
+        Returns:
+            int: The sequence id assigned to the record.
+        """
+        with self.lock:
+            self.sequenceId += 1
+            sequenceId = self.sequenceId
+            payload = pickle.dumps((sequenceId, operation, args), protocol=pickle.HIGHEST_PROTOCOL)
+            self.buffer.append(self.HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+            self.records += 1
+            pending = len(self.buffer)
+
+        if self.flusher is None or durable:
+            self.sync()
+        elif pending >= self.flusher.batchSize:
+            # A full batch is written right away instead of waiting for the next interval
+            self.flusher.wake()
+        return sequenceId
+
+    def sync(self) -> int:
+        """
+        Write and fsync every buffered record, together with those appended while waiting.
+
+        Returns:
+            int: The last sequence id that is durable.
+        """
+        with self.syncLock:
+            with self.lock:
+                pending, self.buffer = self.buffer, []
+                sequenceId = self.sequenceId
+            if pending and not self.file.closed:
+                self.file.write(b''.join(pending))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+            with self.lock:
+                self.syncedSequenceId = max(self.syncedSequenceId, sequenceId)
+                return self.syncedSequenceId
+
+    def replay(self, afterSequenceId: int = 0) -> Iterator[Tuple[int, str, Tuple[Any, ...]]]:
+        """
+        Iterate over the records that are not yet reflected in the table snapshot.
+
+        Parameters:
+            afterSequenceId (int): The sequence id stored in the snapshot; older records are skipped.
+
+        Yields:
+            tuple: The sequence id, operation and arguments of each pending record.
+        """
+        for sequenceId, operation, args, _ in self._read():
+            if sequenceId > afterSequenceId:
+                yield sequenceId, operation, args
+
+    def truncate(self) -> None:
+        """
+        Discard every record once a snapshot containing them has been written.
+        """
+        with self.syncLock, self.lock:
+            self.buffer = []
+            self.file.truncate(0)
+            self.file.seek(0)
+            self.records = 0
+            self.syncedSequenceId = self.sequenceId
+
+    def close(self) -> None:
+        if self.flusher is not None:
+            self.flusher.unregister(self)
+        self.sync()
+        with self.syncLock:
+            self.file.close()
+
+class LogFlusher(threading.Thread):
+    """
+    Background thread that group-commits the buffered records of every registered log, either
+    every syncInterval seconds or as soon as one log has batchSize records waiting.
+    """
+    # Default seconds between two syncs
+    SYNC_INTERVAL = 0.05
+    # Default number of buffered records of a log that triggers an early sync
+    BATCH_SIZE = 256
+
+    def __init__(self, syncInterval: float = SYNC_INTERVAL, batchSize: int = BATCH_SIZE) -> None:
+        super().__init__(name='wal-flusher', daemon=True)
+        self.syncInterval = syncInterval
+        self.batchSize = batchSize
+        self.logs: Set[WriteAheadLog] = set()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stopped = False
+
+    def register(self, log: WriteAheadLog) -> None:
+        with self.lock:
+            self.logs.add(log)
+
+    def unregister(self, log: WriteAheadLog) -> None:
+        with self.lock:
+            self.logs.discard(log)
+
+    def wake(self) -> None:
+        self.wakeup.set()
+
+    def syncAll(self) -> None:
+        with self.lock:
+            logs = list(self.logs)
+        for log in logs:
+            log.sync()
+
+    def run(self) -> None:
+        while not self.stopped:
+            self.wakeup.wait(self.syncInterval)
+            self.wakeup.clear()
+            self.syncAll()
+
+    def stop(self) -> None:
+        """
+        Stop the thread once every buffered record has been written.
+        """
+        self.stopped = True
+        self.wake()
+        if self.is_alive():
+            self.join()
+        self.syncAll()
@@ -1,2 +1,15 @@
-from .Classes import Table
-from .CommandParse import parse_command
\ No newline at end of file
+from .Classes import Table, ColumnFamily
+from .CommandParse import parse_command
+from .WriteAheadLog import WriteAheadLog, LogFlusher
+from .StoreFile import StoreFile
+from .HFile import HFileReader, HFileWriter
+from .TableCatalog import TableCatalog
+from .BlockCache import BlockCache, blockCache
+from .BloomFilter import BloomFilter
+from .SortedIndex import SortedIndex
+from .SecondaryIndex import SecondaryIndex
+from .Filter import Filter, FilterList, PrefixFilter, RowFilter, QualifierFilter, ValueFilter, SingleColumnValueFilter, PageFilter, parseFilter
+from .ResultBuilder import ResultBuilder
+from .BulkReader import readRows, chunks
+from .BulkLoad import prepareBulkLoad, readManifest
+from .Aggregation import AggregateState
\ No newline at end of file
@@ -1,6 +1,5 @@
 # Standard Library Imports
 import os  # For interacting with the operating system
-import pickle  # For serializing and deserializing Python objects
 import time  # For time-related functions
 import json  # For serializing and deserializing JSON objects
 from typing import List, Dict, Any  # For type hinting and static type checking
@@ -15,7 +14,7 @@ from .TableManager import TableManager  # Importing the TableManager class from
 from .components import InputCommand, Table  # Importing specific components from the local components module
 
 class GUI_manager:
-    def __init__(self, tableDirectory:str):
+    def __init__(self, tableDirectory:str, durability:str = TableManager.SYNC_WAL):
         self.app = customtkinter.CTk()
         self.app.title('Hbase GUI Manager')
         self.app.geometry("960x540")
@@ -25,7 +24,7 @@ class GUI_manager:
 
         # Make input command
         self.inputCommand = InputCommand(self.app, self.obtainOperation)
-        self.tableManager = TableManager(tableDirectory)
+        self.tableManager = TableManager(tableDirectory, durability=durability)
         
     def change_table(self, data,  time:float=0.0):
         if hasattr(self, 'table'):
@@ -97,6 +96,27 @@ class GUI_manager:
 
         return True, returnStatement
 
+    def parseTimeRange(self, timerange):
+        """
+        Converts a -timerange=[t1,t2] value into a pair of timestamps.
+
+        Args:
+            timerange (list): The two timestamps given in the command, or None.
+
+        Returns:
+            list: The pair [t1, t2], None if no time range was given, or False after displaying an error.
+        """
+        if timerange is None:
+            return None
+        try:
+            timerange = [float(timestamp) for timestamp in timerange]
+        except (TypeError, ValueError):
+            timerange = []
+        if len(timerange) != 2 or timerange[0] >= timerange[1]:
+            self.messageLabel("Error: Invalid timerange format. Please provide -timerange=[t1,t2] with t1 < t2.")
+            return False
+        return timerange
+
     def obtainOperation(self, command):
         operation, variables = parse_command(command)
 
@@ -107,26 +127,41 @@ class GUI_manager:
             result = self.tableManager.list_()
             self.change_table(result, time.perf_counter() - init_time)
 
-        elif operation == 'scan':
+        elif operation == 'scan' or operation == 'find':
             init_time = time.perf_counter()
             # Perform validation for the 'is_enabled' operation
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['table'], optionalValues=['nversions'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table'],
+                                                          optionalValues=['nversions', 'startrow', 'stoprow', 'prefix', 'limit', 'reversed', 'timerange', 'where', 'filter'])
             # verify if the validation is successful
             if not validation:
                 return
-            # Extract table name from the return statement
-            table = returnStatement[0]
+            # Extract table name, the row range and the conditions on indexed columns from the return statement
+            table, nversions, startrow, stoprow, prefix, limit, reversed, timerange, where, filter = returnStatement
+            if operation == 'find' and not where:
+                self.messageLabel("Error: The required variable 'where' is missing. Please provide 'where'.")
+                return
+            # Flags given without a value cannot be used as row keys or as a limit
+            for name, value in (('startrow', startrow), ('stoprow', stoprow), ('prefix', prefix), ('limit', limit), ('nversions', nversions)):
+                if value is True:
+                    self.messageLabel(f"Error: The variable '{name}' requires a value, e.g. -{name}=value.")
+                    return
             # Extract nversions from the return statement
-            nversions = returnStatement[1] if returnStatement[1] else 1
-            # Ensure nversions is an integer
+            nversions = nversions if nversions else 1
+            # Ensure nversions and limit are integers
             try:
                 nversions = int(nversions)
+                limit = int(limit) if limit is not None else None
             except ValueError:
-                self.messageLabel("Error: Invalid nversions format. Please provide a valid nversions.")
+                self.messageLabel("Error: Invalid nversions or limit format. Please provide a valid number.")
+                return
+            timerange = self.parseTimeRange(timerange)
+            if timerange is False:
                 return
             # Call the scan method of tableManager
             # Return the result of the scan method and display it using change_table
-            result = self.tableManager.scan(table, nversions=nversions)
+            result = self.tableManager.scan(table, nversions=nversions, startrow=startrow, stoprow=stoprow,
+                                            prefix=prefix, limit=limit, reversed=bool(reversed), timerange=timerange,
+                                            where=where if where is not True else None, filter=filter if filter is not True else None)
 
             self.change_table(result, time.perf_counter() - init_time)
 
@@ -180,16 +215,17 @@ class GUI_manager:
             column_families: List[str] = column_families
             # Call the create method of tableManager to create the table with provided column families
             # Return the result of the create method and display it using messageLabel
-            self.messageLabel(self.tableManager.create(table, column_families))
+            # Any remaining variables are column family settings, e.g. -bloom={cf:ROWCOL}
+            self.messageLabel(self.tableManager.create(table, column_families, variables))
 
         elif operation == 'get':
             # Measure the initial time for performance tracking
             initial_time = time.perf_counter()
             # Check if 'table' and 'row' are present in the variables dictionary.
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row'], optionalValues=['column', 'version', 'nversions'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row'], optionalValues=['column', 'version', 'nversions', 'timerange', 'filter'])
             if validation:
-                # Extract table name, row, column name and version (if provided) from returnStatement
-                table, row, column_name, version, nversions = returnStatement
+                # Extract table name, row, column name, version, time range and filter (if provided) from returnStatement
+                table, row, column_name, version, nversions, timerange, filter = returnStatement
                 if version:
                     # Ensure version is an float
                     try:
@@ -207,24 +243,58 @@ class GUI_manager:
                         return
                 else:
                     nversions = 1
+                timerange = self.parseTimeRange(timerange)
+                if timerange is False:
+                    return
                 # If column name is provided, split it into column family and name
                 if column_name:
                     column_family = column_name.split(':')[0] if ':' in column_name else None
                     column_name = column_name.split(':')[1] if ':' in column_name else column_name
                     # Retrieve data from the tableManager based on provided parameters
-                    result = self.tableManager.get(table, row, column_family, column_name, nversions=nversions, version=version)
+                    result = self.tableManager.get(table, row, column_family, column_name, nversions=nversions, version=version, timerange=timerange,
+                                                   filter=filter)
                     # Calculate time taken for the operation
                     time_taken = time.perf_counter() - initial_time
                     # Update the table with the retrieved data and time taken
                     self.change_table(result, time_taken)
                 else:
                     # If column name is not provided or validation fails, retrieve data based on table and row only
-                    result = self.tableManager.get(table, row, nversions=nversions, version=version)
+                    result = self.tableManager.get(table, row, nversions=nversions, version=version, timerange=timerange, filter=filter)
                     # Calculate time taken for the operation
                     time_taken = time.perf_counter() - initial_time
                     # Update the table with the retrieved data and time taken
                     self.change_table(result, time_taken)
 
+        elif operation == 'multi_get':
+            # Measure the initial time for performance tracking
+            initial_time = time.perf_counter()
+            # Check if 'table' and 'rows' are present in the variables dictionary.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'rows'], optionalValues=['column', 'version', 'nversions', 'timerange', 'filter'])
+            if validation:
+                table, rows, column_name, version, nversions, timerange, filter = returnStatement
+                # Ensure version is a float and nversions an integer
+                try:
+                    version = float(version) if version else None
+                    nversions = int(nversions) if nversions else 1
+                except ValueError:
+                    self.messageLabel("Error: Invalid version or nversions format. Please provide a valid number.")
+                    return
+                timerange = self.parseTimeRange(timerange)
+                if timerange is False:
+                    return
+                # If column name is provided, split it into column family and name
+                column_family = None
+                if not isinstance(column_name, str):
+                    column_name = None
+                if column_name:
+                    column_family = column_name.split(':')[0] if ':' in column_name else None
+                    column_name = column_name.split(':')[1] if ':' in column_name else column_name
+                # Retrieve every row in a single call and display the combined result
+                result = self.tableManager.get_many(table, rows if isinstance(rows, list) else [rows], column_family, column_name,
+                                                    nversions=nversions, version=version, timerange=timerange,
+                                                    filter=filter if filter is not True else None)
+                self.change_table(result, time.perf_counter() - initial_time)
+
         elif operation == 'count':
             # Check if 'table' is in the variables dictionary.
             validation, returnStatement = self.validation(variables=variables, expectedValues=['table'])
@@ -254,42 +324,40 @@ class GUI_manager:
 
         elif operation == 'delete':
             # Validate that the required variables 'table', 'row', 'column_name', and 'timestamp' are present in the input.
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row', 'column', 'timestamp'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row', 'column', 'timestamp'], optionalValues=['durable'])
             if validation:
                 try:
                     # Extract and convert timestamp to float.
-                    table, row, column_name, timestamp_str = returnStatement
+                    table, row, column_name, timestamp_str, durable = returnStatement
                     timestamp_float = float(timestamp_str)
                 except ValueError:
                     self.messageLabel("Error: Invalid timestamp format. Please provide a valid timestamp.")
                     return  # Exit if timestamp conversion fails
 
                 # Call the delete method on the tableManager with the validated parameters and display the result.
-                self.messageLabel(self.tableManager.delete(table, row, column_name, timestamp_float))
+                self.messageLabel(self.tableManager.delete(table, row, column_name, timestamp_float, durable=bool(durable)))
 
         elif operation == 'delete_all':
             # Validate that the required variables 'table', 'row', 'column_name', and 'timestamp' are present in the input.
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row'], optionalValues=['durable'])
             if validation:
                     # Unpack the returnStatement list into individual variables.
-                    table, row = returnStatement
+                    table, row, durable = returnStatement
                     # Call the delete method on the tableManager with the validated parameters and display the result.
-                    self.messageLabel(self.tableManager.deleteAll(table, row))
+                    self.messageLabel(self.tableManager.deleteAll(table, row, durable=bool(durable)))
 
         elif operation == 'put':
             # Validate that the required variables 'table', 'row', 'column', and 'value' are present in the input.
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row', 'column', 'value'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'row', 'column', 'value'], optionalValues=['durable'])
             if validation:
                 # Unpack the returnStatement list into individual variables.
-                table, row, column, value = returnStatement
+                # -durable waits until the value is on disk in the asynchronous durability mode.
+                table, row, column, value, durable = returnStatement
                 # Extract the column family from the column variable.
                 column_family = column.split(':')[0] if ':' in column else ''
                 column = column.split(':')[1] if ':' in column else column
-                # Save in a pickle
-                with open(f'./Tables/{table}.hfile', 'wb') as file:
-                    pickle.dump(self.tableManager.tables[table], file)
                 # Call the put method on the tableManager with the validated parameters and display the result.
-                self.messageLabel(self.tableManager.put(table, row, column_family, column, value))
+                self.messageLabel(self.tableManager.put(table, row, column_family, column, value, durable=bool(durable)))
 
         elif operation == 'alter':
             # Validate that the required variables 'table', 'column_family', and 'columns' are present in the input.
@@ -309,6 +377,85 @@ class GUI_manager:
                 # Call the truncate method on the tableManager with the validated parameters and display the result.
                 self.messageLabel(self.tableManager.truncate(table))
 
+        elif operation == 'flush':
+            # Validate that the required variable 'table' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table'])
+            if validation:
+                # Unpack the returnStatement list into individual variables.
+                table: str = returnStatement[0]
+                # Call the flush method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.flush(table))
+
+        elif operation == 'compact' or operation == 'major_compact':
+            # Validate that the required variable 'table' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table'])
+            if validation:
+                # Unpack the returnStatement list into individual variables.
+                table: str = returnStatement[0]
+                # Call the compact method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.compact(table, major=operation == 'major_compact'))
+
+        elif operation == 'snapshot':
+            # Validate that the required variables 'table' and 'name' are present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'name'])
+            if validation:
+                table, name = returnStatement
+                # Call the snapshot method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.snapshot(table, name))
+
+        elif operation == 'restore_snapshot':
+            # Validate that the required variable 'name' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['name'])
+            if validation:
+                # Call the restoreSnapshot method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.restoreSnapshot(returnStatement[0]))
+
+        elif operation == 'clone_snapshot':
+            # Validate that the required variables 'name' and 'table' are present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['name', 'table'])
+            if validation:
+                name, table = returnStatement
+                # Call the cloneSnapshot method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.cloneSnapshot(name, table))
+
+        elif operation == 'delete_snapshot':
+            # Validate that the required variable 'name' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['name'])
+            if validation:
+                # Call the deleteSnapshot method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.deleteSnapshot(returnStatement[0]))
+
+        elif operation == 'list_snapshots':
+            init_time = time.perf_counter()
+            # Call the listSnapshots method of tableManager and display the result using change_table
+            result = self.tableManager.listSnapshots()
+            self.change_table(result, time.perf_counter() - init_time)
+
+        elif operation == 'sync':
+            # Validate the optional 'table' variable; without it every table is synced.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=[], optionalValues=['table'])
+            if validation:
+                table: str = returnStatement[0]
+                # Call the sync method on the tableManager and display the result.
+                self.messageLabel(self.tableManager.sync(table))
+
+        elif operation == 'create_index' or operation == 'drop_index':
+            # Validate that the required variables 'table' and 'column' are present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'column'])
+            if validation:
+                table, column = returnStatement
+                # Create or remove the secondary index of the column and display the result.
+                if operation == 'create_index':
+                    self.messageLabel(self.tableManager.createIndex(table, column))
+                else:
+                    self.messageLabel(self.tableManager.dropIndex(table, column))
+
+        elif operation == 'cache_stats':
+            initial_time = time.perf_counter()
+            # Call the cacheStats method on the tableManager and display the counters.
+            result = self.tableManager.cacheStats()
+            self.change_table(result, time.perf_counter() - initial_time)
+
         elif operation == 'describe':
             # Validate that the required variable 'table' is present in the input.
             validation, returnStatement = self.validation(variables=variables, expectedValues=['table'])
@@ -321,19 +468,60 @@ class GUI_manager:
                 # Call the describe method on the tableManager with the validated parameters and display the result.
                 self.change_table(result, time.perf_counter() - initial_time)
 
+        elif operation == 'aggregate':
+            # Validate that the required variable 'table' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table'],
+                                                          optionalValues=['column', 'fn', 'startrow', 'stoprow', 'groupby'])
+            if validation:
+                initial_time = time.perf_counter()
+                # Flags given without a value are ignored.
+                table, column, fn, startrow, stoprow, groupby = [value if value is not True else None for value in returnStatement]
+                # Compute the aggregate inside the table and display the single result row.
+                result = self.tableManager.aggregate(table, column, fn or 'count', startrow, stoprow, groupby)
+                self.change_table(result, time.perf_counter() - initial_time)
+
+        elif operation == 'bulkload':
+            # Validate that the required variables 'table' and 'file' are present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['table', 'file'], optionalValues=['output'])
+            if validation:
+                table, file, output = returnStatement
+                # Write the sorted store files without touching the table and display where they are.
+                self.messageLabel(self.tableManager.bulkload(table, file, output if isinstance(output, str) else None))
+
+        elif operation == 'complete_bulkload':
+            # Validate that the required variable 'dir' is present in the input.
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['dir'], optionalValues=['table'])
+            if validation:
+                directory, table = returnStatement
+                # Attach the prepared store files to the table and display the result.
+                self.messageLabel(self.tableManager.completeBulkload(directory, table if isinstance(table, str) else None))
+
         elif operation == 'insert_many':
             # Validate that the required variable 'table' is present in the input.
-            validation, returnStatement = self.validation(variables=variables, expectedValues=['file'])
+            validation, returnStatement = self.validation(variables=variables, expectedValues=['file'], optionalValues=['durable', 'table'])
             if validation:
                 # Unpack the returnStatement list into individual variables.
                 file: str = returnStatement[0]
+                durable = bool(returnStatement[1])
+                table = returnStatement[2] if isinstance(returnStatement[2], str) else None
+                if file.lower().endswith(('.jsonl', '.ndjson', '.csv')):
+                    def progress(rows, elapsed):
+                        # Show the throughput while the file is still being read
+                        self.messageLabel(f"{rows} row(s) loaded, {rows / max(elapsed, 1e-9):.0f} rows/s")
+                        self.app.update_idletasks()
+                    try:
+                        # Stream the rows of the file in chunks instead of reading it at once
+                        self.messageLabel(self.tableManager.loadRows(file, table, progress=progress))
+                    except Exception as e:
+                        self.messageLabel(f"Error: {e}")
+                    return
                 try:
                     # Attempt to read the specified file as JSON
                     with open(file, 'rb') as file:
                         # Load the JSON data from the file
                         data = json.load(file)
                     # Insert the loaded data into the table managed by tableManager
-                    self.messageLabel(self.tableManager.insertMany(data))
+                    self.messageLabel(self.tableManager.insertMany(data, durable=durable))
                 except Exception as e:
                     self.messageLabel(f"Error: {e}")
 
@@ -341,4 +529,6 @@ class GUI_manager:
             self.messageLabel(f"Error: The provided command '{operation}' is not recognized.")
 
     def mainloop(self):
-        self.app.mainloop()
\ No newline at end of file
+        self.app.mainloop()
+        # Save pending changes so tables can be loaded lazily on the next start
+        self.tableManager.close()
\ No newline at end of file
@@ -4,30 +4,276 @@ import time # Provides various time-related functions
 import re   # Provides support for regular expressions
 
 import pickle  # Provides functions for serializing and deserializing Python object structures
+import shutil  # Provides the removal of attached bulk load directories
+import uuid    # Provides unique names for bulk load directories
 
 # Third-party library imports
 import pandas as pd  # Provides data structures and data analysis tools (if needed, this should be installed via pip)
 
 # Local application/library specific imports
-from .Classes import Table  # Imports the Table class from the local Classes module
+from .Classes import Table, ColumnFamily, WriteAheadLog, LogFlusher, StoreFile, TableCatalog, blockCache  # Imports the storage classes from the local Classes module
+from .Classes.BloomFilter import BLOOM_TYPES  # Imports the valid Bloom filter types of a column family
+from .Classes.HFile import COMPRESSION_TYPES  # Imports the valid block compression codecs of a column family
+from .Classes.Classes import parseValue  # Imports the conversion of values given as text, shared with put
+from .Classes.SecondaryIndex import OPERATORS  # Imports the comparison operators answered by secondary indexes
+from .Classes.Filter import parseFilter  # Imports the parser of the scan and get filter language
+from .Classes.BulkReader import CHUNK_SIZE, chunks, readRows  # Imports the incremental readers of JSON Lines and CSV files
+from .Classes.BulkLoad import SPILL_SIZE, prepareBulkLoad, readManifest  # Imports the offline writer of bulk loaded store files
 
 # Typing imports for type hinting
 from typing import Dict, List, Union  # Provides support for type hints, Dict and List in this case
 
 class TableManager:
-    def __init__(self, tableDirectory:str) -> None:
+    # Number of logged mutations after which a full snapshot of the table is written.
+    SNAPSHOT_INTERVAL = 1000
+    # MemStore size in bytes at which loadRows flushes, larger than usual so a load writes few store files.
+    LOAD_FLUSH_SIZE = 8 * 1024 * 1024
+    # Version of the header written at the beginning of every table snapshot.
+    HEADER_FORMAT = 3
+    # Durability modes: every mutation is fsynced before it is acknowledged, or it is
+    # acknowledged once buffered and group-committed by a background thread.
+    SYNC_WAL = 'sync'
+    ASYNC_WAL = 'async'
+    # Directory, inside the table directory, holding the manifests of named snapshots.
+    SNAPSHOT_DIRECTORY = '.snapshots'
+    # Directory, inside the table directory, holding the store files of prepared bulk loads.
+    BULKLOAD_DIRECTORY = '.bulkload'
+
+    def __init__(self, tableDirectory:str, blockCacheSize:int = None, durability:str = SYNC_WAL,
+                 syncInterval:float = LogFlusher.SYNC_INTERVAL, batchSize:int = LogFlusher.BATCH_SIZE) -> None:
         self.tableDirectory = tableDirectory
+        # Byte budget of the block cache shared by every table of the process
+        if blockCacheSize is not None:
+            blockCache.resize(blockCacheSize)
+        if durability not in (self.SYNC_WAL, self.ASYNC_WAL):
+            raise ValueError(f"Invalid durability '{durability}', expected '{self.SYNC_WAL}' or '{self.ASYNC_WAL}'.")
+        # Background thread group-committing the write-ahead logs in the asynchronous mode
+        self.logFlusher = None
+        if durability == self.ASYNC_WAL:
+            self.logFlusher = LogFlusher(syncInterval, batchSize)
+            self.logFlusher.start()
         # Verify if the directory exists and files are stored in it and save in a list
-        self.tables:Dict[str, Table] = {}
+        # Tables are only registered here and loaded on first access
+        self.tables:Dict[str, Table] = TableCatalog(self.loadTable)
+        # Write-ahead log of every table, holding the mutations made since its last snapshot
+        self.logs:Dict[str, WriteAheadLog] = {}
+        # Headers of the named snapshots, which reference immutable store files instead of copying them
+        self.snapshots:Dict[str, dict] = {}
         if os.path.exists(tableDirectory):
             for file in os.listdir(tableDirectory):
                 if file.endswith('.hfile'):
-                    self.tables[file.split('.')[0]] = pickle.load(open(f"{tableDirectory}/{file}", 'rb'))
-                    self.tables[file.split('.')[0]].obtainTableInfoWithMetadata()
+                    self.registerTable(file.split('.')[0])
+            snapshot_directory = os.path.join(tableDirectory, self.SNAPSHOT_DIRECTORY)
+            if os.path.exists(snapshot_directory):
+                for file in os.listdir(snapshot_directory):
+                    if file.endswith('.snapshot'):
+                        with open(os.path.join(snapshot_directory, file), 'rb') as snapshot:
+                            self.snapshots[file[:-len('.snapshot')]] = pickle.load(snapshot)
         else:
             os.mkdir(tableDirectory)
             raise Exception(f"Table directory {tableDirectory} does not exist. Created a new directory.")
 
+    def registerTable(self, table: str):
+        """
+        Register a table from the header of its snapshot without loading its data.
+
+        Parameters:
+            table (str): The name of the table to register.
+        """
+        with open(f"{self.tableDirectory}/{table}.hfile", 'rb') as file:
+            header = pickle.load(file)
+
+        # Snapshots written before headers existed hold the table itself, which is already loaded.
+        if isinstance(header, Table):
+            self.loadTable(table, header)
+            return
+
+        # Pending log records may have changed the table since the header was written.
+        log_path = f"{self.tableDirectory}/{table}.wal"
+        pending = os.path.exists(log_path) and os.path.getsize(log_path) > 0
+        self.tables.register(table, header, current=not pending)
+
+    def loadTable(self, table: str, data: Table = None) -> Table:
+        """
+        Load a table from its last snapshot and replay the mutations recorded in its write-ahead log.
+
+        Parameters:
+            table (str): The name of the table to load.
+            data (Table, optional): The snapshot, if it was already read from the file.
+
+        Returns:
+            Table: The loaded table.
+        """
+        # Read the last full snapshot of the table, which follows its header.
+        if data is None:
+            with open(f"{self.tableDirectory}/{table}.hfile", 'rb') as file:
+                data = pickle.load(file)
+                if not isinstance(data, Table):
+                    data = pickle.load(file)
+        # Store files are read lazily from the table directory.
+        data.openStoreFiles(self.tableDirectory)
+
+        # Replay the mutations that happened after the snapshot was taken.
+        log = WriteAheadLog(f"{self.tableDirectory}/{table}.wal", data.lastSequenceId, self.logFlusher)
+        for sequenceId, operation, args in log.replay(data.lastSequenceId):
+            self.applyMutation(data, operation, args)
+            data.lastSequenceId = sequenceId
+
+        self.tables[table] = data
+        self.logs[table] = log
+        return data
+
+    def applyMutation(self, data: Table, operation: str, args: tuple):
+        """
+        Apply a mutation read from the write-ahead log to a table.
+
+        Parameters:
+            data (Table): The table to modify.
+            operation (str): The name of the logged mutation.
+            args (tuple): The arguments of the logged mutation.
+        """
+        if operation == 'put':
+            data.insertOrUpdateRow(*args)
+        elif operation == 'delete':
+            data.deleteVersion(*args)
+        elif operation == 'delete_all':
+            data.deleteRow(*args)
+        elif operation == 'enable':
+            data.isEnable = args[0]
+        elif operation == 'insert_many':
+            data.insertMany(*args)
+
+    def logMutation(self, table: str, operation: str, *args, durable: bool = False):
+        """
+        Record a mutation that was already applied in memory, taking a new snapshot once the log grows too long.
+
+        Parameters:
+            table (str): The name of the modified table.
+            operation (str): The name of the mutation.
+            *args: The arguments needed to replay the mutation.
+            durable (bool): Wait until the record is on disk, even in the asynchronous durability mode.
+        """
+        self.tables[table].lastSequenceId = self.logs[table].append(operation, args, durable)
+        if self.tables[table].needsFlush():
+            self.flushTable(table)
+        elif self.logs[table].records >= self.SNAPSHOT_INTERVAL:
+            self.saveTable(table)
+
+    def flushTable(self, table: str, force: bool = False, major: bool = False):
+        """
+        Flush the MemStores of a table to store files, compact them if needed and save the table.
+
+        Parameters:
+            table (str): The name of the table to flush.
+            force (bool): Flush every MemStore, even those below the flush size.
+            major (bool): Run a major compaction instead of a minor compaction that only
+                          happens once enough store files have accumulated.
+        """
+        data = self.tables[table]
+        data.flush(self.tableDirectory, table, force)
+        obsolete = data.compact(self.tableDirectory, table, major=major)
+        # Regions that grew too large are split once their MemStores are on disk
+        obsolete += data.split(self.tableDirectory, table)
+
+        # The table must reference the new store files before the old ones are removed.
+        self.saveTable(table)
+        self.removeStoreFiles(obsolete)
+
+    def storeFileReferences(self) -> set:
+        """
+        Return the names of the store files still referenced by a table or a named snapshot.
+        """
+        references = set()
+        for header in self.snapshots.values():
+            references.update(header['storeFiles'])
+        for table in self.tables:
+            # Tables that are not loaded are answered from their snapshot header, even with pending log records.
+            storeFiles = self.tables.storeFiles(table)
+            if storeFiles is not None:
+                references.update(storeFiles)
+            else:
+                references.update(storeFile.name for storeFile in self.tables[table].storeFiles())
+        return references
+
+    def removeStoreFiles(self, storeFiles: List[StoreFile]):
+        """
+        Delete store files that are no longer referenced by their table, unless a snapshot
+        or a cloned table still references them.
+
+        Parameters:
+            storeFiles (List[StoreFile]): The store files to delete.
+        """
+        if not storeFiles:
+            return
+        references = self.storeFileReferences()
+        for storeFile in storeFiles:
+            storeFile.close()
+            if storeFile.name not in references and os.path.exists(storeFile.path):
+                os.remove(storeFile.path)
+        # Region folders go away with their last file, and so does the folder of a dropped table.
+        for folder in {os.path.dirname(storeFile.name) for storeFile in storeFiles}:
+            while folder:
+                store_directory = os.path.join(self.tableDirectory, folder)
+                if not os.path.isdir(store_directory) or os.listdir(store_directory) or folder in self.tables:
+                    break
+                os.rmdir(store_directory)
+                folder = os.path.dirname(folder)
+
+    def saveTable(self, table: str):
+        """
+        Write a full snapshot of the table and discard the write-ahead log records it contains.
+
+        Parameters:
+            table (str): The name of the table to save.
+        """
+        path = f"{self.tableDirectory}/{table}.hfile"
+        # The header lets the table be listed and described without loading it. It only holds metadata
+        # kept in memory, so a periodic snapshot costs no scan of the table.
+        data = self.tables[table]
+        header = {'format': self.HEADER_FORMAT, 'isEnable': data.isEnable,
+                  'columnFamilies': [cf.name for cf in data.columnFamilies if cf.name != ''],
+                  'description': data.metadata(),
+                  'storeFiles': [storeFile.name for storeFile in data.storeFiles()]}
+        # Write to a temporary file first so a crash never leaves a partial snapshot behind.
+        with open(f"{path}.tmp", 'wb') as file:
+            pickle.dump(header, file)
+            pickle.dump(self.tables[table], file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(f"{path}.tmp", path)
+
+        if table in self.logs:
+            self.logs[table].truncate()
+        else:
+            self.logs[table] = WriteAheadLog(f"{self.tableDirectory}/{table}.wal", self.tables[table].lastSequenceId, self.logFlusher)
+
+    def isTableEnabled(self, table: str) -> bool:
+        """
+        Check whether a table is enabled, reading its header if it is not loaded.
+
+        Parameters:
+            table (str): The name of an existing table.
+        """
+        header = self.tables.header(table)
+        if header is not None:
+            # Headers written before format 2 carried a full description of the table
+            return header['isEnable'] if 'isEnable' in header else header['description']['isEnable']
+        return self.tables[table].isEnable
+
+    def close(self):
+        """
+        Save every loaded table with pending log records and close the write-ahead logs,
+        so the headers are up to date and the tables can be loaded lazily next time.
+        """
+        for table, log in list(self.logs.items()):
+            if log.records > 0:
+                self.saveTable(table)
+            log.close()
+        self.logs.clear()
+        if self.logFlusher is not None:
+            self.logFlusher.stop()
+            self.logFlusher = None
+
     def outputFormatter(self, time, rows):
         """
         Formats the output message based on the execution time and number of rows.
@@ -43,12 +289,24 @@ class TableManager:
         time_str = f"{time * 1000:.4f} ms" if time < 1 else f"{time:.4f} s"
         return f"{rows} row(s) in {time_str}"
 
-    def scan(self, table: str, nversions:int = 1, version:float = None):
+    def scan(self, table: str, nversions:int = 1, version:float = None, startrow:str = None, stoprow:str = None,
+             prefix:str = None, limit:int = None, reversed:bool = False, timerange: List[float] = None,
+             where: Union[str, List[str]] = None, filter: str = None):
         """
         Scan the specified table and retrieve its data along with metadata.
 
         Parameters:
             table (str): The name of the table to scan.
+            startrow (str, optional): The first row key to return.
+            stoprow (str, optional): The row key to stop before.
+            prefix (str, optional): Only return the row keys starting with this prefix.
+            limit (int, optional): The maximum number of rows to return.
+            reversed (bool): Return the rows from the last to the first.
+            timerange (List[float], optional): Only return the versions with t1 <= timestamp < t2.
+            where (str or List[str], optional): Conditions such as 'cf:col=value' or 'cf:col>=10' on indexed
+                                                columns; only the matching rows are read, through the indexes.
+            filter (str, optional): A filter expression such as "SingleColumnValueFilter('cf','col',=,'x') AND PageFilter(10)",
+                                    evaluated on every row and cell while the table is read.
 
         Returns:
             pd.DataFrame: A DataFrame containing the table's data and metadata, 
@@ -56,13 +314,107 @@ class TableManager:
         """
         # Check if the specified table exists in the database.
         if table in self.tables:
-            # Retrieve and return the table's data along with metadata.
-            return self.tables[table].obtainTableInfoWithMetadata(versions=nversions, version=version)
+            try:
+                scanFilter = parseFilter(filter, parseValue) if filter else None
+            except ValueError as e:
+                return pd.DataFrame({"Error": [str(e)]})
+            if where:
+                try:
+                    conditions = self.parseWhere(where)
+                    return self.tables[table].find(conditions, startrow, stoprow, prefix, limit, reversed, versions=nversions,
+                                                   version=version, timeRange=timerange, filter=scanFilter)
+                except ValueError as e:
+                    return pd.DataFrame({"Error": [str(e)]})
+                except KeyError as e:
+                    return pd.DataFrame({"Error": [f"Column {e} has no secondary index"]})
+            # Seek to the first row of the range and stop at its end or once limit rows were read.
+            return self.tables[table].scan(startrow, stoprow, prefix, limit, reversed, versions=nversions, version=version,
+                                             timeRange=timerange, filter=scanFilter)
 
         else:
             # Return an error message if the table does not exist.
             return pd.DataFrame({"Error": ["Table not found"]})
 
+    def open_scanner(self, table: str, nversions:int = 1, version:float = None, startrow:str = None, stoprow:str = None,
+                     prefix:str = None, limit:int = None, reversed:bool = False, timerange: List[float] = None,
+                     where: Union[str, List[str]] = None, filter: str = None, rows: bool = False):
+        """
+        Open a scanner over the specified table that yields its cells one at a time instead of building a DataFrame.
+
+        Parameters:
+            table (str): The name of the table to scan.
+            rows (bool): Yield (row key, [(CF:Column, Timestamp, Value), ...]) once per row instead of single cells.
+            The remaining parameters restrict the rows and versions as in scan.
+
+        Returns:
+            Iterator[tuple]: The Row Key, CF:Column, Timestamp and Value of every returned version, in row key order.
+                             Cells are read lazily; pass the scanner to pd.DataFrame to materialize it.
+
+        Raises:
+            ValueError: If the table does not exist, or the filter or a condition is not valid.
+        """
+        # Check if the specified table exists in the database.
+        if table not in self.tables:
+            raise ValueError("Table not found")
+        scanFilter = parseFilter(filter, parseValue) if filter else None
+        rowKeys = None
+        if where:
+            try:
+                rowKeys = self.tables[table].indexedRowKeys(self.parseWhere(where))
+            except KeyError as e:
+                raise ValueError(f"Column {e} has no secondary index")
+        return self.tables[table].scanner(startrow, stoprow, prefix, limit, reversed, versions=nversions, version=version,
+                                          timeRange=timerange, rowKeys=rowKeys, filter=scanFilter, rows=rows)
+
+    def aggregate(self, table: str, column: str = None, fn: str = 'count', startrow: str = None, stoprow: str = None,
+                  groupby: str = None):
+        """
+        Compute count, sum, avg, min or max of a column inside the table, returning only the result.
+
+        Parameters:
+            table (str): The name of the table to aggregate.
+            column (str, optional): The aggregated column as 'family:column'; count without a column counts the rows.
+            fn (str): One of count, sum, avg, min and max.
+            startrow (str, optional): The first row key to aggregate.
+            stoprow (str, optional): The row key to stop before.
+            groupby (str, optional): A 'family:column' whose newest value groups the rows.
+
+        Returns:
+            pd.DataFrame: A single row with the aggregate, one row per group with groupby,
+                          or an error message.
+        """
+        # Check if the specified table exists in the database.
+        if table not in self.tables:
+            return pd.DataFrame({"Error": ["Table not found"]})
+        fn = (fn or 'count').lower()
+        try:
+            if column is None:
+                if fn != 'count' or groupby is not None:
+                    raise ValueError("A column of the form family:column is required.")
+                return pd.DataFrame({"count(*)": [self.tables[table].countRows(startrow, stoprow)]})
+            family, column = self.parseColumn(column)
+            groupBy = self.parseColumn(groupby) if groupby else None
+            result = self.tables[table].aggregate(family, column, fn, startrow, stoprow, groupBy)
+        except ValueError as e:
+            return pd.DataFrame({"Error": [str(e)]})
+        label = f"{fn}({family}:{column})"
+        if groupBy is None:
+            return pd.DataFrame({label: [result]})
+        return pd.DataFrame({groupby: list(result.keys()), label: list(result.values())})
+
+    @staticmethod
+    def parseColumn(column: str):
+        """
+        Split a 'family:column' name into its column family and column.
+
+        Raises:
+            ValueError: If the name is not of the form family:column.
+        """
+        family, separator, name = str(column).partition(':')
+        if not separator or not family or not name:
+            raise ValueError(f"Invalid column '{column}', expected family:column.")
+        return family, name
+
     def list_(self):
         """
         List all tables in the database.
@@ -96,8 +448,7 @@ class TableManager:
             self.tables[table].isEnable = False
 
             # Save table
-            with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as file:
-                pickle.dump(self.tables[table], file)
+            self.logMutation(table, 'enable', False)
 
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - init_time
@@ -131,8 +482,7 @@ class TableManager:
             self.tables[table].isEnable = True
 
             #Save table
-            with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as file:
-                pickle.dump(self.tables[table], file)
+            self.logMutation(table, 'enable', True)
             
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - init_time
@@ -156,9 +506,9 @@ class TableManager:
         """
         # Start a timer to measure the time taken for the operation.
         init_time = time.perf_counter()
-        str_list = [str(self.tables[table].isEnable)]
         # Check if the specified table exists in the database.
         if table in self.tables:
+            str_list = [str(self.isTableEnabled(table))]
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - init_time
             
@@ -169,13 +519,15 @@ class TableManager:
             # Return an error message if the table does not exist.
             return f"Error: The table '{table}' could not be found."
         
-    def create(self, name: str, column_families: List[str]):
+    def create(self, name: str, column_families: List[str], options: Dict[str, Union[str, Dict[str, str]]] = None):
         """
         Create a new table with specified column families and save it to a file.
 
         Parameters:
             name (str): The name of the new table to be created.
             column_families (List[str]): A list of column families to be included in the new table.
+            options (dict, optional): Column family settings, e.g. {'compression': 'ZLIB'} for every family
+                                      or {'bloom': {'cf1': 'ROWCOL'}, 'versions': {'cf2': 3}} for single families.
 
         Returns:
             str: A formatted string indicating the time taken to create the table or an error message.
@@ -188,14 +540,26 @@ class TableManager:
 
         try:
             # Create a new Table object with specified column families.
-            newTable = Table(columns={cf: [] for cf in column_families}, indexed=False)
+            newTable = Table(columns={cf: [] for cf in column_families})
+
+            # Column types may name their family, e.g. -types=[cf1:hp:int64], which must exist
+            if options and 'types' in options and not isinstance(options['types'], dict):
+                for family, _, _ in ColumnFamily.parseTypes(options['types']):
+                    if family is not None and family not in column_families:
+                        return f"Error: Column family '{family}' could not be found."
+
+            # Apply the column family settings before the table is registered
+            for option, value in (options or {}).items():
+                settings = value if isinstance(value, dict) else {cf: value for cf in column_families}
+                for cf, setting in settings.items():
+                    if not newTable.configureColumnFamily(cf, {option: setting}):
+                        return f"Error: Column family '{cf}' could not be found."
             
             # Add the new table to the tables dictionary.
             self.tables[name] = newTable
 
             # Save the new table to a file using pickle.
-            with open(f"{self.tableDirectory}/{name}.hfile", 'wb') as file:
-                pickle.dump(newTable, file)
+            self.saveTable(name)
 
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - init_time
@@ -207,7 +571,8 @@ class TableManager:
             # Return an error message if an exception occurs.
             return f"Error: {e}"
 
-    def get(self, table: str, row: str, column_family=None, column_name=None, nversions:int = 1, version:float = None):
+    def get(self, table: str, row: str, column_family=None, column_name=None, nversions:int = 1, version:float = None,
+            timerange: List[float] = None, filter: str = None):
         """
         Retrieve data from a specified table in the database.
 
@@ -218,6 +583,8 @@ class TableManager:
             column_name (str, optional): The column name to filter the search (default is None).
             versions (int, optional): The number of versions to retrieve (default is 1).
             version (float, optional): The version to retrieve (default is None).
+            timerange (List[float], optional): Only retrieve the versions with t1 <= timestamp < t2 (default is None).
+            filter (str, optional): A filter expression evaluated on the row and its cells (default is None).
 
         Returns:
             pd.DataFrame: A DataFrame containing the retrieved data or error messages.
@@ -229,7 +596,12 @@ class TableManager:
         # Check if the specified table exists in the database.
         if table in self.tables:
             # Retrieve data from the table based on the provided row key, column family, column name and number of versions.
-            data = self.tables[table].obtainTableInfoRowkeyWithMetadata(row, column_family, column_name, nversions, version)
+            try:
+                rowFilter = parseFilter(filter, parseValue) if filter else None
+            except ValueError as e:
+                return pd.DataFrame({"Error": [str(e)]})
+            data = self.tables[table].obtainTableInfoRowkeyWithMetadata(row, column_family, column_name, nversions, version, timerange,
+                                                                        rowFilter)
             
             # If no data is found for the given row key, return an error DataFrame.
             if len(data) == 0:
@@ -245,6 +617,41 @@ class TableManager:
             # Return an error DataFrame if the specified table does not exist.
             return pd.DataFrame({"Error": ["Table not found"]})
 
+    def get_many(self, table: str, rows: List[str], column_family=None, column_name=None, nversions:int = 1, version:float = None,
+                 timerange: List[float] = None, filter: str = None):
+        """
+        Retrieve many rows from a specified table in a single call.
+
+        Parameters:
+            table (str): The name of the table from which to retrieve data.
+            rows (List[str]): The row keys to retrieve, in any order.
+            The remaining parameters restrict the cells as in get.
+
+        Returns:
+            pd.DataFrame: A single DataFrame with the cells of every row found, in row key order, or error messages.
+        """
+        # Ignore empty row keys and return an error DataFrame if none is left.
+        rows = [str(row) for row in ([rows] if isinstance(rows, str) else rows) if str(row).strip() != '']
+        if not rows:
+            return pd.DataFrame({"Error": ["RowKeys are empty"]})
+
+        # Check if the specified table exists in the database.
+        if table in self.tables:
+            try:
+                rowFilter = parseFilter(filter, parseValue) if filter else None
+            except ValueError as e:
+                return pd.DataFrame({"Error": [str(e)]})
+            # Sort the row keys once and read them region by region in a single pass.
+            data = self.tables[table].getMany(rows, column_family, column_name, nversions, version, timerange, rowFilter)
+
+            # If none of the row keys is found, return an error DataFrame.
+            if len(data) == 0:
+                return pd.DataFrame({"Error": ["Rows not found"]})
+            return data
+        else:
+            # Return an error DataFrame if the specified table does not exist.
+            return pd.DataFrame({"Error": ["Table not found"]})
+
     def count(self, table: str):
         """
         Counts the number of unique rows in the specified table.
@@ -256,9 +663,6 @@ class TableManager:
             str: A message indicating the number of unique rows and the time taken to count them,
                 or an error message if the table does not exist.
         """
-        # Initialize a set to store unique row identifiers.
-        unique_rows = set()
-        
         # Record the start time for performance measurement.
         initTime = time.perf_counter()
 
@@ -267,20 +671,14 @@ class TableManager:
             # Retrieve the data for the specified table.
             data = self.tables[table]
             
-            # Iterate through each column family in the table.
-            for family in data.columnFamilies:
-                # Iterate through each column in the column family.
-                for column in family.columns.keys():
-                    # Get the rows associated with the current column.
-                    rows = [row.rowKey for row in family.columns[column].rows]
-                    # Add the rows to the set of unique rows.
-                    unique_rows.update(rows)
+            # Count the rows of the MemStores and store files of every region in one streaming pass.
+            rows = data.countRows()
             
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - initTime
             
             # Return the count of unique rows and the time taken in milliseconds.
-            return self.outputFormatter(time_taken, len(unique_rows))
+            return self.outputFormatter(time_taken, rows)
         
         else:
             # Return an error message if the table does not exist.
@@ -303,10 +701,13 @@ class TableManager:
         # Check if the specified table exists in the database.
         if table in self.tables:
             # Check if the table is currently enabled.
-            if self.tables[table].isEnable:
+            if self.isTableEnabled(table):
                 # Return a message indicating the table must be disabled before dropping.
                 return f"Action required: The table '{table}' must be disabled before it can be dropped."
             else:   
+                # Store files are only deleted once no snapshot or cloned table references them.
+                storeFiles = self.tables[table].storeFiles()
+
                 # Construct the file path for the table's file.
                 table_file_path = os.path.join(self.tableDirectory, f"{table}.hfile")
                     
@@ -314,8 +715,15 @@ class TableManager:
                 if os.path.exists(table_file_path):
                     # Delete the table's file.
                     os.remove(table_file_path)
+                    # Delete the table's write-ahead log.
+                    if table in self.logs:
+                        self.logs.pop(table).close()
+                    if os.path.exists(os.path.join(self.tableDirectory, f"{table}.wal")):
+                        os.remove(os.path.join(self.tableDirectory, f"{table}.wal"))
                     # Remove the table from the database's tables dictionary.
                     del self.tables[table]
+                    # Delete the table's store files, releasing their memory maps first.
+                    self.removeStoreFiles(storeFiles)
                     # Calculate the total time taken for the operation.
                     time_taken = time.perf_counter() - initTime
 
@@ -361,7 +769,7 @@ class TableManager:
         # Format and return the message indicating the total time taken.
         return self.outputFormatter(time_taken, 0)
     
-    def delete(self, table: str, row: str, column_name: str, timestamp: float):
+    def delete(self, table: str, row: str, column_name: str, timestamp: float, durable: bool = False):
         """
         Deletes an entry from the table based on the provided parameters.
 
@@ -370,6 +778,7 @@ class TableManager:
             row (str): The row identifier of the entry to delete.
             column_name (str): The column name of the entry to delete.
             timestamp (int): The timestamp associated with the entry to delete.
+            durable (bool): Wait until the deletion is on disk before returning.
 
         Returns:
             str: A formatted message indicating the total time taken for the operation.
@@ -389,34 +798,9 @@ class TableManager:
             if not data.isEnable:
                 return f"Error: The table '{table}' is disabled."
             
-            found = False  # Initialize a flag to indicate if the value is found
-
             try:
-                # Iterate through each column family in the data
-                for family in data.columnFamilies:
-                    # Check if the column family matches the specified family name
-                    if family.name == family_name:
-
-                        # Iterate through each column in the column family
-                        for column in family.columns.keys():
-                            # Check if the column matches the specified column name
-                            if column == column_name:
-
-                                # Get the rows associated with the current column
-                                cell_values = family.columns[column].searchRow(row).values
-
-                                # Iterate through each value in the cell
-                                for i, value in enumerate(cell_values):
-                                    # Check if the value's creation date matches the specified timestamp
-                                    if value.creationDate == timestamp:
-
-                                        # Remove the value from the list of values
-                                        family.columns[column].searchRow(row).values.pop(i)
-                                        found = True  # Set the flag to True as the value is found
-
-                                # If the row is empty after removing the value, delete the row
-                                if family.columns[column].searchRow(row).isEmpty():
-                                    family.columns[column].rows.remove(row)
+                # Remove the version with the specified timestamp from the matching cell
+                found = data.deleteVersion(row, family_name, column_name, timestamp)
 
             except (KeyError, AttributeError):
                 # Handle the case where the specified row key is not found
@@ -426,9 +810,8 @@ class TableManager:
             if not found:
                 return f"Error: The value could not be found."
             else:
-                # Save the updated data back to the file if the value was found and removed
-                with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as outf:
-                    pickle.dump(data, outf)
+                # Record the deletion in the write-ahead log if the value was found and removed
+                self.logMutation(table, 'delete', row, family_name, column_name, timestamp, durable=durable)
 
             
             # Calculate the total time taken for the operation.
@@ -441,7 +824,7 @@ class TableManager:
             # Return an error message if the table does not exist.
             return f"Error: The table '{table}' could not be found."
         
-    def deleteAll(self, table: str, row: str):
+    def deleteAll(self, table: str, row: str, durable: bool = False):
         # Record the start time for performance measurement.
         initTime = time.perf_counter()
 
@@ -453,23 +836,17 @@ class TableManager:
             if not data.isEnable:
                 return f"Error: The table '{table}' is disabled."
 
-            found = False  # Initialize a flag to indicate if the value is found
-            # Iterate through each column family in the data
-            for family in data.columnFamilies:
-                # Iterate through each column in the column family
-                for column in family.columns.keys():
-                    result = family.columns[column].searchRow(row)
-                    if result:
-                        family.columns[column].rows.remove(row)
-                        found = True
+            # Fix the timestamp here so replaying the log recreates the exact same delete marker.
+            timestamp = time.time()
+            # Remove the row from every column of every column family
+            found = data.deleteRow(row, timestamp)
 
             # Check if the value was not found during the iteration
             if not found:
                 return f"Error: The value could not be found."
             else:
-                # Save the updated data back to the file if the value was found and removed
-                with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as outf:
-                    pickle.dump(data, outf)
+                # Record the deletion in the write-ahead log if the row was found and removed
+                self.logMutation(table, 'delete_all', row, timestamp, durable=durable)
 
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - initTime
@@ -532,7 +909,7 @@ class TableManager:
             # Return an error message if the table does not exist.
             return f"Error: The table '{table}' could not be found."
 
-    def put(self, table:str, rowKey:str, column_family:str, column:str, value:str ):
+    def put(self, table:str, rowKey:str, column_family:str, column:str, value:str, durable:bool = False):
         """
         Inserts or updates a value in the specified table.
 
@@ -542,6 +919,7 @@ class TableManager:
             column_family (str): The column family where the value will be inserted or updated.
             column (str): The column where the value will be inserted or updated.
             value (str): The value to be inserted or updated.
+            durable (bool): Wait until the value is on disk before returning, even in the asynchronous durability mode.
 
         Returns:
             str: A message indicating the result of the operation along with the time taken.
@@ -554,11 +932,17 @@ class TableManager:
             # Verify if table is enable
             if not self.tables[table].isEnable:
                 return f"Error: The table '{table}' is disabled."
+            # Fix the timestamp here so replaying the log recreates the exact same version.
+            timestamp = time.time()
             # Call the insertOrUpdateRow method on the specified table.
-            if self.tables[table].insertOrUpdateRow(rowKey, column_family, column, value):
-                # Save the updated data back to the file.
-                with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as outf:
-                    pickle.dump(self.tables[table], outf)
+            try:
+                inserted = self.tables[table].insertOrUpdateRow(rowKey, column_family, column, value, timestamp)
+            except ValueError as e:
+                # The value does not match the declared type of the column.
+                return f"Error: {e}"
+            if inserted:
+                # Record the mutation in the write-ahead log instead of rewriting the whole table.
+                self.logMutation(table, 'put', rowKey, column_family, column, value, timestamp, durable=durable)
                 # Calculate the total time taken for the operation.
                 time_taken = time.perf_counter() - init_time
                 # Return the time taken in milliseconds.
@@ -579,13 +963,35 @@ class TableManager:
             if not self.tables[table].isEnable:
                 return f"Error: The table '{table}' is disabled."
 
+            # Store files of removed column families, deleted once the table is saved
+            obsolete = []
+            # Column family settings such as -bloom=ROWCOL, -compression=ZLIB, -versions=3, -min_versions=1, -ttl=86400
+            # or -types=[hp:int64,name:string]
+            settings = {option: value for option, value in args.items() if option in ('bloom', 'compression', 'versions', 'min_versions', 'ttl', 'types')}
+            if 'bloom' in settings and str(settings['bloom']).upper() not in BLOOM_TYPES:
+                return f"Error: Invalid Bloom filter type '{settings['bloom']}', expected one of {BLOOM_TYPES}."
+            if 'compression' in settings and str(settings['compression']).upper() not in COMPRESSION_TYPES:
+                return f"Error: Invalid compression '{settings['compression']}', expected one of {COMPRESSION_TYPES}."
+            try:
+                if 'versions' in settings:
+                    ColumnFamily.parseVersions(settings['versions'])
+                if 'min_versions' in settings:
+                    ColumnFamily.parseVersions(settings['min_versions'], minimum=0)
+                if 'ttl' in settings:
+                    ColumnFamily.parseTtl(settings['ttl'])
+                if 'types' in settings:
+                    ColumnFamily.parseTypes(settings['types'])
+            except ValueError as e:
+                return f"Error: {e}"
+
             if 'delete' in args:
                 for column in self.tables[table].columnFamilies:
                     if column.name == args['delete']:
                         # Verify if is the last column family
                         if len(self.tables[table].columnFamilies) == 1:
                             return f"Error: Table '{table}' must have at least one column family."
-                        self.tables[table].columnFamilies.remove(column)
+                        # Remove the family from every region
+                        obsolete = self.tables[table].removeColumnFamily(column.name)
                         break
             elif 'cf' in args:
                 if 'method' in args:
@@ -596,7 +1002,8 @@ class TableManager:
                                 # Verify if is the last column family
                                 if len(self.tables[table].columnFamilies) == 1:
                                     return f"Error: Table '{table}' must have at least one column family."
-                                self.tables[table].columnFamilies.remove(column)
+                                # Remove the family from every region
+                                obsolete = self.tables[table].removeColumnFamily(column.name)
                                 break
                     elif method == 'rename':
                         toModify = None
@@ -609,7 +1016,7 @@ class TableManager:
 
                         if toModify:
                             if not exist:
-                                toModify.name = args['new_cf']
+                                self.tables[table].renameColumnFamily(toModify.name, args['new_cf'])
                             else:
                                 return f"Error: Column family '{args['new_cf']}' already exists."
                         else:
@@ -622,17 +1029,30 @@ class TableManager:
                                 break
                         if not exist:
                             self.tables[table].addColumnFamily(args['cf'])
+                            self.tables[table].configureColumnFamily(args['cf'], settings)
                         else:
                             return f"Error: Column family '{args['cf']}' already exists."
                 else:
-                    self.tables[table].addColumnFamily(args['cf'])
+                    # Without a method the remaining arguments are settings of the column family
+                    columnFamily = self.tables[table].columnFamily(args['cf'])
+                    if columnFamily is None:
+                        self.tables[table].addColumnFamily(args['cf'])
+                        self.tables[table].configureColumnFamily(args['cf'], settings)
+                    elif settings:
+                        try:
+                            self.tables[table].configureColumnFamily(args['cf'], settings)
+                        except ValueError as e:
+                            # Values already stored that do not match a new column type
+                            return f"Error: {e}"
+                    else:
+                        return f"Error: Column family '{args['cf']}' already exists."
 
             elif 'index' in args:
                 self.tables[table].setIndexed()
 
-            # Save the updated data back to the file
-            with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as outf:
-                pickle.dump(self.tables[table], outf)
+            # Schema changes are rare, so save a full snapshot instead of logging them
+            self.saveTable(table)
+            self.removeStoreFiles(obsolete)
 
             # Calculate the total time taken for the operation.
             time_taken = time.perf_counter() - init_time
@@ -644,20 +1064,338 @@ class TableManager:
             # Return an error message if the table does not exist.
             return f"Error: The table '{table}' could not be found."
             
+    def flush(self, table: str):
+        """
+        Flush every MemStore of the specified table to store files.
+
+        Args:
+            table (str): The name of the table to flush.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message if the table does not exist.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        # Check if the specified table exists in the database.
+        if table in self.tables:
+            self.flushTable(table, force=True)
+            # Return the time taken in milliseconds.
+            return self.outputFormatter(time.perf_counter() - init_time, 0)
+        else:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+
+    def compact(self, table: str, major: bool = False):
+        """
+        Compact the store files of the specified table.
+
+        Args:
+            table (str): The name of the table to compact.
+            major (bool): Merge every store file and drop delete markers (major compaction)
+                          instead of only merging the smaller files (minor compaction).
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message if the table does not exist.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        # Check if the specified table exists in the database.
+        if table in self.tables:
+            self.flushTable(table, major=major)
+            # Return the time taken in milliseconds.
+            return self.outputFormatter(time.perf_counter() - init_time, 0)
+        else:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+
+    def snapshotPath(self, name: str) -> str:
+        return os.path.join(self.tableDirectory, self.SNAPSHOT_DIRECTORY, f"{name}.snapshot")
+
+    def loadSnapshot(self, name: str) -> Table:
+        """
+        Read the table stored in a snapshot manifest, which follows its header.
+        """
+        with open(self.snapshotPath(name), 'rb') as file:
+            pickle.load(file)
+            data = pickle.load(file)
+        data.openStoreFiles(self.tableDirectory)
+        return data
+
+    def parseWhere(self, where: Union[str, List[str]]):
+        """
+        Parse conditions such as 'cf:col=value' or ['cf:col>=10', 'cf:col<20'] into
+        (family, column, operator, value) tuples.
+
+        Raises:
+            ValueError: If a condition is not of the form family:column, operator, value.
+        """
+        conditions = []
+        for condition in [where] if isinstance(where, str) else where:
+            match = re.match(r'^\s*([^:<>=\s]+):([^<>=\s]+)\s*(==|<=|>=|=|<|>)\s*(.*?)\s*$', condition)
+            if match is None:
+                raise ValueError(f"Invalid condition '{condition}', expected family:column, one of {OPERATORS} and a value.")
+            family, column, operator, value = match.groups()
+            conditions.append((family, column, '=' if operator == '==' else operator, parseValue(value)))
+        return conditions
+
+    def find(self, table: str, where: Union[str, List[str]], nversions:int = 1, version:float = None, startrow:str = None,
+             stoprow:str = None, prefix:str = None, limit:int = None, reversed:bool = False, timerange: List[float] = None,
+             filter: str = None):
+        """
+        Retrieve the rows of a table matching conditions on indexed columns, e.g. 'basic_info:type=fire'.
+
+        Each condition is answered by the secondary index of its column in O(log n + k), so only
+        the matching rows are read. The remaining parameters are those of scan.
+
+        Returns:
+            pd.DataFrame: A DataFrame containing the matching rows, or an error message.
+        """
+        return self.scan(table, nversions, version, startrow, stoprow, prefix, limit, reversed, timerange, where=where, filter=filter)
+
+    def createIndex(self, table: str, column: str):
+        """
+        Create a secondary index on the current values of a column, maintained on every put and delete.
+
+        Args:
+            table (str): The name of the table.
+            column (str): The indexed column, as family:column.
+
+        Returns:
+            str: A formatted message indicating the number of indexed rows and the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table not in self.tables:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+        data = self.tables[table]
+        if not data.isEnable:
+            return f"Error: The table '{table}' is disabled."
+        if ':' not in column:
+            return "Error: Invalid column format. Please provide family:column."
+        family, column = column.split(':', 1)
+        if f"{family}:{column}" in data.indexes:
+            return f"Error: Column '{family}:{column}' is already indexed."
+        if not data.createIndex(family, column):
+            return f"Error: Column family '{family}' could not be found."
+
+        # Indexes are persisted with the table, like any other schema change
+        self.saveTable(table)
+        # Return the number of indexed rows and the time taken.
+        return self.outputFormatter(time.perf_counter() - init_time, len(data.indexes[f"{family}:{column}"].values))
+
+    def dropIndex(self, table: str, column: str):
+        """
+        Remove the secondary index of a column.
+
+        Args:
+            table (str): The name of the table.
+            column (str): The indexed column, as family:column.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table not in self.tables:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+        if ':' not in column or not self.tables[table].dropIndex(*column.split(':', 1)):
+            return f"Error: Column '{column}' has no secondary index."
+        self.saveTable(table)
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def snapshot(self, table: str, name: str):
+        """
+        Take a named snapshot of a table. The MemStores are flushed first, so the snapshot only
+        references the immutable store files of the table and copies none of its cells.
+
+        Args:
+            table (str): The name of the table.
+            name (str): The name of the new snapshot.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table not in self.tables:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+        if name in self.snapshots:
+            return f"Error: The snapshot '{name}' already exists."
+
+        self.flushTable(table, force=True)
+        data = self.tables[table]
+        header = {'format': self.HEADER_FORMAT, 'table': table, 'created': time.time(),
+                  'storeFiles': [storeFile.name for storeFile in data.storeFiles()]}
+
+        path = self.snapshotPath(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so a crash never leaves a partial manifest behind.
+        with open(f"{path}.tmp", 'wb') as file:
+            pickle.dump(header, file)
+            pickle.dump(data, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(f"{path}.tmp", path)
+        self.snapshots[name] = header
+
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def restoreSnapshot(self, name: str):
+        """
+        Bring a table back to the state of a snapshot. The table must be disabled and stays
+        disabled afterwards; a dropped table is recreated.
+
+        Args:
+            name (str): The name of the snapshot to restore.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if name not in self.snapshots:
+            return f"Error: The snapshot '{name}' could not be found."
+        table = self.snapshots[name]['table']
+
+        obsolete = []
+        if table in self.tables:
+            if self.isTableEnabled(table):
+                return f"Action required: The table '{table}' must be disabled before it can be restored."
+            obsolete = self.tables[table].storeFiles()
+
+        data = self.loadSnapshot(name)
+        data.isEnable = False
+        self.tables[table] = data
+        # The table must reference the snapshot's store files before its own are removed.
+        self.saveTable(table)
+        self.removeStoreFiles(obsolete)
+
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def cloneSnapshot(self, name: str, table: str):
+        """
+        Create a new table from a snapshot. The new table shares the snapshot's store files and
+        writes its own files once it is flushed.
+
+        Args:
+            name (str): The name of the snapshot to clone.
+            table (str): The name of the new table.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if name not in self.snapshots:
+            return f"Error: The snapshot '{name}' could not be found."
+        if table in self.tables:
+            return f"Error: The table '{table}' already exists."
+
+        data = self.loadSnapshot(name)
+        data.isEnable = True
+        data.lastSequenceId = 0
+        self.tables[table] = data
+        self.saveTable(table)
+
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def deleteSnapshot(self, name: str):
+        """
+        Delete a snapshot and the store files that only it still referenced.
+
+        Args:
+            name (str): The name of the snapshot to delete.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if name not in self.snapshots:
+            return f"Error: The snapshot '{name}' could not be found."
+
+        storeFiles = self.loadSnapshot(name).storeFiles()
+        os.remove(self.snapshotPath(name))
+        del self.snapshots[name]
+        self.removeStoreFiles(storeFiles)
+
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def listSnapshots(self):
+        """
+        List the named snapshots.
+
+        Returns:
+            pd.DataFrame: A DataFrame with the name, table, creation time and number of store files of every snapshot.
+        """
+        return pd.DataFrame({
+            "Snapshot": list(self.snapshots.keys()),
+            "Table": [header['table'] for header in self.snapshots.values()],
+            "Created": [header['created'] for header in self.snapshots.values()],
+            "Store files": [len(header['storeFiles']) for header in self.snapshots.values()],
+        })
+
+    def sync(self, table: str = None):
+        """
+        Write and fsync the buffered write-ahead log records of one table, or of every table.
+
+        Args:
+            table (str, optional): The name of the table to sync.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message if the table does not exist.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table is not None and table not in self.tables:
+            # Return an error message if the table does not exist.
+            return f"Error: The table '{table}' could not be found."
+        # Tables without a log have never been modified since they were loaded
+        for name, log in list(self.logs.items()):
+            if table is None or name == table:
+                log.sync()
+        # Return the time taken in milliseconds.
+        return self.outputFormatter(time.perf_counter() - init_time, 0)
+
+    def cacheStats(self):
+        """
+        Report the hit, miss and eviction counters of the shared block cache.
+
+        Returns:
+            pd.DataFrame: A single-row DataFrame with the counters and current usage of the cache.
+        """
+        return pd.DataFrame(blockCache.stats(), index=[0])
+
     def describe(self, table:str):
         if table in self.tables:
-            data = self.tables[table].describeTable()
+            # Answer from the snapshot header when the table has not been loaded; counting its rows would
+            # read every cell, so the count is only given once the table is loaded.
+            header = self.tables.header(table)
+            if header is not None and 'description' in header:
+                data = {'Row keys': 'unknown'}
+                data.update(header['description'])
+            else:
+                data = self.tables[table].describeTable()
             data['Name'] = table
             return pd.DataFrame(data, index=[0])
         else:
             return pd.DataFrame({"Error": ["Table not found"]})
         
-    def insertMany(self, file):
+    def insertMany(self, file, durable: bool = False):
         """
         Insert multiple rows into multiple tables from a given file and measure the time taken for the operation.
 
         Parameters:
             file: A file where keys are table names and values are rows to insert.
+            durable (bool): Wait until the rows are on disk before returning.
 
         Returns:
             str: A formatted string indicating the time taken to perform the insertion.
@@ -668,17 +1406,157 @@ class TableManager:
         # Iterate over each table and its corresponding rows in the input file.
         for table, rows in file.items():
             if table in self.tables:
+                # Fix the timestamp here so replaying the log recreates the exact same versions.
+                timestamp = time.time()
                 # Insert multiple rows into the specified table.
-                self.tables[table].insertMany(rows)
+                try:
+                    self.tables[table].insertMany(rows, timestamp)
+                except ValueError as e:
+                    # A value does not match the declared type of its column.
+                    return f"Error: {e}"
                 
-                # Save the updated table to a file using pickle.
-                with open(f"{self.tableDirectory}/{table}.hfile", 'wb') as outf:
-                    pickle.dump(self.tables[table], outf)
+                # Record the inserted rows in the write-ahead log.
+                self.logMutation(table, 'insert_many', rows, timestamp, durable=durable)
 
         # Calculate the total time taken for the operation.
         time_taken = time.perf_counter() - init_time
 
         # Return the time taken in a formatted string.
         return self.outputFormatter(time_taken, 0)
+
+    def loadRows(self, file: str, table: str = None, chunkSize: int = CHUNK_SIZE, progress=None):
+        """
+        Stream rows from a JSON Lines or CSV file into tables, reading and inserting them in bounded chunks.
+
+        Every JSON Lines record has the shape of an insert_many file; a CSV file has the row key in its first
+        column and family:column headers, and is loaded into table. MemStores are flushed as they fill up,
+        while compactions, splits and secondary indexes run once at the end. Every loaded table is saved once,
+        so the rows are not written to the write-ahead log and no periodic snapshot is taken while loading.
+
+        Parameters:
+            file (str): The path of a .jsonl, .ndjson or .csv file.
+            table (str, optional): The table the rows of a CSV file are inserted into.
+            chunkSize (int): The number of rows read before they are inserted.
+            progress (callable, optional): Called after every chunk with the rows loaded so far and the elapsed seconds.
+
+        Returns:
+            str: A formatted string with the number of rows, the time taken and the rows per second.
+
+        Raises:
+            ValueError: If the file, one of its records or the table is not valid.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table and table not in self.tables:
+            raise ValueError("Table not found")
+
+        # Store files replaced by compactions and splits while loading, removed once the tables are saved.
+        obsolete: Dict[str, List[StoreFile]] = {}
+        loaded = 0
+        try:
+            for chunk in chunks(readRows(file, table, parseValue), chunkSize):
+                # Every row of a chunk gets the same timestamp, as the rows of an insert_many file do.
+                timestamp = time.time()
+                for name, rows in chunk.items():
+                    if name not in self.tables:
+                        continue
+                    data = self.tables[name]
+                    data.insertMany(rows, timestamp, updateIndexes=False)
+                    obsolete.setdefault(name, [])
+                    # MemStores are flushed in large store files, and compactions and splits wait for the end
+                    # of the load, so loaded cells are not rewritten by every compaction along the way.
+                    if data.needsFlush(self.LOAD_FLUSH_SIZE):
+                        data.flush(self.tableDirectory, name, flushSize=self.LOAD_FLUSH_SIZE)
+                    loaded += len(rows)
+                if progress is not None:
+                    progress(loaded, time.perf_counter() - init_time)
+        finally:
+            # The chunks loaded before an invalid record are kept, as they are not in the write-ahead log.
+            for name, replaced in obsolete.items():
+                data = self.tables[name]
+                # Leave no more in the MemStores than regular writes would, so the saved snapshot stays small.
+                data.flush(self.tableDirectory, name)
+                replaced += data.compact(self.tableDirectory, name)
+                replaced += data.split(self.tableDirectory, name)
+                data.rebuildIndexes()
+                # The saved table must reference the new store files before the replaced ones are removed.
+                self.saveTable(name)
+                self.removeStoreFiles(replaced)
+
+        # Calculate the total time taken for the operation.
+        time_taken = time.perf_counter() - init_time
+
+        # Return the number of rows, the time taken and the throughput in a formatted string.
+        return f"{self.outputFormatter(time_taken, loaded)} ({loaded / max(time_taken, 1e-9):.0f} rows/s)"
+
+    def bulkload(self, table: str, file: str, output: str = None, spillSize: int = SPILL_SIZE):
+        """
+        Prepare an offline bulk load: sort the rows of a JSON Lines or CSV file on disk and write them
+        as finished store files, one per column family and region, without modifying the table.
+        The files are attached to the table afterwards with completeBulkload.
+
+        Parameters:
+            table (str): The name of the table the rows are loaded into; JSON Lines records of other tables are skipped.
+            file (str): The path of a .jsonl, .ndjson or .csv file.
+            output (str, optional): The directory the store files are written to; a new folder of the table directory if omitted.
+            spillSize (int): The number of cells sorted in memory before they are spilled to disk.
+
+        Returns:
+            str: A formatted string with the number of rows, the time taken and the directory to attach.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        if table not in self.tables:
+            return "Error: Table not found"
+        data = self.tables[table]
+        created = output is None
+        if created:
+            output = os.path.join(self.tableDirectory, self.BULKLOAD_DIRECTORY, f"{table}-{uuid.uuid4().hex}")
+        try:
+            rows = (row for row in readRows(file, table, parseValue) if row[0] == table)
+            manifest = prepareBulkLoad(rows, output, {cf.name: (cf.bloomFilterType, cf.compression) for cf in data.columnFamilies},
+                                       [region.startKey for region in data.regions[1:]], table, spillSize=spillSize,
+                                       columnTypes={cf.name: cf.columnTypes for cf in data.columnFamilies if cf.columnTypes})
+        except (ValueError, OSError) as e:
+            # A failed load leaves no partial store files behind in a directory it created.
+            if created:
+                shutil.rmtree(output, ignore_errors=True)
+            return f"Error: {e}"
+
+        # Return the number of rows and the time taken in a formatted string.
+        return f"{self.outputFormatter(time.perf_counter() - init_time, manifest['rows'])}, ready to attach from '{output}'"
+
+    def completeBulkload(self, directory: str, table: str = None):
+        """
+        Attach the store files of a prepared bulk load to a live table in one step: the files are moved
+        into the regions of the table and the table is saved once, so readers see either none or all of
+        the loaded rows and no put is replayed.
+
+        Parameters:
+            directory (str): The directory written by bulkload.
+            table (str, optional): The table to attach the files to; the table they were prepared for if omitted.
+
+        Returns:
+            str: A formatted message indicating the time taken, or an error message.
+        """
+        # Record the start time for performance measurement.
+        init_time = time.perf_counter()
+        try:
+            manifest = readManifest(directory)
+        except (ValueError, OSError) as e:
+            return f"Error: {e}"
+        table = table or manifest['table']
+        if table not in self.tables:
+            return f"Error: The table '{table}' could not be found."
+        try:
+            self.tables[table].attachStoreFiles(self.tableDirectory, table, manifest['files'])
+        except (ValueError, OSError) as e:
+            return f"Error: {e}"
+        # The table references the new store files once it is saved.
+        self.saveTable(table)
+        shutil.rmtree(directory, ignore_errors=True)
+
+        # Return the number of rows and the time taken in a formatted string.
+        return self.outputFormatter(time.perf_counter() - init_time, manifest['rows'])
           
         